@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import videobot_bestsellers as vb  # noqa: E402
+
+
+PRODUCT = {'name': 'Curso Teste', 'niche': 'marketing', 'problem': 'poucas vendas', 'solution': 'funis simples', 'avatar': 'empreendedor'}
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # Cache, jobs e fila do módulo usam caminhos relativos: cada teste roda no seu diretório
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('VIDEOBOT_CACHE', '0')
+    monkeypatch.setattr(vb, '_backoff_delay', lambda *args, **kwargs: 0)
+
+
+@pytest.fixture
+def config():
+    config = vb.BestsellerConfig()
+    config.max_retries = 3
+    return config
+
+
+def hook_generator(config, provider=None):
+    return vb.BestsellerHookGenerator(config, provider or vb.FakeProvider(config), vb.ResponseCache(None))
+
+
+async def collect(stream):
+    return [item async for item in stream]
@@ -0,0 +1,57 @@
+import pytest
+
+import videobot_bestsellers as vb
+
+
+COPIES = {
+    'kennedy_pas_plus': "Você sofre com esse problema todo dia? Cada dia fica pior e você vai perder dinheiro. "
+                        "A solução: nosso método resolve. Estudos e dados comprovam. Clique no link agora mesmo.",
+    'brunson_epiphany_bridge': "Há alguns anos eu era igual você. Tentei de tudo e fracassei, quase desisti. "
+                               "Até que descobri o segredo que mudou tudo. Hoje eu conquistei a liberdade com um passo a passo simples.",
+    'hormozi_grand_slam_offer': "Imagine alcançar o resultado dos seus sonhos em poucos dias, sem esforço e de forma fácil. "
+                                "Milhares de clientes comprovaram: funciona. Oferta com bônus e garantia.",
+    'monster_supreme_framework': "COMPROVADO cientificamente por especialistas com anos de experiência. Você já sentiu a frustração? "
+                                 "Eu era igual você até descobrir. Oferta com desconto, milhares já comprovaram, garantia total."
+}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return vb.AdvancedCopyAnalyzer(vb.BestsellerConfig())
+
+
+@pytest.mark.parametrize('framework', list(COPIES))
+def test_detects_framework_of_typical_copy(analyzer, framework):
+    structure = analyzer.analyze_copy_structure(COPIES[framework])
+    assert structure['detected_framework'] == framework
+    assert structure['framework_confidence'] == max(structure['framework_scores'].values())
+    assert set(structure['framework_scores']) == set(analyzer.frameworks.frameworks)
+
+
+def test_copy_without_cues_scores_zero_everywhere(analyzer):
+    assert set(analyzer.score_frameworks('lorem ipsum dolor sit amet').values()) == {0.0}
+
+
+def test_incremental_analysis_after_edits_matches_full_analysis(analyzer):
+    state = vb.IncrementalCopyAnalysis(analyzer.keywords)
+    paragraphs = list(COPIES.values())
+    # (parágrafos, quantos precisam de novo scan): repetidos e já conhecidos saem do cache
+    edits = [
+        (paragraphs, 4),
+        (paragraphs + [paragraphs[0]], 0),
+        ([paragraphs[1], paragraphs[0] + ' Agora com bônus!', paragraphs[1]], 1),
+        ([paragraphs[2]], 1),
+        ([], 0),
+        ([paragraphs[3], '   ', paragraphs[2]], 2)
+    ]
+    for edit, rescans in edits:
+        text = '\n\n'.join(edit)
+        before = state.rescanned
+        state.update(text)
+        assert state.rescanned - before == rescans
+        full = analyzer.keywords.scan(text)
+        assert state.scan.counts == full.counts
+        assert state.scan.found == full.found
+        assert state.stats == vb.copy_text_stats(text)
+        if text.strip():
+            assert analyzer.analyze_copy_structure(text, state.scan, state.stats) == analyzer.analyze_copy_structure(text)
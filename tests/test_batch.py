@@ -0,0 +1,14 @@
+import videobot_bestsellers as vb
+from conftest import PRODUCT, hook_generator
+
+
+def test_batch_run_streams_deduplicated_hooks(config):
+    engine = vb.BestsellerBatchEngine(config, hook_generator(config), concurrency=4)
+    dedup = vb.HookDeduplicator(threshold=0.8)
+    streamed = []
+    result = engine.run([PRODUCT, dict(PRODUCT, name='Outro Curso')], ['hormozi_grand_slam_offer'], ['pt-BR', 'en-US'], 5, on_hook=streamed.append, dedup=dedup)
+    assert result == []
+    assert streamed
+    assert len({(hook.product_index, hook.hook_text) for hook in streamed}) == len(streamed)
+    assert all(hook.viral_score > 0 for hook in streamed)
+    assert not dedup._signatures
@@ -0,0 +1,69 @@
+import asyncio
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT, collect, hook_generator
+
+
+def test_generation_is_cached(config):
+    generator = hook_generator(config)
+    first = asyncio.run(generator.generate_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3))
+    second = asyncio.run(generator.generate_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3))
+    assert first == second
+    assert generator.provider.calls == 1
+
+
+def test_stream_is_cached(config):
+    generator = hook_generator(config)
+    first = asyncio.run(collect(generator.stream_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3)))
+    second = asyncio.run(collect(generator.stream_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3)))
+    assert first == second
+    assert generator.provider.calls == 1
+
+
+def test_identical_concurrent_streams_share_one_call(config):
+    generator = hook_generator(config, vb.FakeProvider(config, latency=0.01))
+
+    async def run():
+        return await asyncio.gather(*(collect(generator.stream_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3)) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert generator.provider.calls == 1
+    assert all(result == results[0] for result in results)
+    assert generator.inflight.stats['shared'] == 4
+
+
+def test_abandoned_shared_stream_is_cancelled(config):
+    generator = hook_generator(config, vb.FakeProvider(config, latency=0.01))
+
+    async def first_only():
+        async for item in generator.stream_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3):
+            return item
+
+    async def run():
+        await asyncio.gather(first_only(), first_only())
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert generator.inflight.stats['cancelled'] == 1
+    assert not generator.inflight._streams
+
+
+def test_template_fallback_is_not_cached(config):
+    cache = vb.ResponseCache('cache.sqlite3')
+    generator = vb.BestsellerHookGenerator(config, None, cache)
+    hooks = asyncio.run(generator.generate_hooks_from_product(PRODUCT, 'pt-BR', 'hormozi_grand_slam_offer', 3))
+    streamed = asyncio.run(collect(generator.stream_hooks_from_product(PRODUCT, 'en-US', 'hormozi_grand_slam_offer', 3)))
+    cache.close()
+    assert hooks and streamed
+    assert cache.stats['stores'] == 0
+    assert vb.sqlite3.connect('cache.sqlite3').execute('SELECT COUNT(*) FROM responses').fetchone()[0] == 0
+
+
+def test_deferred_cache_writes_survive_close():
+    cache = vb.ResponseCache('cache.sqlite3')
+    for index in range(10):
+        cache.set(f'key-{index}', {'value': index})
+    cache.close()
+    reopened = vb.ResponseCache('cache.sqlite3')
+    assert [reopened.get(f'key-{index}') for index in range(10)] == [{'value': index} for index in range(10)]
+    reopened.close()
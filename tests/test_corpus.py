@@ -0,0 +1,17 @@
+import gzip
+import json
+
+import videobot_bestsellers as vb
+
+
+def test_analyze_reads_gzip_corpus_and_keys_cultures_by_code(config):
+    with gzip.open('corpus.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'a1', 'copy': 'Pela sua família, realize o sonho da casa própria hoje mesmo!'}) + '\n')
+        f.write('\n')
+        f.write(json.dumps('Success and freedom: your opportunity is here.') + '\n')
+    results = list(vb.analyze_corpus('corpus.jsonl.gz', mode='thread', processes=1))
+    assert [result['id'] for result in results] == ['a1', '3']
+    compatibility = results[0]['cultural_compatibility']
+    assert set(compatibility) <= set(config.cultures)
+    assert compatibility['pt-BR'] > 0
+    assert results[1]['cultural_compatibility']['en-US'] > 0
@@ -0,0 +1,51 @@
+import json
+
+import videobot_bestsellers as vb
+
+
+# Valores que estavam fixos no código antes do cultures.json
+LEGACY_CULTURES = {
+    'pt-BR': ("Brasil", "R$ ", ['família', 'liberdade', 'reconhecimento', 'segurança', 'sucesso'],
+              ['falta de dinheiro', 'trabalho demais', 'sem tempo', 'medo do futuro'], "emocional e próximo", 0.9, 0.8),
+    'en-US': ("Estados Unidos", "$", ['freedom', 'success', 'efficiency', 'innovation', 'independence'],
+              ['lack of time', 'financial stress', 'competition', 'uncertainty'], "direct and results-focused", 0.6, 0.5),
+    'es-MX': ("México", "$", ['familia', 'tradición', 'respeto', 'comunidad', 'superación'],
+              ['falta de oportunidades', 'preocupación familiar', 'inseguridad económica'], "cálido y familiar", 0.8, 0.9),
+    'de-DE': ("Alemanha", "€", ['qualität', 'präzision', 'ordnung', 'system', 'zuverlässigkeit'],
+              ['zeitmangel', 'ineffizienz', 'unsicherheit', 'komplexität'], "sistemático e preciso", 0.4, 0.5),
+    'fr-FR': ("França", "€", ['élégance', 'savoir-faire', 'qualité', 'crédibilité', 'prestige'],
+              ['manque de temps', 'incertitude', 'complexité', 'coût élevé'], "sofisticado e elegante", 0.6, 0.6),
+    'it-IT': ("Itália", "€", ['famiglia', 'passione', 'tradizione', 'bellezza', 'stile'],
+              ['mancanza di tempo', 'stress finanziario', 'incertezza'], "apaixonado e tradicional", 0.8, 0.8)
+}
+LEGACY_GUI = {
+    'pt-BR': ('🇧🇷 Brasil', 'Emocional • Familiar • Próximo', ['família', 'casa própria', 'sonho', 'luta', 'batalha']),
+    'en-US': ('🇺🇸 Estados Unidos', 'Direto • Baseado em dados • Eficiente', ['success', 'freedom', 'opportunity', 'american dream']),
+    'es-MX': ('🇲🇽 México', 'Familiar • Tradicional • Comunitário', ['familia', 'comunidad', 'tradición', 'respeto']),
+    'de-DE': ('🇩🇪 Alemanha', 'Sistemático • Preciso • Científico', ['qualität', 'system', 'präzision', 'ordnung']),
+    'fr-FR': ('🇫🇷 França', 'Sofisticado • Elegante • Refinado', ['sophistication', 'élégance', 'qualité', 'art']),
+    'it-IT': ('🇮🇹 Itália', 'Apaixonado • Familiar • Tradicional', ['famiglia', 'passione', 'tradizione', 'bellezza'])
+}
+
+
+def test_registry_matches_legacy_hard_coded_cultures(config):
+    assert list(config.cultures) == list(LEGACY_CULTURES)
+    for code, legacy in LEGACY_CULTURES.items():
+        culture = config.cultures[code]
+        assert (culture.name, culture.currency, culture.cultural_triggers, culture.pain_points,
+                culture.preferred_communication, culture.emotional_intensity, culture.family_focus) == legacy
+        assert culture.language_code == code
+        assert (culture.label, culture.characteristics, culture.analysis_triggers) == LEGACY_GUI[code]
+
+
+def test_registry_loads_entries_lazily_and_resolves_languages(tmp_path):
+    path = tmp_path / 'cultures.json'
+    path.write_text(json.dumps({'cultures': {'pt-PT': {'name': 'Portugal', 'currency': '€', 'cultural_triggers': [], 'pain_points': [],
+                                                       'preferred_communication': 'direto', 'emotional_intensity': 0.5,
+                                                       'family_focus': 0.5, 'unknown': 1}}}), encoding='utf-8')
+    registry = vb.CultureRegistry(str(path))
+    assert registry._entries is None
+    assert registry.resolve('pt-BR') == 'pt-PT'
+    assert registry.resolve('xx') is None
+    assert registry['pt-PT'] is registry['pt-PT']
+    assert registry['pt-PT'].label == 'Portugal'
@@ -0,0 +1,42 @@
+import json
+from collections import Counter
+
+import pytest
+
+import videobot_bestsellers as vb
+
+
+def test_deduplicator_drops_near_duplicates_within_scope():
+    dedup = vb.HookDeduplicator(threshold=0.8)
+    text = "Descubra o método simples que dobrou as vendas de milhares de empreendedores"
+    assert dedup.match_or_add(0, text, scope=0) is None
+    assert dedup.match_or_add(1, text + "!", scope=0) == 0
+    assert dedup.match_or_add(2, text, scope=1) is None
+    assert dedup.match_or_add(3, "Pare de perder clientes para a concorrência hoje mesmo", scope=0) is None
+    assert dedup.dropped == 1
+
+
+def test_deduplicator_discard_scope_frees_state():
+    dedup = vb.HookDeduplicator(threshold=0.8)
+    dedup.match_or_add(0, "Um hook qualquer sobre vendas", scope=0)
+    dedup.match_or_add(1, "Outro hook sobre vendas", scope=1)
+    dedup.discard_scope(0)
+    assert list(dedup._signatures) == [1]
+    assert all(1 in keys for buckets in dedup._buckets for keys in buckets.values())
+    assert dedup.match_or_add(2, "Um hook qualquer sobre vendas", scope=0) is None
+
+
+@pytest.mark.parametrize('provider', ['fake', 'auto'])
+def test_default_batch_keeps_every_requested_hook(tmp_path, monkeypatch, provider):
+    # Sem chave de API, 'auto' cai nos templates offline: as variações repetidas não podem sumir por padrão
+    for name in ('OPENAI_API_KEY', 'GEMINI_API_KEY', 'VIDEOBOT_DEDUP_THRESHOLD'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('VIDEOBOT_PROVIDER', provider)
+    products = tmp_path / 'produtos.jsonl'
+    products.write_text('{"name": "Curso A"}\n{"name": "Curso B"}\n', encoding='utf-8')
+    output = tmp_path / 'hooks.jsonl'
+    assert vb.cli_main(['batch', str(products), '-o', str(output), '--hooks', '4', '--frameworks', 'kennedy_pas_plus', '--cultures', 'pt-BR,en-US']) == 0
+    units = Counter((row.get('product_index'), row['framework'], row['culture'])
+                    for row in map(json.loads, output.read_text(encoding='utf-8').splitlines()))
+    assert len(units) == 4
+    assert set(units.values()) == {4}
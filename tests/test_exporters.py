@@ -0,0 +1,56 @@
+import csv
+import json
+
+import pytest
+
+import videobot_bestsellers as vb
+
+
+HOOKS = [
+    vb.Hook('Você sofre com "poucas vendas", hoje?', 'kennedy_pas_plus', 'pt-BR', viral_potential='HIGH', product='Curso, Teste',
+            product_index=0, variation=1, viral_score=0.5),
+    vb.Hook('Imagine: família\nunida', 'hormozi_grand_slam_offer', 'es-MX', source='copy', product_index=1, variation=2,
+            variation_type='pergunta', framework_element='dream_outcome', original_copy='copy original', viral_score=0.125)
+]
+SCRIPTS = [vb.Script(hook, hook.framework, hook.culture, (vb.Section('hook', hook.hook_text, 3), vb.Section('cta', 'Clique, já!', 2)), 5)
+           for hook in HOOKS]
+
+
+def export(path, kind, items):
+    with vb.build_exporter(path, kind) as exporter:
+        exporter.write_many(items)
+    assert exporter.count == len(items)
+
+
+@pytest.mark.parametrize('path', ['hooks.jsonl', 'hooks.jsonl.gz', 'hooks.jsonl.bz2'])
+def test_jsonl_round_trip(path):
+    export(path, 'hook', HOOKS)
+    export('scripts.' + path.split('.', 1)[1], 'script', SCRIPTS)
+    with vb._open_text_input(path) as f:
+        assert [vb.Hook.from_dict(json.loads(line)) for line in f] == HOOKS
+    with vb._open_text_input('scripts.' + path.split('.', 1)[1]) as f:
+        assert [vb.Script.from_dict(json.loads(line)) for line in f] == SCRIPTS
+
+
+@pytest.mark.parametrize('path', ['hooks.csv', 'hooks.csv.gz'])
+def test_csv_round_trip(path):
+    export(path, 'hook', HOOKS)
+    export('scripts.csv', 'script', SCRIPTS)
+    with vb._open_text_input(path) as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == vb.EXPORT_COLUMNS['hook']
+    types = {item.name: item.type for item in vb.fields(vb.Hook)}
+    assert [vb.Hook(**{name: types[name](value) for name, value in row.items()}) for row in rows] == HOOKS
+    with open('scripts.csv', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row, script in zip(rows, SCRIPTS):
+        assert row['hook_text'] == script.hook.hook_text
+        assert row['full_script'] == script.full_script
+        assert tuple(vb.Section.from_dict(section) for section in json.loads(row['sections'])) == script.sections
+        assert int(row['estimated_duration']) == script.estimated_duration
+
+
+def test_parquet_round_trip():
+    pq = pytest.importorskip('pyarrow.parquet')
+    export('hooks.parquet', 'hook', HOOKS)
+    assert [vb.Hook(**row) for row in pq.read_table('hooks.parquet').to_pylist()] == HOOKS
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    for name in ('OPENAI_API_KEY', 'GEMINI_API_KEY'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('VIDEOBOT_PROVIDER', 'auto')
+
+
+def read_hooks(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_completed_units(offline, monkeypatch):
+    with open('produtos.json', 'w', encoding='utf-8') as f:
+        json.dump([PRODUCT, dict(PRODUCT, name='Outro Curso')], f)
+    generated = []
+    generate_unit = vb.BestsellerBatchEngine.generate_unit
+    fail_second_product = True
+
+    async def tracked(self, product_index, *args, **kwargs):
+        if product_index == 1 and fail_second_product:
+            raise ValueError('provedor fora do ar')
+        generated.append(product_index)
+        return await generate_unit(self, product_index, *args, **kwargs)
+
+    monkeypatch.setattr(vb.BestsellerBatchEngine, 'generate_unit', tracked)
+    args = ['batch', '--frameworks', 'kennedy_pas_plus', '--cultures', 'pt-BR,en-US', '--hooks', '3', '--concurrency', '1']
+    assert vb.cli_main(args + ['produtos.json', '-o', 'parcial.jsonl']) == 1
+    assert generated == [0, 0]
+
+    fail_second_product = False
+    generated.clear()
+    assert vb.cli_main(['batch', '--resume', '-o', 'retomado.jsonl']) == 0
+    assert generated == [1, 1]
+
+    assert vb.cli_main(args + ['produtos.json', '-o', 'completo.jsonl']) == 0
+    resumed, fresh = read_hooks('retomado.jsonl'), read_hooks('completo.jsonl')
+    assert len(resumed) == 12
+    assert sorted(map(json.dumps, resumed)) == sorted(map(json.dumps, fresh))
+    assert vb.JobStore('bestseller_jobs.sqlite3').latest_job('batch') is None
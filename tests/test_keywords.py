@@ -0,0 +1,43 @@
+import re
+from collections import Counter
+
+import pytest
+
+import videobot_bestsellers as vb
+
+
+PATTERNS = ['na', 'ana', 'banana', 'sonho', 'sonhos', 'família', 'familia', 'já', 'agora']
+TEXTS = [
+    'banana bananas ananas',
+    'Seu sonho, nossos sonhos: a FAMÍLIA e a familia unidas já, agora e agora mesmo.',
+    'Nanananana! Ja, já e jamais; sonhossonhos.',
+    ''
+]
+
+
+def naive_counts(text: str, automaton: vb.KeywordAutomaton) -> Counter:
+    folded = automaton.fold(text)
+    counts = Counter()
+    for pattern in PATTERNS:
+        key = automaton.fold(pattern)
+        for start in range(len(folded) - len(key) + 1):
+            if not folded.startswith(key, start):
+                continue
+            end = start + len(key)
+            if automaton.word_boundary and (re.match(r'\w', folded[start]) and start and re.match(r'\w', folded[start - 1])
+                                            or re.match(r'\w', folded[end - 1]) and end < len(folded) and re.match(r'\w', folded[end])):
+                continue
+            counts[pattern] += 1
+    return counts
+
+
+@pytest.mark.parametrize('word_boundary', [False, True])
+@pytest.mark.parametrize('accent_insensitive', [False, True])
+@pytest.mark.parametrize('text', TEXTS)
+def test_automaton_counts_match_naive_overlapping_search(text, word_boundary, accent_insensitive):
+    automaton = vb.KeywordAutomaton(((pattern, pattern) for pattern in PATTERNS), word_boundary, accent_insensitive)
+    scan = vb.KeywordScan()
+    for match in automaton.iter_matches(text):
+        assert automaton.fold(text)[match.start:match.end] == automaton.fold(match.pattern)
+        scan.add(match)
+    assert +scan.counts == naive_counts(text, automaton)
@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import queue
+
+import videobot_bestsellers as vb
+
+
+def _child_log_handlers(message: str):
+    pipeline = vb.setup_log_pipeline()
+    logging.getLogger('videobot.child').warning(message)
+    return [type(handler).__name__ for handler in pipeline.listener.handlers]
+
+
+def test_queued_record_keeps_exception_for_json():
+    records = queue.SimpleQueue()
+    handler = vb.LogQueueHandler(records)
+    logger = logging.getLogger('videobot.test.exc')
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        try:
+            raise ValueError('falhou')
+        except ValueError:
+            logger.exception('erro no lote')
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+    data = json.loads(vb.JsonLogFormatter().format(records.get_nowait()))
+    assert data['message'] == 'erro no lote'
+    assert 'ValueError: falhou' in data['exc']
+
+
+def test_pool_workers_log_to_stderr_and_flush_on_exit(capfd):
+    message = f'worker-log-{os.getpid()}'
+    handlers = list(vb.ShardedExecutor('process', 2, chunksize=1).map(_child_log_handlers, [message] * 2))
+    assert all(names == ['StreamHandler'] for names in handlers)
+    assert capfd.readouterr().err.count(message) == 2
+    assert not os.path.exists('bestseller_videobot.log')
+
+
+def test_worker_log_path_is_per_worker(tmp_path):
+    previous = vb.setup_log_pipeline().path
+    path = vb.worker_log_path('w1')
+    assert path != previous
+    try:
+        vb.setup_log_pipeline(path)
+        logging.getLogger('videobot.test.worker').warning('só deste worker')
+    finally:
+        vb.setup_log_pipeline(previous)
+    with open(path, encoding='utf-8') as handle:
+        assert json.loads(handle.readline())['message'] == 'só deste worker'
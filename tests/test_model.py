@@ -0,0 +1,23 @@
+import json
+
+import videobot_bestsellers as vb
+
+
+def test_hook_and_script_survive_json_round_trip():
+    hook = vb.Hook('Você sofre com poucas vendas?', 'kennedy_pas_plus', 'pt-BR', source='copy', viral_potential='HIGH',
+                   product='Curso Teste', product_index=3, variation=2, variation_type='pergunta',
+                   framework_element='problem', original_copy='copy original', viral_score=0.625)
+    script = vb.Script(hook, 'kennedy_pas_plus', 'pt-BR',
+                       (vb.Section('hook', hook.hook_text, 3), vb.Section('cta', 'Clique no link', 2)), 5)
+    assert vb.Hook.from_dict(json.loads(json.dumps(hook.to_dict()))) == hook
+    assert vb.Script.from_dict(json.loads(json.dumps(script.to_dict()))) == script
+    minimal = vb.Hook('Texto', 'hormozi_grand_slam_offer', 'en-US')
+    assert minimal.to_dict() == {'hook_text': 'Texto', 'viral_potential': 'MEDIUM', 'framework': 'hormozi_grand_slam_offer',
+                                 'culture': 'en-US', 'source': 'product'}
+    assert vb.Hook.from_dict(minimal.to_dict()) == minimal
+
+
+def test_from_generated_ignores_unknown_keys_and_applies_overrides():
+    generated = {'hook_text': 'Texto', 'framework': 'x', 'culture': 'pt-BR', 'extra': 1}
+    hook = vb.Hook.from_generated(generated, framework='kennedy_pas_plus', product_index=7)
+    assert (hook.framework, hook.product_index) == ('kennedy_pas_plus', 7)
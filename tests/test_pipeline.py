@@ -0,0 +1,15 @@
+import asyncio
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT
+
+
+def test_pipeline_survives_failing_on_script(config):
+    def broken(script):
+        raise OSError("disco cheio")
+
+    scripts = vb.BestsellerScriptGenerator(config, vb.FakeProvider(config), vb.ResponseCache(None))
+    pipeline = vb.ScriptPipeline(scripts, config, concurrency=2, queue_size=2, on_script=broken, log=lambda message, progress=False: None)
+    hooks = [vb.Hook(f"hook {i}", 'hormozi_grand_slam_offer', 'pt-BR') for i in range(10)]
+    asyncio.run(asyncio.wait_for(pipeline.run(hooks, PRODUCT), 30))
+    assert pipeline.failed == 10
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import videobot_bestsellers as vb
+from conftest import collect
+
+
+class FlakyProvider(vb.FakeProvider):
+    def __init__(self, config, failures: int, retryable: bool = True, fail_after_first_chunk: bool = False):
+        super().__init__(config)
+        self.failures = failures
+        self.retryable = retryable
+        self.fail_after_first_chunk = fail_after_first_chunk
+        self.attempts = 0
+
+    async def _complete(self, prompt, system, max_tokens, temperature):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise vb.ProviderError("falha simulada", retryable=self.retryable)
+        return await super()._complete(prompt, system, max_tokens, temperature)
+
+    async def _stream(self, prompt, system, max_tokens, temperature):
+        if self.fail_after_first_chunk:
+            self.attempts += 1
+            yield "1. parcial"
+            raise vb.ProviderError("conexão caiu", retryable=True)
+        async for chunk in super()._stream(prompt, system, max_tokens, temperature):
+            yield chunk
+
+
+def test_complete_retries_retryable_errors(config):
+    provider = FlakyProvider(config, failures=2)
+    assert asyncio.run(provider.complete("prompt"))
+    assert provider.attempts == 3
+
+
+def test_complete_gives_up_on_non_retryable_errors(config):
+    provider = FlakyProvider(config, failures=1, retryable=False)
+    with pytest.raises(vb.ProviderError):
+        asyncio.run(provider.complete("prompt"))
+    assert provider.attempts == 1
+
+
+def test_complete_stops_after_max_retries(config):
+    provider = FlakyProvider(config, failures=10)
+    with pytest.raises(vb.ProviderError):
+        asyncio.run(provider.complete("prompt"))
+    assert provider.attempts == config.max_retries + 1
+
+
+def test_stream_retries_before_first_chunk(config):
+    provider = FlakyProvider(config, failures=1)
+    assert ''.join(asyncio.run(collect(provider.stream("prompt"))))
+    assert provider.attempts == 2
+
+
+def test_stream_does_not_retry_after_first_chunk(config):
+    provider = FlakyProvider(config, failures=0, fail_after_first_chunk=True)
+    with pytest.raises(vb.ProviderError):
+        asyncio.run(collect(provider.stream("prompt")))
+    assert provider.attempts == 1
+
+
+def test_openai_aclose_drops_client(config):
+    class Client:
+        closed = False
+
+        async def close(self):
+            self.closed = True
+
+    config.apis['openai'] = 'sk-teste'
+    provider = vb.OpenAIProvider(config)
+    client = provider._client = Client()
+    asyncio.run(provider.aclose())
+    assert client.closed
+    assert provider._client is None
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT, hook_generator
+
+
+@pytest.fixture
+def work_queue(tmp_path, config):
+    engine = vb.BestsellerBatchEngine(config, hook_generator(config))
+    queue = vb.WorkQueue(str(tmp_path / 'fila.sqlite3'), 'teste', lease_seconds=60, max_attempts=2)
+    queue.enqueue(engine.build_matrix([PRODUCT], ['hormozi_grand_slam_offer'], ['pt-BR', 'en-US']), 3)
+    yield queue
+    queue.close()
+
+
+def test_claimed_unit_is_not_claimed_twice(work_queue):
+    first = work_queue.claim('a', 1)
+    second = work_queue.claim('b', 5)
+    assert len(first) == len(second) == 1
+    assert first[0].key != second[0].key
+    assert work_queue.claim('c', 5) == []
+
+
+def test_expired_lease_is_reclaimed(work_queue):
+    work_queue.lease_seconds = -1
+    lost = work_queue.claim('a', 1)[0]
+    work_queue.lease_seconds = 60
+    reclaimed = [unit for unit in work_queue.claim('b', 5) if unit.key == lost.key]
+    assert reclaimed and reclaimed[0].attempts == 2
+    assert not work_queue.complete('a', lost.key, [])
+    assert work_queue.complete('b', lost.key, [])
+
+
+def test_heartbeat_reports_lost_units(work_queue):
+    unit = work_queue.claim('a', 1)[0]
+    assert work_queue.heartbeat('a', [unit.key]) == {unit.key}
+    assert work_queue.heartbeat('b', [unit.key]) == set()
+
+
+def test_failures_requeue_until_attempts_run_out(work_queue):
+    unit = work_queue.claim('a', 1)[0]
+    work_queue.fail('a', unit.key, "erro")
+    again = [u for u in work_queue.claim('a', 5) if u.key == unit.key][0]
+    work_queue.fail('a', again.key, "erro")
+    assert work_queue.counts()[vb.UNIT_FAILED] == 1
+    assert work_queue.failures() == [(unit.key, "erro")]
+
+
+def test_release_returns_unit_without_spending_attempt(work_queue):
+    unit = work_queue.claim('a', 1)[0]
+    work_queue.release('a', [unit.key])
+    assert [u.attempts for u in work_queue.claim('b', 5) if u.key == unit.key] == [1]
+
+
+def test_queue_worker_results_match_batch(tmp_path, config):
+    generator = hook_generator(config)
+    engine = vb.BestsellerBatchEngine(config, generator)
+    queue = vb.WorkQueue(str(tmp_path / 'fila.sqlite3'), 'teste')
+    queue.enqueue(engine.build_matrix([PRODUCT], ['hormozi_grand_slam_offer', 'kennedy_pas_plus'], ['pt-BR']), 5)
+    worker = vb.QueueWorker(config, queue, 'w1', engine=engine, concurrency=2, poll_seconds=0.01)
+    assert asyncio.run(worker.run_async()) == 2
+    queued = list(queue.iter_hooks(vb.HookDeduplicator(threshold=0.8)))
+    batch = engine.run([PRODUCT], ['hormozi_grand_slam_offer', 'kennedy_pas_plus'], ['pt-BR'], 5, dedup=vb.HookDeduplicator(threshold=0.8))
+    queue.close()
+    assert sorted(hook.hook_text for hook in queued) == sorted(hook.hook_text for hook in batch)
+
+
+def test_iter_hooks_pages_through_done_units_in_order(tmp_path, config, monkeypatch):
+    generator = hook_generator(config)
+    engine = vb.BestsellerBatchEngine(config, generator)
+    queue = vb.WorkQueue(str(tmp_path / 'fila.sqlite3'), 'teste')
+    products = [dict(PRODUCT, name=f'Produto {index}') for index in range(3)]
+    queue.enqueue(engine.build_matrix(products, ['hormozi_grand_slam_offer', 'kennedy_pas_plus'], ['pt-BR']), 3)
+    worker = vb.QueueWorker(config, queue, 'w1', engine=engine, concurrency=3, poll_seconds=0.01)
+    assert asyncio.run(worker.run_async()) == 6
+    whole = list(queue.iter_hooks())
+    monkeypatch.setattr(vb, 'QUEUE_EXPORT_PAGE', 2)
+    paged = list(queue.iter_hooks())
+    queue.close()
+    assert paged == whole
+    assert len(paged) == 18
+    assert [hook.product_index for hook in paged] == sorted(hook.product_index for hook in paged)
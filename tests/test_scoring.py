@@ -0,0 +1,40 @@
+import json
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT, hook_generator
+
+
+def test_top_k_limits_scripts_per_unit(config):
+    generator = hook_generator(config)
+    engine = vb.BestsellerBatchEngine(config, generator, concurrency=2)
+    scripts = []
+    pipeline = vb.ScriptPipeline(vb.BestsellerScriptGenerator(config, generator.provider, generator.cache), config, on_script=scripts.append)
+    hooks = []
+    engine.run([PRODUCT], ['hormozi_grand_slam_offer'], ['pt-BR', 'en-US'], 5, on_hook=hooks.append, script_pipeline=pipeline, top_k=2)
+    assert len(scripts) == 4
+    for culture in ('pt-BR', 'en-US'):
+        best = sorted((hook.viral_score for hook in hooks if hook.culture == culture), reverse=True)[:2]
+        assert sorted((script.hook.viral_score for script in scripts if script.culture == culture), reverse=True) == best
+
+
+def test_rank_skips_malformed_lines(config):
+    vb._init_scorer_worker()
+    good = json.dumps(vb.Hook("Um hook válido", 'hormozi_grand_slam_offer', 'pt-BR').to_dict())
+    lines = [good, '{quebrado', '{"hook_text": "sem cultura", "framework": "hormozi_grand_slam_offer"}', '[1, 2]',
+             '{"hook_text": null, "framework": "hormozi_grand_slam_offer", "culture": "pt-BR"}']
+    candidates, labels, invalid = vb._rank_hook_lines((lines, 3))
+    assert [hook.hook_text for hook in candidates] == ["Um hook válido"]
+    assert sum(labels.values()) == 1
+    assert invalid == 4
+
+
+def test_batch_scores_each_unit_in_one_call(config, monkeypatch):
+    engine = vb.BestsellerBatchEngine(config, hook_generator(config), concurrency=2)
+    batches = []
+    score_hooks = engine.scorer.score_hooks
+    monkeypatch.setattr(engine.scorer, 'score_hooks', lambda hooks: batches.append(len(hooks)) or score_hooks(hooks))
+    hooks = []
+    engine.run([PRODUCT], ['hormozi_grand_slam_offer', 'kennedy_pas_plus'], ['pt-BR', 'en-US'], 5, on_hook=hooks.append)
+    assert batches == [5, 5, 5, 5]
+    assert len(hooks) == 20
+    assert all(hook.viral_score > 0 for hook in hooks)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT
+
+
+PRODUCTS = [dict(PRODUCT, name=f'Produto {index}', problem=f'problema {index % 7}') for index in range(150)]
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_executor_keeps_input_order():
+    assert list(vb.ShardedExecutor('process', 3, chunksize=4).map(abs, range(-50, 0))) == list(range(50, 0, -1))
+
+
+@pytest.mark.parametrize('mode', vb.EXECUTOR_MODES)
+def test_sharded_render_matches_serial_render(mode):
+    with open('produtos.jsonl', 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(product, ensure_ascii=False) + '\n' for product in PRODUCTS)
+    args = ['render', 'produtos.jsonl', '--cultures', 'pt-BR,de-DE']
+    assert vb.cli_main(args + ['-o', 'serial.jsonl', '--workers', '1']) == 0
+    assert vb.cli_main(args + ['-o', 'sharded.jsonl', '--workers', '3', '--mode', mode]) == 0
+    assert read('sharded.jsonl') == read('serial.jsonl')
+    assert read('serial.jsonl').count('\n') == len(PRODUCTS) * 2 * 4
+
+
+def test_sharded_rank_matches_serial_rank():
+    renderer = vb.TemplateRenderer(vb.BestsellerConfig())
+    with open('hooks.jsonl', 'w', encoding='utf-8') as f:
+        for item in renderer.render_batch(PRODUCTS[:40], cultures=['pt-BR', 'en-US']):
+            for variation, line in enumerate(item['copy'].splitlines()):
+                hook = vb.Hook(line, item['framework'], item['culture'], product=item['product'],
+                               product_index=item['product_index'], variation=variation)
+                f.write(json.dumps(hook.to_dict(), ensure_ascii=False) + '\n')
+    args = ['rank', 'hooks.jsonl', '--top', '3', '--batch-size', '50']
+    assert vb.cli_main(args + ['-o', 'serial.jsonl', '--workers', '1']) == 0
+    assert vb.cli_main(args + ['-o', 'sharded.jsonl', '--workers', '3', '--mode', 'process']) == 0
+    assert read('sharded.jsonl') == read('serial.jsonl')
+    assert read('serial.jsonl').count('\n') == 40 * 2 * 4 * 3
+
+
+def test_sharded_corpus_analysis_matches_serial():
+    with open('corpus.jsonl', 'w', encoding='utf-8') as f:
+        for index, product in enumerate(PRODUCTS[:60]):
+            f.write(json.dumps({'id': index, 'copy': f"Você sofre com {product['problem']}? {product['name']} resolve com {product['solution']}."}) + '\n')
+    serial = list(vb.analyze_corpus('corpus.jsonl', processes=1, mode='thread'))
+    assert list(vb.analyze_corpus('corpus.jsonl', processes=3, chunksize=8, mode='process')) == serial
+    assert [result['id'] for result in serial] == [str(index) for index in range(60)]
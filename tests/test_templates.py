@@ -0,0 +1,37 @@
+import pytest
+
+import videobot_bestsellers as vb
+from conftest import PRODUCT
+
+
+def legacy_monster_example(product_info, currency):
+    # Texto montado à mão pela versão anterior a CompiledTemplate
+    template = (
+        "🔬 {scientific_claim}\n"
+        "🏆 {brand_authority}\n"
+        "💔 {emotional_trigger}\n"
+        "📖 {transformation_story}\n"
+        "🎁 {grand_slam_offer}\n"
+        "⭐ {superior_value}\n"
+        "👥 {mass_appeal}\n"
+        "⚠️ {urgency_pas}\n"
+        "✅ {risk_reversal}\n"
+    )
+    return template.format(
+        scientific_claim=f"COMPROVADO: {product_info.get('name','Este método')} funciona",
+        brand_authority=f"Usado por especialistas em {product_info.get('niche','marketing')}",
+        emotional_trigger=f"Você já sentiu a frustração de {product_info.get('problem','não ter resultados')}?",
+        transformation_story=f"Eu era igual você até descobrir {product_info.get('solution','esta solução')}",
+        grand_slam_offer=f"Como {product_info.get('avatar','você')} pode {product_info.get('solution','resolver isso')}",
+        superior_value=f"Enquanto outros cobram {currency}5.000+, acesso completo",
+        mass_appeal="Milhares já comprovaram",
+        urgency_pas="PROBLEMA → CONSEQUÊNCIA → SOLUÇÃO → AÇÃO",
+        risk_reversal="Garantia total"
+    )
+
+
+@pytest.mark.parametrize('product', [PRODUCT, {}, {'name': '100% Vendas {VIP}', 'problem': 'taxa de 50%'}])
+def test_compiled_monster_template_matches_legacy_text(config, product):
+    demo = vb.MonsterFrameworkDemo(config)
+    for culture_code, culture_data in config.cultures.items():
+        assert demo.generate_monster_example(product, culture_code) == legacy_monster_example(product, culture_data.currency)
@@ -8,29 +8,71 @@ Versão: 2.0 - Unificado e Expandido
 """
 
 import os
+import re
+import sys
+import copy
+import heapq
+import zlib
+import csv
 import json
+import math
+import time
+import random
+import string
+import hashlib
+import socket
+import sqlite3
 import asyncio
+import argparse
+import functools
+import itertools
+import queue
+import bisect
+import unicodedata
+import importlib
+import importlib.util
+import atexit
 import logging
+import logging.handlers
 import threading
-from typing import Dict, List
-from dataclasses import dataclass
+import contextlib
+import contextvars
+import concurrent.futures
+import multiprocessing
+import multiprocessing.pool
+import multiprocessing.util
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
 
-# APIs (opcionais)
-try:
-    import openai
-except ImportError:
-    openai = None
+# GUI (importada só quando a janela abre, ver _import_tkinter)
+tk = ttk = messagebox = filedialog = scrolledtext = tkfont = None
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
 
-# GUI
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from tkinter import scrolledtext
+@functools.lru_cache(maxsize=None)
+def optional_import(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _import_tkinter():
+    # Os comandos headless nunca carregam o tkinter; só a GUI chama isto
+    global tk, ttk, messagebox, filedialog, scrolledtext, tkfont
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog, scrolledtext
+    from tkinter import font as tkfont
 
 
 # =============================================
@@ -47,6 +89,331 @@ class CultureData:
     preferred_communication: str
     emotional_intensity: float
     family_focus: float
+    flag: str = ''
+    characteristics: str = ''
+    analysis_triggers: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.flag} {self.name}".strip()
+
+
+CULTURE_FIELD_NAMES = frozenset(item.name for item in fields(CultureData))
+DEFAULT_CULTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cultures.json')
+
+
+class CultureRegistry(Mapping):
+    # Índice por código de idioma lido no primeiro acesso; cada CultureData é montada sob demanda
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = None
+        self._by_language: Dict[str, str] = {}
+        self._loaded: Dict[str, CultureData] = {}
+
+    def _index(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    entries = data.get('cultures', data)
+                    for code in entries:
+                        self._by_language.setdefault(code.split('-')[0].lower(), code)
+                    self._entries = entries
+        return self._entries
+
+    def __getitem__(self, code: str) -> CultureData:
+        culture = self._loaded.get(code)
+        if culture is None:
+            entry = self._index()[code]
+            culture = CultureData(language_code=code, **{key: value for key, value in entry.items() if key in CULTURE_FIELD_NAMES and key != 'language_code'})
+            culture = self._loaded.setdefault(code, culture)
+        return culture
+
+    def __contains__(self, code) -> bool:
+        return code in self._index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def resolve(self, code: str) -> str:
+        if code in self:
+            return code
+        return self._by_language.get(code.split('-')[0].lower())
+
+
+_culture_registries: Dict[str, CultureRegistry] = {}
+_culture_registries_lock = threading.Lock()
+
+
+def get_culture_registry(path: str = DEFAULT_CULTURES_PATH) -> CultureRegistry:
+    # Um registro por arquivo: análise e geração enxergam as mesmas culturas
+    key = os.path.abspath(path)
+    with _culture_registries_lock:
+        registry = _culture_registries.get(key)
+        if registry is None:
+            registry = _culture_registries[key] = CultureRegistry(key)
+        return registry
+
+
+# =============================================
+# 1.1 MODELO DE DADOS (hooks e scripts)
+# =============================================
+
+_INTERNED_HOOK_FIELDS = ('framework', 'culture', 'source', 'viral_potential', 'product', 'variation_type', 'framework_element')
+
+
+@dataclass(frozen=True, slots=True)
+class Hook:
+    hook_text: str
+    framework: str
+    culture: str
+    source: str = 'product'
+    viral_potential: str = 'MEDIUM'
+    product: str = ''
+    product_index: int = -1
+    variation: int = 0
+    variation_type: str = ''
+    framework_element: str = ''
+    original_copy: str = ''
+    viral_score: float = 0.0
+
+    def __post_init__(self):
+        # Milhões de hooks repetem poucas chaves: compartilham a mesma string
+        for name in _INTERNED_HOOK_FIELDS:
+            object.__setattr__(self, name, sys.intern(getattr(self, name)))
+
+    @classmethod
+    def from_generated(cls, generated: Dict, **overrides) -> 'Hook':
+        data = {key: value for key, value in generated.items() if key in HOOK_FIELD_NAMES}
+        data.update(overrides)
+        return cls(**data)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Hook':
+        return cls(**{key: value for key, value in data.items() if key in HOOK_FIELD_NAMES})
+
+    def to_dict(self) -> Dict:
+        data = {'hook_text': self.hook_text, 'viral_potential': self.viral_potential,
+                'framework': self.framework, 'culture': self.culture, 'source': self.source}
+        for name, default in _OPTIONAL_HOOK_DEFAULTS.items():
+            value = getattr(self, name)
+            if value != default:
+                data[name] = value
+        return data
+
+
+HOOK_FIELD_NAMES = frozenset(field.name for field in fields(Hook))
+_OPTIONAL_HOOK_DEFAULTS = {field.name: field.default for field in fields(Hook)
+                           if field.name in ('product', 'product_index', 'variation', 'variation_type', 'framework_element', 'original_copy', 'viral_score')}
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    section_name: str
+    content: str
+    duration_estimate: int
+
+    def __post_init__(self):
+        object.__setattr__(self, 'section_name', sys.intern(self.section_name))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Section':
+        return cls(data['section_name'], data['content'], int(data.get('duration_estimate', 0)))
+
+    def to_dict(self) -> Dict:
+        return {'section_name': self.section_name, 'content': self.content, 'duration_estimate': self.duration_estimate}
+
+
+@dataclass(frozen=True, slots=True)
+class Script:
+    hook: Hook
+    framework_used: str
+    culture: str
+    sections: Tuple[Section, ...]
+    estimated_duration: int
+
+    def __post_init__(self):
+        object.__setattr__(self, 'framework_used', sys.intern(self.framework_used))
+        object.__setattr__(self, 'culture', sys.intern(self.culture))
+
+    @property
+    def full_script(self) -> str:
+        return '\n\n'.join(section.content for section in self.sections)
+
+    @classmethod
+    def from_generated(cls, hook: Hook, generated: Dict) -> 'Script':
+        return cls(
+            hook=hook,
+            framework_used=generated['framework_used'],
+            culture=generated['culture'],
+            sections=tuple(Section.from_dict(section) for section in generated['sections']),
+            estimated_duration=int(generated.get('estimated_duration', 0))
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict, hook: Hook = None) -> 'Script':
+        return cls.from_generated(hook or Hook.from_dict(data['hook_data']), data)
+
+    def to_dict(self) -> Dict:
+        return {
+            'framework_used': self.framework_used,
+            'culture': self.culture,
+            'full_script': self.full_script,
+            'sections': [section.to_dict() for section in self.sections],
+            'estimated_duration': self.estimated_duration,
+            'hook_data': self.hook.to_dict()
+        }
+
+
+# =============================================
+# 1.2 LOGGING (fila + rotação + JSON)
+# =============================================
+
+current_job_id: contextvars.ContextVar = contextvars.ContextVar('videobot_job_id', default='')
+
+_LOG_RECORD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'job_id', 'progress'}
+
+
+def new_job_id(kind: str) -> str:
+    return f"{kind}-{datetime.now():%Y%m%d-%H%M%S}-{random.getrandbits(24):06x}"
+
+
+class JobContextFilter(logging.Filter):
+    # Roda na thread que gerou o registro, onde o contextvar do job ainda é visível
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'job_id'):
+            record.job_id = current_job_id.get()
+        return True
+
+
+class ProgressSampler(logging.Filter):
+    # Linhas de progresso por item (extra={'progress': True}) passam 1 a cada N
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'progress', False):
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if getattr(record, 'job_id', ''):
+            data['job_id'] = record.job_id
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_FIELDS:
+                data[key] = value
+        exc = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        if exc:
+            data['exc'] = exc
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    # O QueueHandler padrão embute o traceback na mensagem e zera exc_info; aqui ele segue em exc_text
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _LogPipeline:
+    __slots__ = ('pid', 'path', 'handler', 'listener')
+
+    def __init__(self, pid: int, path: Optional[str], handler: logging.Handler, listener: logging.handlers.QueueListener):
+        self.pid = pid
+        self.path = path
+        self.handler = handler
+        self.listener = listener
+
+
+_log_pipeline: _LogPipeline = None
+_log_pipeline_lock = threading.Lock()
+
+
+def _build_log_file_handler(path: str) -> logging.Handler:
+    when = os.getenv('VIDEOBOT_LOG_ROTATE_WHEN', '')
+    backups = int(os.getenv('VIDEOBOT_LOG_BACKUPS', '5'))
+    if when:
+        handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups, encoding='utf-8')
+    else:
+        max_bytes = int(float(os.getenv('VIDEOBOT_LOG_MAX_MB', '10')) * 1024 * 1024)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    if os.getenv('VIDEOBOT_LOG_FORMAT', 'json') == 'json':
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - [%(job_id)s] %(message)s'))
+    return handler
+
+
+def worker_log_path(name: str) -> str:
+    # Cada worker da fila escreve (e rotaciona) o seu próprio arquivo: bestseller_videobot.<nome>.log
+    root, ext = os.path.splitext(os.getenv('VIDEOBOT_LOG_PATH', 'bestseller_videobot.log'))
+    return f"{root}.{name}{ext or '.log'}"
+
+
+def _in_pool_worker() -> bool:
+    return multiprocessing.parent_process() is not None
+
+
+def setup_log_pipeline(path: str = None) -> _LogPipeline:
+    # Quem loga só enfileira; arquivo e console são escritos pela thread do QueueListener
+    global _log_pipeline
+    with _log_pipeline_lock:
+        previous = _log_pipeline
+        if previous is not None and previous.pid == os.getpid() and path in (None, previous.path):
+            return previous
+        root = logging.getLogger()
+        if previous is not None:
+            root.removeHandler(previous.handler)
+            if previous.pid == os.getpid():
+                # Troca de arquivo no mesmo processo: o listener antigo esvazia a fila antes de sair
+                previous.listener.stop()
+                atexit.unregister(previous.listener.stop)
+            # Processo filho (fork): a thread do listener do pai não existe aqui, recria a fila
+        pool_worker = path is None and _in_pool_worker()
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        handlers = [console]
+        if not pool_worker:
+            # Processos do pool não abrem o arquivo do pai: dois RotatingFileHandler no mesmo arquivo se atropelam na rotação
+            path = path or os.getenv('VIDEOBOT_LOG_PATH', 'bestseller_videobot.log')
+            handlers.insert(0, _build_log_file_handler(path))
+        log_queue = queue.SimpleQueue()
+        handler = LogQueueHandler(log_queue)
+        handler.addFilter(JobContextFilter())
+        handler.addFilter(ProgressSampler(int(os.getenv('VIDEOBOT_LOG_PROGRESS_SAMPLE', '10'))))
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        if pool_worker:
+            # Workers do pool saem sem passar pelo atexit; o finalizador do multiprocessing roda na saída deles
+            multiprocessing.util.Finalize(None, listener.stop, exitpriority=10)
+        else:
+            atexit.register(listener.stop)
+        root.setLevel(logging.INFO)
+        root.addHandler(handler)
+        _log_pipeline = _LogPipeline(os.getpid(), path, handler, listener)
+        return _log_pipeline
 
 
 class BestsellerConfig:
@@ -56,14 +423,7 @@ class BestsellerConfig:
         self.setup_cultures()
 
     def setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('bestseller_videobot.log'),
-                logging.StreamHandler()
-            ]
-        )
+        setup_log_pipeline()
         self.logger = logging.getLogger(__name__)
 
     def load_environment(self):
@@ -73,248 +433,2643 @@ class BestsellerConfig:
         }
         if not self.apis['openai'] and not self.apis['gemini']:
             self.logger.warning("Nenhuma API de IA configurada (OPENAI_API_KEY/GEMINI_API_KEY)")
+        self.max_concurrency = max(1, int(os.getenv('VIDEOBOT_MAX_CONCURRENCY', '8')))
+        self.provider_name = os.getenv('VIDEOBOT_PROVIDER', 'auto')
+        self.rate_limit = float(os.getenv('VIDEOBOT_RATE_LIMIT', '5'))
+        self.rate_burst = int(os.getenv('VIDEOBOT_RATE_BURST', '10'))
+        self.max_retries = int(os.getenv('VIDEOBOT_MAX_RETRIES', '4'))
+        self.cache_enabled = os.getenv('VIDEOBOT_CACHE', '1') != '0'
+        self.cache_path = os.getenv('VIDEOBOT_CACHE_PATH', 'bestseller_cache.sqlite3')
+        self.cache_ttl = float(os.getenv('VIDEOBOT_CACHE_TTL', str(7 * 24 * 3600)))
+        self.cache_max_bytes = int(float(os.getenv('VIDEOBOT_CACHE_MAX_MB', '256')) * 1024 * 1024)
+        self.cultures_path = os.getenv('VIDEOBOT_CULTURES', DEFAULT_CULTURES_PATH)
+        self.jobs_path = os.getenv('VIDEOBOT_JOBS_PATH', 'bestseller_jobs.sqlite3')
+        self.dedup_threshold = float(os.getenv('VIDEOBOT_DEDUP_THRESHOLD', '0'))
+        self.workers = int(os.getenv('VIDEOBOT_WORKERS', '0')) or os.cpu_count() or 1
+        self.executor_mode = os.getenv('VIDEOBOT_EXECUTOR', 'process')
+        self.queue_path = os.getenv('VIDEOBOT_QUEUE_PATH', 'bestseller_queue.sqlite3')
+        self.queue_lease = float(os.getenv('VIDEOBOT_QUEUE_LEASE', '120'))
+        self.queue_max_attempts = int(os.getenv('VIDEOBOT_QUEUE_MAX_ATTEMPTS', '3'))
+
+    def setup_cultures(self):
+        self.cultures: CultureRegistry = get_culture_registry(self.cultures_path)
+
+
+# =============================================
+# 2. FRAMEWORKS
+# =============================================
+
+class BestsellerFrameworks:
+    def __init__(self):
+        self.frameworks: Dict[str, Dict] = {
+            'hormozi_grand_slam_offer': {
+                'name': 'Hormozi Grand Slam Offer',
+                'expert': 'Alex Hormozi',
+                'book': '$100M Offers',
+                'focus': 'Ofertas irresistíveis',
+                'structure': ['dream_outcome', 'perceived_likelihood', 'time_delay', 'effort_sacrifice'],
+                'template': (
+                    "DREAM OUTCOME: {dream_outcome}\n"
+                    "LIKELIHOOD: {social_proof}\n"
+                    "TIME DELAY: {time_promise}\n"
+                    "EFFORT: {ease_promise}\n"
+                ),
+                'era': 'Moderna'
+            },
+            'brunson_epiphany_bridge': {
+                'name': 'Brunson Epiphany Bridge',
+                'expert': 'Russell Brunson',
+                'book': 'Expert Secrets',
+                'focus': 'Story selling',
+                'structure': ['backstory', 'wall', 'epiphany_experience', 'plan', 'achievement'],
+                'template': (
+                    "BACKSTORY: {relatable_situation}\n"
+                    "WALL: {major_obstacle}\n"
+                    "EPIPHANY: {breakthrough}\n"
+                    "PLAN: {method}\n"
+                    "ACHIEVEMENT: {result}\n"
+                ),
+                'era': 'Moderna'
+            },
+            'kennedy_pas_plus': {
+                'name': 'Kennedy PAS Plus',
+                'expert': 'Dan Kennedy',
+                'book': 'Ultimate Marketing Plan',
+                'focus': 'Problem-Agitate-Solve',
+                'structure': ['problem', 'agitate', 'solve', 'proof', 'close'],
+                'template': (
+                    "PROBLEM: {problem}\n"
+                    "AGITATE: {consequences}\n"
+                    "SOLVE: {solution}\n"
+                    "PROOF: {evidence}\n"
+                    "CLOSE: {cta}\n"
+                ),
+                'era': 'Clássica'
+            },
+            'monster_supreme_framework': {
+                'name': 'MONSTER Supreme',
+                'expert': 'Synthesis',
+                'book': 'Composite',
+                'focus': 'Combinação suprema',
+                'structure': ['scientific_claim','brand_authority','emotional_trigger','transformation_story','grand_slam_offer','superior_value','mass_appeal','urgency_pas','risk_reversal'],
+                'template': (
+                    "🔬 {scientific_claim}\n"
+                    "🏆 {brand_authority}\n"
+                    "💔 {emotional_trigger}\n"
+                    "📖 {transformation_story}\n"
+                    "🎁 {grand_slam_offer}\n"
+                    "⭐ {superior_value}\n"
+                    "👥 {mass_appeal}\n"
+                    "⚠️ {urgency_pas}\n"
+                    "✅ {risk_reversal}\n"
+                ),
+                'era': 'Ultimate'
+            }
+        }
+        self._compiled: Dict[str, 'CompiledTemplate'] = {}
+
+    def compiled_template(self, framework: str) -> 'CompiledTemplate':
+        compiled = self._compiled.get(framework)
+        if compiled is None:
+            compiled = self._compiled[framework] = CompiledTemplate(self.frameworks[framework]['template'], FRAMEWORK_SLOT_TEMPLATES)
+        return compiled
+
+
+def resolve_matrix_axes(config: BestsellerConfig, registry: BestsellerFrameworks, frameworks: List[str] = None,
+                        cultures: List[str] = None) -> Tuple[List[str], List[str]]:
+    # Eixos da matriz framework × cultura: vazio vira todos, apelidos de cultura são resolvidos, desconhecidos falham juntos
+    frameworks = frameworks or list(registry.frameworks.keys())
+    cultures = [config.cultures.resolve(c) or c for c in cultures] if cultures else list(config.cultures.keys())
+    unknown = [fw for fw in frameworks if fw not in registry.frameworks]
+    unknown += [c for c in cultures if c not in config.cultures]
+    if unknown:
+        raise ValueError(f"Framework/cultura desconhecido: {', '.join(unknown)}")
+    return frameworks, cultures
+
+
+# =============================================
+# 2.1 TEMPLATES (compilados uma vez, renderização offline)
+# =============================================
+
+# Conteúdo padrão de cada slot dos templates, escrito sobre os campos do produto
+FRAMEWORK_SLOT_TEMPLATES: Dict[str, str] = {
+    'dream_outcome': "{solution} para {avatar}",
+    'social_proof': "Milhares já comprovaram {name}",
+    'time_promise': "Resultados em pouco tempo",
+    'ease_promise': "Sem esforço: {name} faz o trabalho pesado",
+    'relatable_situation': "Eu era igual {avatar}: {problem}",
+    'major_obstacle': "Tentei de tudo e nada funcionava",
+    'breakthrough': "Até descobrir {solution}",
+    'method': "{name}: o passo a passo simples",
+    'result': "Hoje eu conquistei {solution}",
+    'problem': "Você sofre com {problem}?",
+    'consequences': "Cada dia sem agir, o problema fica pior",
+    'solution': "{name} resolve com {solution}",
+    'evidence': "Comprovado por especialistas em {niche}",
+    'cta': "Clique no link e comece agora",
+    'scientific_claim': "COMPROVADO: {name} funciona",
+    'brand_authority': "Usado por especialistas em {niche}",
+    'emotional_trigger': "Você já sentiu a frustração de {problem}?",
+    'transformation_story': "Eu era igual você até descobrir {solution}",
+    'grand_slam_offer': "Como {avatar} pode {offer_solution}",
+    'superior_value': "Enquanto outros cobram {currency}5.000+, acesso completo",
+    'mass_appeal': "Milhares já comprovaram",
+    'urgency_pas': "PROBLEMA → CONSEQUÊNCIA → SOLUÇÃO → AÇÃO",
+    'risk_reversal': "Garantia total"
+}
+
+
+class TemplateValues(dict):
+    # Campo sem valor continua visível no texto em vez de quebrar o lote
+    def __missing__(self, key: str) -> str:
+        return '{' + key + '}'
+
+
+def template_values(product_info: Dict) -> TemplateValues:
+    return TemplateValues(
+        name=product_info.get('name', 'Este método'),
+        niche=product_info.get('niche', 'marketing'),
+        problem=product_info.get('problem', 'não ter resultados'),
+        solution=product_info.get('solution', 'esta solução'),
+        offer_solution=product_info.get('solution', 'resolver isso'),
+        avatar=product_info.get('avatar', 'você')
+    )
+
+
+class CompiledTemplate:
+    __slots__ = ('source', 'fields', '_format')
+
+    def __init__(self, source: str, slots: Dict[str, str] = None):
+        parts: List[str] = []
+        names: List[str] = []
+        for literal, name, format_spec, conversion in string.Formatter().parse(source):
+            parts.append(literal.replace('%', '%%'))
+            if name is None:
+                continue
+            if format_spec or conversion:
+                raise ValueError(f"Template com formatação não suportada: {{{name}}}")
+            if slots and name in slots:
+                # Slots são embutidos na compilação: render é um único '%' sobre os campos do produto
+                inner = CompiledTemplate(slots[name])
+                parts.append(inner._format)
+                names.extend(inner.fields)
+            else:
+                parts.append(f'%({name})s')
+                names.append(name)
+        self.source = source
+        self.fields = tuple(dict.fromkeys(names))
+        self._format = ''.join(parts)
+
+    def render(self, values: Dict) -> str:
+        return self._format % values
+
+
+class TemplateRenderer:
+    def __init__(self, config: BestsellerConfig, frameworks: BestsellerFrameworks = None):
+        self.config = config
+        self.frameworks = frameworks or BestsellerFrameworks()
+
+    def render(self, product_info: Dict, culture: str, framework: str) -> str:
+        values = template_values(product_info)
+        values['currency'] = self.config.cultures[culture].currency
+        return self.frameworks.compiled_template(framework).render(values)
+
+    def render_batch(self, products: Iterable[Dict], frameworks: List[str] = None, cultures: List[str] = None) -> Iterator[Dict]:
+        return self._iter_batch(products, *self._plan(frameworks, cultures))
+
+    def _plan(self, frameworks: List[str] = None, cultures: List[str] = None) -> Tuple[List[Tuple[str, CompiledTemplate]], List[Tuple[str, str]]]:
+        frameworks, cultures = resolve_matrix_axes(self.config, self.frameworks, frameworks, cultures)
+        plans = [(framework, self.frameworks.compiled_template(framework)) for framework in frameworks]
+        currencies = [(culture, self.config.cultures[culture].currency) for culture in cultures]
+        return plans, currencies
+
+    @staticmethod
+    def _iter_batch(products: Iterable[Dict], plans: List[Tuple[str, CompiledTemplate]], currencies: List[Tuple[str, str]], start: int = 0) -> Iterator[Dict]:
+        for product_index, product in enumerate(products, start):
+            values = template_values(product)
+            product_name = product.get('name', f'produto_{product_index}')
+            for culture, currency in currencies:
+                values['currency'] = currency
+                for framework, plan in plans:
+                    yield {'product_index': product_index, 'product': product_name, 'framework': framework,
+                           'culture': culture, 'copy': plan.render(values)}
+
+    def render_sharded(self, products: Iterable[Dict], frameworks: List[str] = None, cultures: List[str] = None,
+                       mode: str = None, workers: int = None, chunksize: int = 64) -> Iterator[str]:
+        # Uma tarefa por bloco de produtos: cada produto viaja uma vez e volta como linhas JSONL prontas,
+        # na mesma ordem de render_batch; o processo principal só escreve
+        frameworks, cultures = resolve_matrix_axes(self.config, self.frameworks, frameworks, cultures)
+        executor = ShardedExecutor.from_config(self.config, mode, workers, chunksize=1,
+                                               initializer=_init_render_worker, initargs=(frameworks, cultures))
+        products = iter(products)
+        chunks = iter(lambda: list(itertools.islice(products, max(1, chunksize))), [])
+        starts = itertools.count(0, max(1, chunksize))
+        return executor.map(_render_chunk, zip(starts, chunks))
+
+
+_shard_plan: Tuple[List[Tuple[str, CompiledTemplate]], List[Tuple[str, str]]] = None
+
+
+def _init_render_worker(frameworks: List[str], cultures: List[str]):
+    global _shard_plan
+    _shard_plan = TemplateRenderer(BestsellerConfig())._plan(frameworks, cultures)
+
+
+def _render_chunk(task: Tuple[int, List[Dict]]) -> str:
+    start, products = task
+    return ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in TemplateRenderer._iter_batch(products, *_shard_plan, start=start))
+
+
+# =============================================
+# 3. EXAMPLES STUB (requerido pelas abas)
+# =============================================
+
+class MonsterFrameworkExamples:
+    def get_example(self, culture_code: str, niche: str) -> Dict[str, str]:
+        return {
+            "monster_copy": (
+                "🔬 COMPROVADO: Método que funciona de verdade\n"
+                "🏆 Autoridade no nicho\n"
+                "💔 Você já sentiu a frustração de não ter resultados?\n"
+                "📖 Eu era igual você até descobrir esta solução\n"
+                "🎁 Oferta: como alcançar o resultado em pouco tempo\n"
+                "⭐ Valor superior ao mercado\n"
+                "👥 Milhares já comprovaram\n"
+                "⚠️ Urgente: ação agora\n"
+                "✅ Garantia total"
+            )
+        }
+
+
+# =============================================
+# 3.1 PROVEDORES DE IA (async)
+# =============================================
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, ProviderError):
+        return exc.retryable
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    if status in RETRYABLE_STATUS:
+        return True
+    return type(exc).__name__ in ('APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+                                  'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded')
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str, rate: float, capacity: int) -> TokenBucket:
+    key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _rate_limiters_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = TokenBucket(rate, capacity)
+        return _rate_limiters[key]
+
+
+def _backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0) -> float:
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+async def retry_with_backoff(call, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0, logger: logging.Logger = None):
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            delay = _backoff_delay(attempt, base_delay, max_delay)
+            attempt += 1
+            if logger:
+                logger.warning(f"Falha temporária do provedor ({type(e).__name__}), tentativa {attempt}/{max_retries} em {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+class LLMProvider:
+    name = 'base'
+
+    def __init__(self, config: BestsellerConfig, api_key: str = ''):
+        self.config = config
+        self.limiter = get_rate_limiter(api_key, config.rate_limit, config.rate_burst) if api_key else None
+
+    async def _complete(self, prompt: str, system: str, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str, system: str, max_tokens: int, temperature: float):
+        yield await self._complete(prompt, system, max_tokens, temperature)
+
+    async def complete(self, prompt: str, system: str = '', max_tokens: int = 800, temperature: float = 0.9) -> str:
+        async def call():
+            if self.limiter:
+                await self.limiter.acquire()
+            return await self._complete(prompt, system, max_tokens, temperature)
+
+        return await retry_with_backoff(call, self.config.max_retries, logger=self.config.logger)
+
+    async def stream(self, prompt: str, system: str = '', max_tokens: int = 800, temperature: float = 0.9):
+        attempt = 0
+        while True:
+            emitted = False
+            try:
+                if self.limiter:
+                    await self.limiter.acquire()
+                async for chunk in self._stream(prompt, system, max_tokens, temperature):
+                    emitted = True
+                    yield chunk
+                return
+            except Exception as e:
+                # Depois do primeiro token não dá para repetir sem duplicar a saída já entregue
+                if emitted or attempt >= self.config.max_retries or not _is_retryable(e):
+                    raise
+                delay = _backoff_delay(attempt)
+                attempt += 1
+                self.config.logger.warning(f"Falha temporária do provedor ({type(e).__name__}), tentativa {attempt}/{self.config.max_retries} em {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    name = 'openai'
+
+    def __init__(self, config: BestsellerConfig):
+        super().__init__(config, config.apis['openai'])
+        self.model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        self._client = None
+
+    @property
+    def client(self):
+        # SDK e pool HTTP só são criados na primeira chamada real
+        if self._client is None:
+            openai = optional_import('openai')
+            httpx = optional_import('httpx')
+            http_client = None
+            if httpx:
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=self.config.max_concurrency, max_keepalive_connections=self.config.max_concurrency),
+                    timeout=httpx.Timeout(60.0, connect=10.0)
+                )
+            self._client = openai.AsyncOpenAI(api_key=self.config.apis['openai'], http_client=http_client, max_retries=0)
+        return self._client
+
+    async def _complete(self, prompt: str, system: str, max_tokens: int, temperature: float) -> str:
+        messages = [{'role': 'system', 'content': system}] if system else []
+        messages.append({'role': 'user', 'content': prompt})
+        response = await self.client.chat.completions.create(model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature)
+        return response.choices[0].message.content or ''
+
+    async def _stream(self, prompt: str, system: str, max_tokens: int, temperature: float):
+        messages = [{'role': 'system', 'content': system}] if system else []
+        messages.append({'role': 'user', 'content': prompt})
+        response = await self.client.chat.completions.create(model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True)
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self):
+        # O cliente e o pool HTTP ficam presos ao loop que os criou: a próxima execução monta outros
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+
+class GeminiProvider(LLMProvider):
+    name = 'gemini'
+
+    def __init__(self, config: BestsellerConfig):
+        super().__init__(config, config.apis['gemini'])
+        self.model = os.getenv('GEMINI_MODEL', 'gemini-pro')
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            genai = optional_import('google.generativeai')
+            genai.configure(api_key=self.config.apis['gemini'])
+            self._client = genai.GenerativeModel(self.model)
+        return self._client
+
+    async def _complete(self, prompt: str, system: str, max_tokens: int, temperature: float) -> str:
+        contents = f"{system}\n\n{prompt}" if system else prompt
+        response = await self.client.generate_content_async(
+            contents, generation_config={'max_output_tokens': max_tokens, 'temperature': temperature}
+        )
+        return response.text or ''
+
+    async def _stream(self, prompt: str, system: str, max_tokens: int, temperature: float):
+        contents = f"{system}\n\n{prompt}" if system else prompt
+        response = await self.client.generate_content_async(
+            contents, generation_config={'max_output_tokens': max_tokens, 'temperature': temperature}, stream=True
+        )
+        async for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+    async def aclose(self):
+        # O cliente assíncrono do SDK fica preso ao loop em que foi usado
+        self._client = None
+
+
+class FakeProvider(LLMProvider):
+    name = 'fake'
+
+    def __init__(self, config: BestsellerConfig, latency: float = 0.0, num_lines: int = 20):
+        super().__init__(config)
+        self.latency = latency
+        self.num_lines = num_lines
+        self.calls = 0
+
+    async def _complete(self, prompt: str, system: str, max_tokens: int, temperature: float) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        subject = prompt.strip().splitlines()[0][:60] if prompt.strip() else 'offline'
+        return '\n'.join(f"{i}. [{digest}] {subject} (var {i})" for i in range(1, self.num_lines + 1))
+
+    async def _stream(self, prompt: str, system: str, max_tokens: int, temperature: float):
+        text = await self._complete(prompt, system, max_tokens, temperature)
+        for start in range(0, len(text), 16):
+            yield text[start:start + 16]
+            await asyncio.sleep(0)
+
+
+def build_provider(config: BestsellerConfig) -> LLMProvider:
+    choice = config.provider_name
+    if choice == 'fake':
+        return FakeProvider(config)
+    if choice in ('auto', 'openai') and config.apis['openai'] and module_available('openai'):
+        try:
+            return OpenAIProvider(config)
+        except Exception as e:
+            config.logger.warning(f"OpenAI indisponível: {e}")
+    if choice in ('auto', 'gemini') and config.apis['gemini'] and module_available('google.generativeai'):
+        try:
+            return GeminiProvider(config)
+        except Exception as e:
+            config.logger.warning(f"Gemini indisponível: {e}")
+    return None
+
+
+HOOK_SYSTEM_PROMPT = "Você é um copywriter de resposta direta especialista em hooks virais para vídeos curtos."
+SCRIPT_SYSTEM_PROMPT = "Você é um roteirista de vídeos curtos de vendas que aplica frameworks de copywriting bestseller."
+
+
+WORDS_PER_SECOND = 2.5
+
+
+def _clean_generated_line(line: str) -> str:
+    return re.sub(r'^\s*(?:\d+[.)]|[-*•])\s*', '', line).strip().strip('"').strip()
+
+
+async def iter_generated_lines(chunks, limit: int = None):
+    buffer = ''
+    count = 0
+    try:
+        async for chunk in chunks:
+            buffer += chunk
+            *complete, buffer = buffer.split('\n')
+            for raw in complete:
+                line = _clean_generated_line(raw)
+                if line:
+                    yield line
+                    count += 1
+                    if limit and count >= limit:
+                        return
+        line = _clean_generated_line(buffer)
+        if line and not (limit and count >= limit):
+            yield line
+    finally:
+        await chunks.aclose()
+
+
+async def iter_generated_paragraphs(chunks):
+    buffer = ''
+    try:
+        async for chunk in chunks:
+            buffer += chunk
+            *complete, buffer = re.split(r'\n\s*\n', buffer)
+            for paragraph in complete:
+                if paragraph.strip():
+                    yield paragraph.strip()
+        if buffer.strip():
+            yield buffer.strip()
+    finally:
+        await chunks.aclose()
+
+
+# =============================================
+# 3.2 CACHE DE RESPOSTAS (memória LRU + SQLite)
+# =============================================
+
+def _normalize_cache_input(value):
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize_cache_input(v) for k, v in sorted(value.items()) if v not in (None, '')}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_cache_input(v) for v in value]
+    return value
+
+
+def make_cache_key(kind: str, provider_id: str, inputs) -> str:
+    payload = json.dumps([kind, provider_id, _normalize_cache_input(inputs)], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+CACHE_COMMIT_EVERY = 64
+CACHE_COMMIT_SECONDS = 1.0
+
+
+class ResponseCache:
+    def __init__(self, path: str = None, max_memory_items: int = 2048, ttl: float = 7 * 24 * 3600, max_disk_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._memory: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores_since_evict = 0
+        # Gravações ficam numa transação aberta e são confirmadas em lote (a cada N escritas ou T segundos)
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)')
+            self._db.commit()
+
+    def _remember(self, key: str, expires: float, text: str):
+        self._memory[key] = (expires, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return json.loads(entry[1])
+            if entry:
+                del self._memory[key]
+            if self._db:
+                row = self._db.execute('SELECT value, expires FROM responses WHERE key = ?', (key,)).fetchone()
+                if row and row[1] > now:
+                    self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                    self._wrote()
+                    self._remember(key, row[1], row[0])
+                    self.stats['disk_hits'] += 1
+                    return json.loads(row[0])
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value):
+        now = time.time()
+        expires = now + self.ttl
+        text = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires, text)
+            self.stats['stores'] += 1
+            if self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)',
+                    (key, text, expires, now, len(text.encode('utf-8')))
+                )
+                self._stores_since_evict += 1
+                if self._stores_since_evict >= 100:
+                    self._evict_disk(now)
+                else:
+                    self._wrote()
+
+    def _wrote(self):
+        self._pending_writes += 1
+        if (self._pending_writes >= CACHE_COMMIT_EVERY
+                or time.monotonic() - self._last_commit >= CACHE_COMMIT_SECONDS):
+            self._commit()
+
+    def _commit(self):
+        self._db.commit()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._db and self._pending_writes:
+                self._commit()
+
+    def _evict_disk(self, now: float):
+        self._stores_since_evict = 0
+        evicted = self._db.execute('DELETE FROM responses WHERE expires <= ?', (now,)).rowcount
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total > self.max_disk_bytes:
+            excess = total - self.max_disk_bytes
+            freed = 0
+            stale_keys = []
+            for key, size in self._db.execute('SELECT key, size FROM responses ORDER BY accessed'):
+                stale_keys.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self._db.executemany('DELETE FROM responses WHERE key = ?', stale_keys)
+            evicted += len(stale_keys)
+        self._commit()
+        self.stats['evictions'] += evicted
+
+    def hit_rate(self) -> float:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"Cache: {self.stats['memory_hits']} hits memória, {self.stats['disk_hits']} hits disco, "
+                f"{self.stats['misses']} misses ({self.hit_rate():.1%})")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db:
+                self._db.execute('DELETE FROM responses')
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+
+def build_response_cache(config: BestsellerConfig) -> ResponseCache:
+    if not config.cache_enabled:
+        return None
+    try:
+        return ResponseCache(config.cache_path, ttl=config.cache_ttl, max_disk_bytes=config.cache_max_bytes)
+    except sqlite3.Error as e:
+        config.logger.warning(f"Cache em disco indisponível ({e}), usando apenas memória")
+        return ResponseCache(None, ttl=config.cache_ttl)
+
+
+class _Flight:
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: 'asyncio.Task'):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    __slots__ = ('task', 'log', 'subscribers')
+
+    def __init__(self):
+        self.task: 'asyncio.Task' = None
+        self.log: List[Tuple[bool, object]] = []
+        self.subscribers: List['asyncio.Queue'] = []
+
+    def publish(self, done: bool, value):
+        # Quem entra atrasado repete o log desde o início, então ele guarda também o fim/erro
+        self.log.append((done, value))
+        for queue in self.subscribers:
+            queue.put_nowait((done, value))
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], _Flight] = {}
+        self._streams: Dict[Tuple[int, str], _StreamFlight] = {}
+        self.stats = {'leaders': 0, 'shared': 0, 'cancelled': 0}
+
+    async def do(self, key: str, factory):
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            self.stats['leaders'] += 1
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._inflight[flight_key] = flight
+            flight.task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        else:
+            self.stats['shared'] += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # O último interessado a desistir cancela a chamada compartilhada
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self.stats['cancelled'] += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def stream(self, key: str, factory):
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._streams.get(flight_key)
+        if flight is None:
+            self.stats['leaders'] += 1
+            flight = _StreamFlight()
+            flight.task = asyncio.ensure_future(self._broadcast(flight, factory))
+            self._streams[flight_key] = flight
+            flight.task.add_done_callback(lambda _: self._drop_stream(flight_key, flight))
+        else:
+            self.stats['shared'] += 1
+        queue = asyncio.Queue()
+        for entry in flight.log:
+            queue.put_nowait(entry)
+        flight.subscribers.append(queue)
+        try:
+            while True:
+                done, value = await queue.get()
+                if done:
+                    if value is not None:
+                        raise value
+                    return
+                # Cada consumidor recebe sua cópia do item do líder
+                yield copy.deepcopy(value)
+        finally:
+            flight.subscribers.remove(queue)
+            # O último interessado a desistir cancela o stream compartilhado
+            if not flight.subscribers and not flight.task.done():
+                flight.task.cancel()
+                self.stats['cancelled'] += 1
+                self._drop_stream(flight_key, flight)
+
+    def _drop_stream(self, flight_key: Tuple[int, str], flight: _StreamFlight):
+        if self._streams.get(flight_key) is flight:
+            del self._streams[flight_key]
+
+    @staticmethod
+    async def _broadcast(flight: _StreamFlight, factory):
+        try:
+            async for item in factory():
+                flight.publish(False, item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            flight.publish(True, e)
+            return
+        flight.publish(True, None)
+
+
+def _generation_key(generator, kind: str, inputs) -> str:
+    provider = generator.provider
+    provider_id = f"{provider.name}:{getattr(provider, 'model', '')}" if provider else 'template'
+    return make_cache_key(kind, provider_id, inputs)
+
+
+def cached_generation(kind: str, key_inputs):
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            key = _generation_key(self, kind, key_inputs(*args, **kwargs))
+            # O fallback por template é determinístico e barato: não vale uma linha no cache
+            cache = getattr(self, 'cache', None) if self.provider else None
+
+            async def produce():
+                if cache is not None:
+                    cached = await asyncio.to_thread(cache.get, key)
+                    if cached is not None:
+                        return cached
+                result = await method(self, *args, **kwargs)
+                if cache is not None:
+                    await asyncio.to_thread(cache.set, key, result)
+                return result
+
+            flights = getattr(self, 'inflight', None)
+            if flights is None:
+                return await produce()
+            # Chamadas idênticas simultâneas compartilham o mesmo resultado; cada uma recebe sua cópia
+            return copy.deepcopy(await flights.do(key, produce))
+        return wrapper
+    return decorator
+
+
+def cached_stream(kind: str, key_inputs, to_items=list, from_items=None):
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache = getattr(self, 'cache', None) if self.provider else None
+            key = _generation_key(self, kind, key_inputs(*args, **kwargs))
+
+            async def produce():
+                if cache is not None:
+                    cached = await asyncio.to_thread(cache.get, key)
+                    if cached is not None:
+                        for item in to_items(cached):
+                            yield item
+                        return
+                items = []
+                async for item in method(self, *args, **kwargs):
+                    items.append(copy.deepcopy(item) if cache is not None else item)
+                    yield item
+                if cache is not None:
+                    value = from_items(items, *args, **kwargs) if from_items else items
+                    await asyncio.to_thread(cache.set, key, value)
+
+            flights = getattr(self, 'inflight', None)
+            # Streams idênticos simultâneos têm um único produtor; os demais recebem os itens do líder
+            async for item in (produce() if flights is None else flights.stream(key, produce)):
+                yield item
+        return wrapper
+    return decorator
+
+
+# =============================================
+# 4. GERADORES (simplificado; mantém assinaturas usadas pela GUI)
+# =============================================
+
+def _culture_brief(config: BestsellerConfig, culture: str) -> str:
+    culture_data = config.cultures.get(culture)
+    if not culture_data:
+        return f"Cultura: {culture}"
+    return (
+        f"Cultura: {culture_data.name} ({culture_data.language_code}), escreva no idioma {culture_data.language_code}\n"
+        f"Comunicação: {culture_data.preferred_communication}\n"
+        f"Gatilhos culturais: {', '.join(culture_data.cultural_triggers)}\n"
+        f"Dores: {', '.join(culture_data.pain_points)}"
+    )
+
+
+def _framework_brief(frameworks: BestsellerFrameworks, framework: str) -> str:
+    fw = frameworks.frameworks.get(framework, {})
+    return f"Framework: {fw.get('name', framework)} ({fw.get('expert', 'N/A')}) - estrutura: {' → '.join(fw.get('structure', []))}"
+
+
+_HOOKS_FROM_PRODUCT_KEY = lambda product_info, culture, framework, num_hooks=5: [product_info, culture, framework, num_hooks]
+_HOOKS_FROM_COPY_KEY = lambda existing_copy, culture, framework, num_variations=3: [existing_copy, culture, framework, num_variations]
+_COMPLETE_SCRIPT_KEY = lambda hook, product_info, culture, framework, duration=30: [hook.hook_text, product_info, culture, framework, duration]
+
+
+class BestsellerHookGenerator:
+    def __init__(self, config: BestsellerConfig, provider: LLMProvider = None, cache: ResponseCache = None):
+        self.config = config
+        self.frameworks = BestsellerFrameworks()
+        self.provider = provider or build_provider(config)
+        self.cache = cache or build_response_cache(config)
+        self.inflight = SingleFlight()
+
+    async def _iter_hooks_from_product(self, product_info: Dict, culture: str, framework: str, num_hooks: int):
+        if self.provider:
+            prompt = (
+                f"Produto: {product_info.get('name', '')}\n"
+                f"Avatar: {product_info.get('avatar', '')}\n"
+                f"Problema: {product_info.get('problem', '')}\n"
+                f"Solução: {product_info.get('solution', '')}\n"
+                f"Nicho: {product_info.get('niche', '')}\n"
+                f"{_framework_brief(self.frameworks, framework)}\n"
+                f"{_culture_brief(self.config, culture)}\n\n"
+                f"Escreva {num_hooks} hooks virais para vídeos curtos, um por linha, numerados."
+            )
+            async for line in iter_generated_lines(self.provider.stream(prompt, system=HOOK_SYSTEM_PROMPT), num_hooks):
+                yield {'hook_text': line, 'viral_potential': 'MEDIUM'}
+            return
+        base = product_info.get('name', 'Seu produto')
+        for i in range(num_hooks):
+            yield {
+                'hook_text': f"[{framework}] [{culture}] {base}: resultado em pouco tempo (var {i+1})",
+                'viral_potential': 'MEDIUM'
+            }
+
+    async def _iter_hooks_from_copy(self, existing_copy: str, culture: str, framework: str, num_variations: int):
+        if self.provider:
+            prompt = (
+                f"Copy original:\n{existing_copy}\n\n"
+                f"{_framework_brief(self.frameworks, framework)}\n"
+                f"{_culture_brief(self.config, culture)}\n\n"
+                f"Reescreva a copy como {num_variations} hooks usando o framework, um por linha, numerados."
+            )
+            async for line in iter_generated_lines(self.provider.stream(prompt, system=HOOK_SYSTEM_PROMPT), num_variations):
+                yield {
+                    'hook_text': line,
+                    'variation_type': 'framework_adaptation',
+                    'viral_potential': 'MEDIUM',
+                    'framework_element': framework
+                }
+            return
+        for _ in range(num_variations):
+            yield {
+                'hook_text': existing_copy[:80] + '...',
+                'variation_type': 'original',
+                'viral_potential': 'MEDIUM',
+                'framework_element': framework
+            }
+
+    @cached_generation('hooks_from_product', _HOOKS_FROM_PRODUCT_KEY)
+    async def generate_hooks_from_product(self, product_info: Dict, culture: str, framework: str, num_hooks: int = 5) -> List[Dict]:
+        return [hook async for hook in self._iter_hooks_from_product(product_info, culture, framework, num_hooks)]
+
+    @cached_stream('hooks_from_product', _HOOKS_FROM_PRODUCT_KEY)
+    async def stream_hooks_from_product(self, product_info: Dict, culture: str, framework: str, num_hooks: int = 5):
+        async for hook in self._iter_hooks_from_product(product_info, culture, framework, num_hooks):
+            yield hook
+
+    @cached_generation('hooks_from_copy', _HOOKS_FROM_COPY_KEY)
+    async def generate_hooks_from_copy(self, existing_copy: str, culture: str, framework: str, num_variations: int = 3) -> List[Dict]:
+        return [hook async for hook in self._iter_hooks_from_copy(existing_copy, culture, framework, num_variations)]
+
+    @cached_stream('hooks_from_copy', _HOOKS_FROM_COPY_KEY)
+    async def stream_hooks_from_copy(self, existing_copy: str, culture: str, framework: str, num_variations: int = 3):
+        async for hook in self._iter_hooks_from_copy(existing_copy, culture, framework, num_variations):
+            yield hook
+
+
+def assemble_script(sections: List[Dict], culture: str, framework: str, duration: int) -> Dict:
+    return {
+        'framework_used': framework,
+        'culture': culture,
+        'full_script': '\n\n'.join(section['content'] for section in sections),
+        'sections': sections,
+        'estimated_duration': duration
+    }
+
+
+class BestsellerScriptGenerator:
+    def __init__(self, config: BestsellerConfig, provider: LLMProvider = None, cache: ResponseCache = None):
+        self.config = config
+        self.frameworks = BestsellerFrameworks()
+        self.provider = provider or build_provider(config)
+        self.cache = cache or build_response_cache(config)
+        self.inflight = SingleFlight()
+
+    async def _iter_script_sections(self, hook: Hook, product_info: Dict, culture: str, framework: str, duration: int):
+        if self.provider:
+            prompt = (
+                f"Hook: {hook.hook_text}\n"
+                f"Produto: {product_info.get('name', '')}\n"
+                f"Problema: {product_info.get('problem', '')}\n"
+                f"Solução: {product_info.get('solution', '')}\n"
+                f"{_framework_brief(self.frameworks, framework)}\n"
+                f"{_culture_brief(self.config, culture)}\n\n"
+                f"Escreva o roteiro completo de um vídeo de {duration} segundos que começa com o hook, "
+                f"com uma seção por parágrafo separada por linha em branco."
+            )
+            structure = self.frameworks.frameworks.get(framework, {}).get('structure', [])
+            index = 0
+            async for paragraph in iter_generated_paragraphs(self.provider.stream(prompt, system=SCRIPT_SYSTEM_PROMPT, max_tokens=1500)):
+                yield {
+                    'section_name': structure[index] if index < len(structure) else f'section_{index + 1}',
+                    'content': paragraph,
+                    'duration_estimate': max(1, round(len(paragraph.split()) / WORDS_PER_SECOND))
+                }
+                index += 1
+            return
+        text = (
+            f"HOOK: {hook.hook_text}\n\n"
+            f"Se você tem {product_info.get('problem','este problema')}, conheça {product_info.get('solution','esta solução')}\n"
+            f"Aja agora."
+        )
+        yield {'section_name': 'Complete', 'content': text, 'duration_estimate': duration}
+
+    @cached_generation('complete_script', _COMPLETE_SCRIPT_KEY)
+    async def generate_complete_script(self, hook: Hook, product_info: Dict, culture: str, framework: str, duration: int = 30) -> Dict:
+        sections = [section async for section in self._iter_script_sections(hook, product_info, culture, framework, duration)]
+        return assemble_script(sections, culture, framework, duration)
+
+    @cached_stream('complete_script', _COMPLETE_SCRIPT_KEY,
+                   to_items=lambda script: script['sections'],
+                   from_items=lambda sections, hook, product_info, culture, framework, duration=30: assemble_script(sections, culture, framework, duration))
+    async def stream_complete_script(self, hook: Hook, product_info: Dict, culture: str, framework: str, duration: int = 30):
+        async for section in self._iter_script_sections(hook, product_info, culture, framework, duration):
+            yield section
+
+
+# =============================================
+# 5. ANALISADOR (métodos usados pela GUI)
+# =============================================
+
+PERSUASION_KEYWORDS: Dict[str, List[str]] = {
+    "Pergunta": ["?", "você", "vocês"],
+    "Urgência": ["agora", "hoje", "rápido", "última chance"]
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _strip_accent(char: str) -> str:
+    base = ''.join(c for c in unicodedata.normalize('NFKD', char) if not unicodedata.combining(c))
+    return base if len(base) == 1 else char
+
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    pattern: str
+    payload: object
+
+
+class KeywordAutomaton:
+    def __init__(self, patterns: Iterable[Tuple[str, object]], word_boundary: bool = False, accent_insensitive: bool = False):
+        self.word_boundary = word_boundary
+        self.accent_insensitive = accent_insensitive
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, object]]] = [[]]
+        for pattern, payload in patterns:
+            key = self.fold(pattern)
+            if not key:
+                continue
+            node = 0
+            for char in key:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = child
+                node = child
+            self._out[node].append((len(key), pattern, payload))
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def fold(self, text: str) -> str:
+        text = text.lower()
+        return ''.join(map(_strip_accent, text)) if self.accent_insensitive else text
+
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isalnum() or char == '_'
+
+    def _at_boundary(self, text: str, start: int, end: int) -> bool:
+        if self._is_word_char(text[start]) and start > 0 and self._is_word_char(text[start - 1]):
+            return False
+        if self._is_word_char(text[end - 1]) and end < len(text) and self._is_word_char(text[end]):
+            return False
+        return True
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        # Posições referem-se ao texto normalizado (minúsculo, sem acentos se configurado)
+        folded = self.fold(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, pattern, payload in out[node]:
+                start = position - length + 1
+                if self.word_boundary and not self._at_boundary(folded, start, position + 1):
+                    continue
+                yield KeywordMatch(start, position + 1, pattern, payload)
+
+
+class KeywordScan:
+    __slots__ = ('counts', 'found')
+
+    def __init__(self, counts: Counter = None, found: Dict[object, set] = None):
+        self.counts: Counter = counts if counts is not None else Counter()
+        self.found: Dict[object, set] = found if found is not None else {}
+
+    def add(self, match: KeywordMatch):
+        self.counts[match.payload] += 1
+        self.found.setdefault(match.payload, set()).add(match.pattern)
+
+
+class CopyKeywordEngine:
+    def __init__(self, config: BestsellerConfig, word_boundary: bool = False, accent_insensitive: bool = False):
+        patterns: List[Tuple[str, object]] = []
+        for element, keywords in PERSUASION_KEYWORDS.items():
+            patterns += [(keyword, ('persuasion', element)) for keyword in keywords]
+        for culture_code, culture_data in config.cultures.items():
+            patterns += [(trigger, ('trigger', culture_code)) for trigger in culture_data.cultural_triggers]
+            patterns += [(pain, ('pain_point', culture_code)) for pain in culture_data.pain_points]
+            patterns += [(trigger, ('analysis_trigger', culture_code)) for trigger in culture_data.analysis_triggers]
+        for concept, cues in FRAMEWORK_CONCEPT_CUES.items():
+            patterns += [(cue, ('concept', concept)) for cue in cues]
+        self.automaton = KeywordAutomaton(patterns, word_boundary, accent_insensitive)
+
+    def scan(self, text: str) -> KeywordScan:
+        result = KeywordScan()
+        for match in self.automaton.iter_matches(text):
+            result.add(match)
+        return result
+
+
+# Pistas (pt/en/es) para cada conceito que aparece nas estruturas e templates dos frameworks
+FRAMEWORK_CONCEPT_CUES: Dict[str, List[str]] = {
+    'dream': ['sonho', 'sonha', 'dream', 'sueño', 'imagine', 'imagina'],
+    'outcome': ['resultado', 'result', 'conquist', 'alcanç', 'alcanz', 'outcome'],
+    'likelihood': ['comprovad', 'garantid', 'funciona', 'proven', 'works', 'probad'],
+    'social': ['milhares', 'clientes', 'alunos', 'thousands', 'customers', 'students', 'miles de'],
+    'proof': ['prova', 'proof', 'depoimento', 'testimon', 'comprov', 'prueba'],
+    'time': ['dias', 'semanas', 'minutos', 'days', 'weeks', 'minutes', 'días'],
+    'delay': ['rápido', 'rapido', 'fast', 'quick', 'imediat', 'instant', 'inmediat'],
+    'effort': ['sem esforço', 'sin esfuerzo', 'effortless', 'esforço', 'effort', 'esfuerzo'],
+    'sacrifice': ['sem precisar', 'sin necesidad', 'without having', 'sacrif'],
+    'ease': ['fácil', 'facil', 'easy', 'simples', 'simple', 'sencill'],
+    'promise': ['prometo', 'promessa', 'promise', 'promesa', 'você vai', 'you will', 'vas a'],
+    'backstory': ['eu era', 'i was', 'yo era', 'quando eu', 'when i', 'cuando yo', 'há alguns anos', 'years ago'],
+    'relatable': ['igual você', 'como você', 'like you', 'como tú', 'como tu'],
+    'situation': ['situação', 'situation', 'situación'],
+    'wall': ['fracass', 'tentei', 'failed', 'tried', 'intenté', 'desisti', 'quase desist', 'gave up'],
+    'obstacle': ['obstácul', 'obstacle', 'barreira', 'barrier', 'bloqueio'],
+    'epiphany': ['descobri', 'discovered', 'descubrí', 'percebi', 'realized', 'segredo', 'secret', 'secreto'],
+    'breakthrough': ['virada', 'breakthrough', 'descoberta', 'descubrimiento', 'mudou tudo', 'changed everything'],
+    'plan': ['passo a passo', 'step by step', 'paso a paso', 'plano', 'passo 1', 'step 1'],
+    'method': ['método', 'metodo', 'method', 'sistema', 'system', 'técnica', 'technique'],
+    'achievement': ['conquistei', 'consegui', 'achieved', 'logré', 'hoje eu', 'today i', 'hoy yo'],
+    'result': ['resultado', 'result'],
+    'problem': ['problema', 'problem', 'dificuldade', 'difficult', 'dificultad'],
+    'agitate': ['pior', 'worse', 'peor', 'cada dia', 'every day', 'cada día', 'enquanto isso', 'medo', 'fear', 'miedo'],
+    'consequences': ['consequênc', 'consequenc', 'vai perder', 'perdendo', 'losing', 'custa caro', 'costs you'],
+    'solve': ['resolve', 'resolver', 'solve', 'acabar com', 'eliminar', 'eliminate'],
+    'solution': ['solução', 'solucao', 'solution', 'solución'],
+    'evidence': ['estudo', 'study', 'pesquisa', 'research', 'dados', 'data', 'estudio', '%'],
+    'close': ['compre', 'buy now', 'garanta', 'inscreva', 'sign up', 'compra', 'inscríbete'],
+    'cta': ['clique', 'click', 'link', 'botão', 'button', 'haz clic', 'agora mesmo', 'right now'],
+    'scientific': ['científic', 'cientific', 'scientific', 'ciência', 'science', 'ciencia'],
+    'claim': ['comprovado', 'proven', 'garante', 'claims', 'afirma'],
+    'brand': ['marca', 'brand'],
+    'authority': ['especialista', 'expert', 'autoridade', 'authority', 'médico', 'doctor', 'anos de experiência', 'years of experience'],
+    'emotional': ['sentiu', 'felt', 'sentiste', 'coração', 'heart', 'corazón', 'emoção', 'emotion', 'frustra'],
+    'transformation': ['transform', 'mudou', 'changed', 'cambió', 'antes e depois', 'before and after', 'antes y después'],
+    'story': ['história', 'historia', 'story'],
+    'offer': ['oferta', 'offer', 'bônus', 'bonus', 'desconto', 'discount', 'descuento'],
+    'value': ['valor', 'value', 'vale a pena', 'worth', 'economiz', 'save'],
+    'superior': ['melhor', 'better', 'mejor', 'superior', 'único', 'unique'],
+    'appeal': ['todo mundo', 'everyone', 'todos', 'milhares de pessoas', 'thousands of people'],
+    'urgency': ['agora', 'now', 'hoje', 'today', 'hoy', 'última chance', 'last chance', 'só até', 'only until', 'urgente', 'urgent', 'vagas', 'limitad', 'limited'],
+    'risk': ['risco', 'risk', 'riesgo'],
+    'reversal': ['garantia', 'guarantee', 'garantía', 'devolução', 'refund', 'reembolso', 'dinheiro de volta', 'money back']
+}
+
+
+def copy_text_stats(text: str) -> Tuple[int, int]:
+    return len(text.split()), sum(1 for sentence in re.split(r'[.!?]+', text) if sentence.strip())
+
+
+def _concept_tokens(name: str) -> List[str]:
+    return [token for token in re.split(r'[_\s]+', name.lower()) if token in FRAMEWORK_CONCEPT_CUES]
+
+
+def _framework_concepts(framework: Dict) -> List[str]:
+    template = framework.get('template', '')
+    names = list(framework.get('structure', []))
+    names += re.findall(r'\{(\w+)\}', template)
+    names += re.findall(r'^([A-Z][A-Z ]+):', template, re.M)
+    return [token for name in names for token in _concept_tokens(name)]
+
+
+def _normalize_vector(values: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in values))
+    return [value / norm for value in values] if norm else values
+
+
+class FrameworkScorer:
+    def __init__(self, frameworks: Dict[str, Dict]):
+        self.keys = list(frameworks)
+        self.vocabulary = sorted({token for framework in frameworks.values() for token in _framework_concepts(framework)})
+        columns = {token: column for column, token in enumerate(self.vocabulary)}
+        rows = []
+        for framework in frameworks.values():
+            row = [0.0] * len(self.vocabulary)
+            for token in _framework_concepts(framework):
+                row[columns[token]] += 1.0
+            rows.append(_normalize_vector(row))
+        self.np = optional_import('numpy')
+        self.matrix = self.np.array(rows) if self.np is not None else rows
+
+    def copy_vector(self, scan: KeywordScan) -> List[float]:
+        # Raiz das contagens para uma pista repetida não dominar o vetor
+        return _normalize_vector([math.sqrt(scan.counts[('concept', token)]) for token in self.vocabulary])
+
+    def score(self, scan: KeywordScan) -> Dict[str, float]:
+        vector = self.copy_vector(scan)
+        if self.np is not None:
+            scores = (self.matrix @ self.np.array(vector)).tolist()
+        else:
+            scores = [sum(weight * value for weight, value in zip(row, vector)) for row in self.matrix]
+        return dict(zip(self.keys, scores))
+
+
+class AdvancedCopyAnalyzer:
+    def __init__(self, config: BestsellerConfig):
+        self.config = config
+        self.frameworks = BestsellerFrameworks()
+        self.keywords = CopyKeywordEngine(config)
+        self.scorer = FrameworkScorer(self.frameworks.frameworks)
+
+    def score_frameworks(self, copy_text: str, scan: KeywordScan = None) -> Dict[str, float]:
+        return self.scorer.score(scan or self.keywords.scan(copy_text))
+
+    def analyze_copy_structure(self, copy_text: str, scan: KeywordScan = None, stats: Tuple[int, int] = None) -> Dict:
+        scan = scan or self.keywords.scan(copy_text)
+        words, sentences = stats or copy_text_stats(copy_text)
+        scores = self.scorer.score(scan)
+        detected = max(scores, key=scores.get)
+        elements_found, missing_elements = [], []
+        for element in self.frameworks.frameworks[detected]['structure']:
+            tokens = _concept_tokens(element)
+            strength = sum(1 for token in tokens if scan.counts[('concept', token)]) / len(tokens) if tokens else 0.0
+            if strength:
+                elements_found.append({'type': element.replace('_', ' ').title(), 'strength': strength})
+            else:
+                missing_elements.append(element)
+        suggestions = [f"Adicionar {element.replace('_', ' ')}" for element in missing_elements]
+        if not scan.counts[('concept', 'urgency')]:
+            suggestions.append('Adicionar urgência')
+        coverage = len(elements_found) / (len(elements_found) + len(missing_elements))
+        words_per_sentence = words / max(1, sentences)
+        return {
+            'detected_framework': detected,
+            'framework_confidence': scores[detected],
+            'framework_scores': scores,
+            'elements_found': elements_found,
+            'missing_elements': missing_elements,
+            'suggestions': suggestions,
+            'readability_score': max(1, min(10, round(12 - words_per_sentence / 3))),
+            'persuasion_score': max(1, round(10 * coverage)),
+            'viral_potential': 'HIGH' if coverage >= 0.7 else 'MEDIUM' if coverage >= 0.4 else 'LOW'
+        }
+
+    def cultural_compatibility(self, scan: KeywordScan) -> Dict[str, Dict]:
+        result = {}
+        for culture_code, culture_data in self.config.cultures.items():
+            triggers = culture_data.analysis_triggers
+            if not triggers:
+                continue
+            found = scan.found.get(('analysis_trigger', culture_code), set())
+            matched = [trigger for trigger in triggers if trigger in found]
+            result[culture_code] = {'triggers': triggers, 'found': matched, 'compatibility': len(matched) / len(triggers)}
+        return result
+
+    def analyze_record(self, copy_text: str) -> Dict:
+        scan = self.keywords.scan(copy_text)
+        structure = self.analyze_copy_structure(copy_text, scan)
+        return {
+            'detected_framework': structure['detected_framework'],
+            'framework_confidence': structure['framework_confidence'],
+            'framework_scores': structure['framework_scores'],
+            'cultural_compatibility': {code: data['compatibility'] for code, data in self.cultural_compatibility(scan).items()},
+            'readability_score': structure['readability_score'],
+            'persuasion_score': structure['persuasion_score'],
+            'viral_potential': structure['viral_potential']
+        }
+
+    def _calculate_framework_match(self, copy_text: str, framework: Dict) -> float:
+        scores = self.score_frameworks(copy_text)
+        for key, data in self.frameworks.frameworks.items():
+            if data.get('name') == framework.get('name'):
+                return scores[key]
+        return 0.0
+
+
+class ParagraphAnalysis:
+    __slots__ = ('scan', 'words', 'sentences')
+
+    def __init__(self, scan: KeywordScan, words: int, sentences: int):
+        self.scan = scan
+        self.words = words
+        self.sentences = sentences
+
+
+class IncrementalCopyAnalysis:
+    # Estado da copy por parágrafo: só parágrafos novos ou editados são escaneados de novo
+    def __init__(self, keywords: CopyKeywordEngine):
+        self.keywords = keywords
+        self.text = ''
+        self.paragraphs: List[str] = []
+        self.words = 0
+        self.sentences = 0
+        self.rescanned = 0
+        self._cache: Dict[str, ParagraphAnalysis] = {}
+        self._counts: Counter = Counter()
+        self._found: Counter = Counter()
+        self._scan: KeywordScan = KeywordScan()
+
+    def update(self, text: str) -> bool:
+        if text == self.text:
+            return False
+        self.text = text
+        paragraphs = [paragraph for paragraph in text.split('\n\n') if paragraph.strip()]
+        if paragraphs == self.paragraphs:
+            return False
+        previous, current = Counter(self.paragraphs), Counter(paragraphs)
+        for paragraph, times in (previous - current).items():
+            self._apply(self._cache[paragraph], -times)
+        for paragraph, times in (current - previous).items():
+            entry = self._cache.get(paragraph)
+            if entry is None:
+                entry = ParagraphAnalysis(self.keywords.scan(paragraph), *copy_text_stats(paragraph))
+                self.rescanned += 1
+            self._cache[paragraph] = entry
+            self._apply(entry, times)
+        self._cache = {paragraph: self._cache[paragraph] for paragraph in current}
+        self.paragraphs = paragraphs
+        found: Dict[object, set] = {}
+        for (payload, pattern), times in self._found.items():
+            if times > 0:
+                found.setdefault(payload, set()).add(pattern)
+        self._scan = KeywordScan(+self._counts, found)
+        return True
+
+    def _apply(self, entry: ParagraphAnalysis, times: int):
+        self.words += entry.words * times
+        self.sentences += entry.sentences * times
+        for payload, count in entry.scan.counts.items():
+            self._counts[payload] += count * times
+        for payload, patterns in entry.scan.found.items():
+            for pattern in patterns:
+                self._found[(payload, pattern)] += times
+
+    @property
+    def scan(self) -> KeywordScan:
+        return self._scan
+
+    @property
+    def stats(self) -> Tuple[int, int]:
+        return self.words, self.sentences
+
+
+# Pontuação de potencial viral: cada hook vira um vetor de features e o lote inteiro é pontuado
+# de uma vez contra pesos por cultura (emotional_intensity / family_focus modulam os pesos)
+
+HOOK_FEATURES = ('length', 'question', 'urgency', 'culture_trigger', 'pain_point', 'family', 'specificity')
+HOOK_FEATURE_WEIGHTS = (1.0, 0.8, 0.9, 1.2, 1.0, 0.6, 0.5)
+HOOK_IDEAL_WORDS = 12
+VIRAL_THRESHOLDS = (('HIGH', 0.45), ('MEDIUM', 0.25))
+HOOK_URGENCY_CUES = PERSUASION_KEYWORDS['Urgência'] + ['now', 'today', 'last chance', 'ahora', 'hoy', 'última oportunidad',
+                                                        'maintenant', "aujourd'hui", 'jetzt', 'heute', 'oggi', 'subito']
+HOOK_FAMILY_CUES = ['família', 'familia', 'family', 'famille', 'famiglia', 'filhos', 'hijos', 'kids', 'children',
+                    'enfants', 'kinder', 'figli', 'mãe', 'madre', 'mom', 'mère', 'mutter', 'mamma']
+
+
+def viral_label(score: float) -> str:
+    for label, threshold in VIRAL_THRESHOLDS:
+        if score >= threshold:
+            return label
+    return 'LOW'
+
+
+class HookScorer:
+    def __init__(self, config: BestsellerConfig):
+        self.config = config
+        patterns: List[Tuple[str, object]] = [(cue, ('urgency', None)) for cue in HOOK_URGENCY_CUES]
+        patterns += [(cue, ('family', None)) for cue in HOOK_FAMILY_CUES]
+        self.cultures = list(config.cultures.keys())
+        rows = []
+        for culture_code in self.cultures:
+            culture_data = config.cultures[culture_code]
+            patterns += [(trigger, ('culture_trigger', culture_code)) for trigger in culture_data.cultural_triggers + culture_data.analysis_triggers]
+            patterns += [(pain, ('pain_point', culture_code)) for pain in culture_data.pain_points]
+            rows.append(self._culture_weights(culture_data.emotional_intensity, culture_data.family_focus))
+        # Cultura desconhecida usa os pesos base (intensidade e foco familiar neutros)
+        rows.append(self._culture_weights(0.5, 0.5))
+        self.automaton = KeywordAutomaton(patterns, word_boundary=True, accent_insensitive=True)
+        self._culture_rows = {code: row for row, code in enumerate(self.cultures)}
+        self.np = optional_import('numpy')
+        self.weights = self.np.array(rows) if self.np is not None else rows
+
+    @staticmethod
+    def _culture_weights(emotional_intensity: float, family_focus: float) -> List[float]:
+        weights = list(HOOK_FEATURE_WEIGHTS)
+        for name in ('urgency', 'pain_point'):
+            weights[HOOK_FEATURES.index(name)] *= 0.5 + emotional_intensity
+        weights[HOOK_FEATURES.index('family')] *= 0.5 + family_focus
+        total = sum(weights)
+        return [weight / total for weight in weights]
+
+    def features(self, hook: Hook) -> List[float]:
+        counts = Counter()
+        for match in self.automaton.iter_matches(hook.hook_text):
+            kind, culture = match.payload
+            if culture is None or culture == hook.culture:
+                counts[kind] += 1
+        words = len(hook.hook_text.split())
+        return [
+            math.exp(-((words - HOOK_IDEAL_WORDS) / 8) ** 2),
+            1.0 if '?' in hook.hook_text else 0.0,
+            min(counts['urgency'], 2) / 2,
+            min(counts['culture_trigger'], 3) / 3,
+            min(counts['pain_point'], 1),
+            min(counts['family'], 1),
+            1.0 if any(char.isdigit() for char in hook.hook_text) else 0.0
+        ]
+
+    def score_batch(self, hooks: List[Hook]) -> List[float]:
+        if not hooks:
+            return []
+        matrix = [self.features(hook) for hook in hooks]
+        rows = [self._culture_rows.get(hook.culture, len(self.cultures)) for hook in hooks]
+        if self.np is not None:
+            np = self.np
+            return np.einsum('ij,ij->i', np.array(matrix), self.weights[np.array(rows)]).tolist()
+        return [sum(value * weight for value, weight in zip(vector, self.weights[row])) for vector, row in zip(matrix, rows)]
+
+    def score_hooks(self, hooks: List[Hook]) -> List[Hook]:
+        return [replace(hook, viral_score=round(score, 4), viral_potential=viral_label(score))
+                for hook, score in zip(hooks, self.score_batch(hooks))]
+
+
+def framework_culture_key(hook: Hook) -> Tuple:
+    return hook.product_index, hook.framework, hook.culture
+
+
+class HookRanker:
+    # Heap mínimo de tamanho K por chave: o pior dos K melhores sai primeiro quando chega um hook melhor
+    def __init__(self, k: int, key=framework_culture_key):
+        self.k = k
+        self.key = key
+        self._heaps: Dict[Tuple, List[Tuple[float, int, Hook]]] = {}
+        self._sequence = itertools.count()
+
+    def offer(self, hook: Hook) -> bool:
+        heap = self._heaps.setdefault(self.key(hook), [])
+        # Empate favorece o hook mais antigo: a sequência negativa faz o mais novo sair antes
+        entry = (hook.viral_score, -next(self._sequence), hook)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+            return True
+        if entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+            return True
+        return False
+
+    def top(self, key: Tuple) -> List[Hook]:
+        return [hook for _, _, hook in sorted(self._heaps.get(key, ()), key=lambda entry: entry[:2], reverse=True)]
+
+    def pop(self, key: Tuple) -> List[Hook]:
+        hooks = self.top(key)
+        self._heaps.pop(key, None)
+        return hooks
+
+    def best(self) -> Iterator[Hook]:
+        for key in sorted(self._heaps, key=str):
+            yield from self.top(key)
+
+
+# =============================================
+# 6. MOTOR EM LOTE (headless, sem GUI)
+# =============================================
+
+async def notify(callback, *args):
+    # Callbacks assíncronos (ex.: fila de scripts cheia) seguram o produtor: é assim que a contrapressão chega aos hooks
+    result = callback(*args)
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def gather_bounded(coros: List, limit: int) -> List:
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(coro) for coro in coros))
+
+
+class AsyncLoopWorker:
+    def __init__(self, name: str = 'videobot-async'):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro):
+        return self.submit(coro).result()
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# Deduplicação de hooks quase idênticos: MinHash estima a similaridade de Jaccard dos shingles e o
+# índice LSH só compara o hook novo com quem cai no mesmo balde, sem varrer todos os anteriores
+
+# Primo de 31 bits: assinaturas cabem em array('I') (4 bytes por permutação)
+MINHASH_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+class HookDeduplicator:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 32, bands: int = 8, shingle_size: int = 4, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm precisa ser múltiplo de bands")
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME)) for _ in range(num_perm)]
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[int, array] = {}
+        self._scope_keys: Dict[object, List[int]] = {}
+        self.cluster_sizes: Counter = Counter()
+        self.dropped = 0
+
+    def _shingles(self, text: str) -> List[int]:
+        folded = _NON_WORD.sub(' ', ''.join(map(_strip_accent, text.lower()))).strip()
+        size = self.shingle_size
+        if len(folded) <= size:
+            return [zlib.crc32(folded.encode('utf-8'))]
+        return list({zlib.crc32(folded[i:i + size].encode('utf-8')) for i in range(len(folded) - size + 1)})
+
+    def signature(self, text: str) -> array:
+        shingles = self._shingles(text)
+        return array('I', [min([(a * value + b) % MINHASH_PRIME for value in shingles]) for a, b in self._perms])
+
+    def _band_keys(self, signature: array, scope=None) -> Iterator[Tuple[Dict[int, List[int]], int]]:
+        # O escopo entra na chave do balde: hooks de produtos diferentes nunca viram candidatos entre si
+        rows = self.rows
+        for band, buckets in enumerate(self._buckets):
+            yield buckets, hash((scope, tuple(signature[band * rows:(band + 1) * rows])))
+
+    def similarity(self, first: array, second: array) -> float:
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+    def find(self, signature: array, scope=None) -> Optional[int]:
+        seen = set()
+        for buckets, key in self._band_keys(signature, scope):
+            for candidate in buckets.get(key, ()):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    if self.similarity(signature, self._signatures[candidate]) >= self.threshold:
+                        return candidate
+        return None
+
+    def match_or_add(self, key: int, text: str = None, signature: array = None, scope=None) -> Optional[int]:
+        # Devolve o representante do grupo quando é quase duplicado; senão indexa o hook como novo representante
+        signature = signature if signature is not None else self.signature(text)
+        representative = self.find(signature, scope)
+        if representative is not None:
+            self.cluster_sizes[representative] += 1
+            self.dropped += 1
+            return representative
+        self._signatures[key] = signature
+        self._scope_keys.setdefault(scope, []).append(key)
+        for buckets, band_key in self._band_keys(signature, scope):
+            buckets.setdefault(band_key, []).append(key)
+        return None
+
+    def discard_scope(self, scope):
+        # Escopo encerrado (ex.: produto concluído no lote): assinaturas e baldes dele deixam de ocupar memória
+        for key in self._scope_keys.pop(scope, ()):
+            signature = self._signatures.pop(key)
+            self.cluster_sizes.pop(key, None)
+            for buckets, band_key in self._band_keys(signature, scope):
+                members = buckets.get(band_key)
+                if members is not None:
+                    members.remove(key)
+                    if not members:
+                        del buckets[band_key]
+
+    def clear(self):
+        for buckets in self._buckets:
+            buckets.clear()
+        self._signatures.clear()
+        self._scope_keys.clear()
+        self.cluster_sizes.clear()
+        self.dropped = 0
+
+
+def build_hook_deduplicator(config: BestsellerConfig) -> HookDeduplicator:
+    return HookDeduplicator(config.dedup_threshold) if 0 < config.dedup_threshold <= 1 else None
+
+
+EXECUTOR_MODES = ('process', 'thread')
+
+
+class ShardedExecutor:
+    # Threads para trabalho de I/O (chamadas de provedor); processos para CPU (templates, análise, pontuação).
+    # Os resultados voltam na ordem da entrada, com no máximo uma janela de itens em voo
+    def __init__(self, mode: str = 'process', workers: int = None, chunksize: int = 64, initializer=None, initargs: Tuple = ()):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Modo de execução desconhecido: {mode} (use {' ou '.join(EXECUTOR_MODES)})")
+        self.mode = mode
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunksize = max(1, chunksize)
+        self.initializer = initializer
+        self.initargs = initargs
+
+    @classmethod
+    def from_config(cls, config: BestsellerConfig, mode: str = None, workers: int = None, **kwargs) -> 'ShardedExecutor':
+        return cls(mode or config.executor_mode, workers or config.workers, **kwargs)
+
+    def _pool(self):
+        if self.mode == 'thread':
+            return multiprocessing.pool.ThreadPool(self.workers, self.initializer, self.initargs)
+        return multiprocessing.Pool(self.workers, self.initializer, self.initargs)
+
+    def map(self, fn, items: Iterable) -> Iterator:
+        # O Pool consome a entrada inteira se deixarmos; a janela mantém a memória constante
+        window = threading.Semaphore(self.workers * self.chunksize * 4)
+        stop = threading.Event()
+
+        def feed():
+            for item in items:
+                while not window.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                yield item
+
+        with self._pool() as pool:
+            try:
+                for result in pool.imap(fn, feed(), self.chunksize):
+                    window.release()
+                    yield result
+                # Fim normal: os workers saem sozinhos e rodam seus finalizadores (ex.: esvaziar o log)
+                pool.close()
+                pool.join()
+            finally:
+                stop.set()
+
+
+INDEXED_HOOK_FIELDS = ('framework', 'culture', 'viral_potential')
+
+
+def _sorted_contains(values: List[int], value: int) -> bool:
+    position = bisect.bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+
+class ResultStore:
+    def __init__(self, dedup: HookDeduplicator = None):
+        self.dedup = dedup
+        self.hooks: List[Hook] = []
+        self.scripts: List[Script] = []
+        self.events: 'queue.SimpleQueue[Tuple[str, object]]' = queue.SimpleQueue()
+        self.indexes: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_HOOK_FIELDS}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> bool:
+        dedup = self.dedup
+        signature = dedup.signature(hook.hook_text) if dedup else None
+        # Lista e fila avançam juntas para o índice da GUI bater com self.hooks
+        with self._lock:
+            position = len(self.hooks)
+            if dedup and dedup.match_or_add(position, signature=signature) is not None:
+                return False
+            self.hooks.append(hook)
+            for field, index in self.indexes.items():
+                index.setdefault(getattr(hook, field), []).append(position)
+            self.events.put(('hook', hook))
+        return True
+
+    def query(self, filters: Dict[str, str], start: int = 0, stop: int = None) -> List[int]:
+        stop = len(self.hooks) if stop is None else stop
+        if not filters:
+            return list(range(start, stop))
+        postings = []
+        for field, value in filters.items():
+            values = self.indexes[field].get(value, [])
+            postings.append(values[bisect.bisect_left(values, start):bisect.bisect_left(values, stop)])
+        postings.sort(key=len)
+        return [position for position in postings[0] if all(_sorted_contains(other, position) for other in postings[1:])]
+
+    def add_script(self, script: Script):
+        with self._lock:
+            self.scripts.append(script)
+            self.events.put(('script', script))
+
+    def post(self, kind: str, payload=None):
+        self.events.put((kind, payload))
+
+    def drain(self, limit: int) -> List[Tuple[str, object]]:
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def clear(self):
+        with self._lock:
+            self.hooks.clear()
+            self.scripts.clear()
+            for index in self.indexes.values():
+                index.clear()
+            if self.dedup:
+                self.dedup.clear()
+            pending = self.drain(sys.maxsize)
+            for kind, payload in pending:
+                if kind not in ('hook', 'script'):
+                    self.events.put((kind, payload))
+
+
+# Checkpoint por unidade (produto × framework × cultura): retomar não repete chamadas pagas
+
+JOB_RUNNING, JOB_DONE, JOB_CANCELLED, JOB_FAILED = 'running', 'done', 'cancelled', 'failed'
+RESUMABLE_JOB_STATUSES = (JOB_RUNNING, JOB_CANCELLED, JOB_FAILED)
+
+
+def unit_key(product_index: int, product: Dict, framework: str, culture: str) -> str:
+    # O hash do produto impede retomar sobre um catálogo que mudou de conteúdo
+    digest = hashlib.sha1(json.dumps(product, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()[:12]
+    return f"{product_index}:{framework}:{culture}:{digest}"
+
+
+class JobStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS units ('
+            'job_id TEXT NOT NULL, unit_key TEXT NOT NULL, product_index INTEGER NOT NULL, framework TEXT NOT NULL, culture TEXT NOT NULL, '
+            'hooks TEXT NOT NULL, completed REAL NOT NULL, PRIMARY KEY (job_id, unit_key))'
+        )
+        self._db.commit()
+
+    def create_job(self, job_id: str, kind: str, params: Dict):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO jobs (job_id, kind, status, params, created, updated) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, JOB_RUNNING, json.dumps(params, ensure_ascii=False), now, now)
+            )
+            self._db.execute('UPDATE jobs SET status = ?, updated = ? WHERE job_id = ?', (JOB_RUNNING, now, job_id))
+            self._db.commit()
+
+    def set_status(self, job_id: str, status: str):
+        with self._lock:
+            self._db.execute('UPDATE jobs SET status = ?, updated = ? WHERE job_id = ?', (status, time.time(), job_id))
+            self._db.commit()
+
+    def _job_from_row(self, row) -> Dict:
+        units = self._db.execute('SELECT COUNT(*) FROM units WHERE job_id = ?', (row[0],)).fetchone()[0]
+        return {'job_id': row[0], 'kind': row[1], 'status': row[2], 'params': json.loads(row[3]),
+                'created': row[4], 'updated': row[5], 'units_done': units}
+
+    def get_job(self, job_id: str) -> Dict:
+        with self._lock:
+            row = self._db.execute('SELECT job_id, kind, status, params, created, updated FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            return self._job_from_row(row) if row else None
+
+    def latest_job(self, kind: str, statuses: Tuple[str, ...] = RESUMABLE_JOB_STATUSES) -> Dict:
+        placeholders = ', '.join('?' * len(statuses))
+        with self._lock:
+            row = self._db.execute(
+                f'SELECT job_id, kind, status, params, created, updated FROM jobs WHERE kind = ? AND status IN ({placeholders}) '
+                'ORDER BY updated DESC LIMIT 1', (kind, *statuses)
+            ).fetchone()
+            return self._job_from_row(row) if row else None
+
+    def completed_units(self, job_id: str) -> set:
+        with self._lock:
+            return {row[0] for row in self._db.execute('SELECT unit_key FROM units WHERE job_id = ?', (job_id,))}
+
+    def unit_hooks(self, job_id: str, key: str) -> List[Hook]:
+        with self._lock:
+            row = self._db.execute('SELECT hooks FROM units WHERE job_id = ? AND unit_key = ?', (job_id, key)).fetchone()
+        return [Hook.from_dict(data) for data in json.loads(row[0])] if row else []
+
+    def record_unit(self, job_id: str, key: str, product_index: int, framework: str, culture: str, hooks: List[Hook]):
+        text = json.dumps([hook.to_dict() for hook in hooks], ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO units (job_id, unit_key, product_index, framework, culture, hooks, completed) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, key, product_index, framework, culture, text, time.time())
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+
+def build_job_store(config: BestsellerConfig) -> JobStore:
+    try:
+        return JobStore(config.jobs_path)
+    except sqlite3.Error as e:
+        config.logger.warning(f"Registro de jobs indisponível ({e}), gerações não poderão ser retomadas")
+        return None
+
+
+class BestsellerBatchEngine:
+    def __init__(self, config: BestsellerConfig, hook_generator: 'BestsellerHookGenerator' = None, concurrency: int = None, job_store: JobStore = None):
+        self.config = config
+        self.hook_generator = hook_generator or BestsellerHookGenerator(config)
+        self.frameworks = self.hook_generator.frameworks
+        self.concurrency = max(1, concurrency or config.max_concurrency)
+        self.job_store = job_store
+        self.scorer = HookScorer(config)
+
+    @staticmethod
+    def load_products(path: str) -> List[Dict]:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                return [json.loads(line) for line in f if line.strip()]
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('products', [data])
+        return list(data)
+
+    def build_matrix(self, products: List[Dict], frameworks: List[str] = None, cultures: List[str] = None) -> List[Tuple[int, Dict, str, str]]:
+        return list(self.iter_matrix(products, frameworks, cultures))
+
+    def iter_matrix(self, products: Iterable[Dict], frameworks: List[str] = None, cultures: List[str] = None) -> Iterator[Tuple[int, Dict, str, str]]:
+        # Eixos validados já na chamada; as combinações saem sob demanda, produto a produto
+        frameworks, cultures = resolve_matrix_axes(self.config, self.frameworks, frameworks, cultures)
+        return ((product_index, product, framework, culture)
+                for product_index, product in enumerate(products)
+                for framework in frameworks
+                for culture in cultures)
+
+    async def generate_unit(self, product_index: int, product: Dict, framework: str, culture: str, num_hooks: int, on_hook=None) -> List[Hook]:
+        product_name = product.get('name', f'produto_{product_index}')
+
+        def tag(generated: Dict, variation: int) -> Hook:
+            return Hook.from_generated(generated, framework=framework, culture=culture, source='product',
+                                       product=product_name, product_index=product_index, variation=variation)
+
+        if on_hook is None:
+            generated = await self.hook_generator.generate_hooks_from_product(product, culture, framework, num_hooks)
+            return [tag(item, variation) for variation, item in enumerate(generated, start=1)]
+        hooks = []
+        async for item in self.hook_generator.stream_hooks_from_product(product, culture, framework, num_hooks):
+            hook = tag(item, len(hooks) + 1)
+            hooks.append(hook)
+            await notify(on_hook, hook)
+        return hooks
+
+    async def _run_units(self, units: Iterable[Tuple[int, Dict, str, str]], num_hooks: int, on_unit, on_hook=None, job_id: str = None):
+        checkpoint = self.job_store if job_id else None
+        done = await asyncio.to_thread(checkpoint.completed_units, job_id) if checkpoint else set()
+        if done:
+            self.config.logger.info(f"Retomando job: {len(done)} combinações já concluídas serão reaproveitadas")
+
+        async def run_unit(position: int, unit):
+            key = unit_key(*unit) if checkpoint else None
+            if key in done:
+                hooks = await asyncio.to_thread(checkpoint.unit_hooks, job_id, key)
+                if on_hook:
+                    for hook in hooks:
+                        await notify(on_hook, hook)
+            else:
+                hooks = await self.generate_unit(*unit, num_hooks, on_hook=on_hook)
+                if checkpoint:
+                    await asyncio.to_thread(checkpoint.record_unit, job_id, key, unit[0], unit[2], unit[3], hooks)
+            await notify(on_unit, position, unit, hooks)
+
+        # N workers puxam do mesmo iterador: só há N combinações em voo, nunca uma tarefa por combinação do catálogo
+        pending = enumerate(units)
+
+        async def worker():
+            for position, unit in pending:
+                await run_unit(position, unit)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run_async(self, units: Iterable[Tuple[int, Dict, str, str]], num_hooks: int = 5, on_hooks=None, on_hook=None, job_id: str = None) -> List[Hook]:
+        # Sem callbacks os hooks voltam numa lista, na ordem das combinações; com callbacks só passam por elas
+        collected = {} if on_hooks is None and on_hook is None else None
+
+        async def on_unit(position: int, unit, hooks: List[Hook]):
+            if collected is not None:
+                collected[position] = hooks
+            if on_hooks:
+                await notify(on_hooks, hooks)
+
+        await self._run_units(units, num_hooks, on_unit, on_hook=on_hook, job_id=job_id)
+        return [hook for position in sorted(collected) for hook in collected[position]] if collected is not None else []
+
+    def run(self, products: List[Dict], frameworks: List[str] = None, cultures: List[str] = None, num_hooks: int = 5, on_hooks=None, on_hook=None, job_id: str = None, job_params: Dict = None,
+            script_pipeline: 'ScriptPipeline' = None, script_duration: int = 30, dedup: HookDeduplicator = None, top_k: int = 0) -> List[Hook]:
+        axes = resolve_matrix_axes(self.config, self.frameworks, frameworks, cultures)
+        units_per_product = len(axes[0]) * len(axes[1])
+        units = self.iter_matrix(products, *axes)
+        job_id = job_id or new_job_id('batch')
+        self.config.logger.info(f"Lote: {len(products)} produtos, {len(products) * units_per_product} combinações framework × cultura", extra={'job_id': job_id})
+
+        async def run_and_close():
+            current_job_id.set(job_id)
+            seen = itertools.count()
+            ranker = HookRanker(top_k) if script_pipeline and top_k else None
+            # Com callbacks nada se acumula: os hooks de cada combinação passam adiante e somem quando ela termina
+            emitted: Optional[List[Hook]] = [] if on_hook is None and on_hooks is None else None
+            open_units: Counter = Counter()
+
+            async def end_unit(position: int, unit: Tuple[int, Dict, str, str], hooks: List[Hook]):
+                product_index = unit[0]
+                # A combinação é pontuada numa única chamada vetorizada; a saída avança de combinação em combinação
+                kept = [hook for hook in self.scorer.score_hooks(hooks)
+                        if not dedup or dedup.match_or_add(next(seen), hook.hook_text, scope=product_index) is None]
+                if emitted is not None:
+                    emitted.extend(kept)
+                if on_hook:
+                    for hook in kept:
+                        await notify(on_hook, hook)
+                if on_hooks:
+                    await notify(on_hooks, kept)
+                if script_pipeline:
+                    if ranker:
+                        for hook in kept:
+                            ranker.offer(hook)
+                        kept = ranker.pop(framework_culture_key(kept[0])) if kept else []
+                    for hook in kept:
+                        await script_pipeline.put(hook, products[product_index], script_duration)
+                # Produto com todas as combinações concluídas não recebe mais hooks: o dedup libera o escopo dele
+                open_units[product_index] += 1
+                if open_units[product_index] == units_per_product:
+                    del open_units[product_index]
+                    if dedup:
+                        dedup.discard_scope(product_index)
+
+            try:
+                async with script_pipeline or contextlib.nullcontext():
+                    await self._run_units(units, num_hooks, end_unit, job_id=job_id)
+                return emitted if emitted is not None else []
+            finally:
+                if self.hook_generator.provider:
+                    await self.hook_generator.provider.aclose()
+                if self.hook_generator.cache:
+                    await asyncio.to_thread(self.hook_generator.cache.flush)
+                    self.config.logger.info(self.hook_generator.cache.summary())
+
+        if self.job_store:
+            self.job_store.create_job(job_id, 'batch', dict(job_params or {}, frameworks=frameworks or [], cultures=cultures or [], num_hooks=num_hooks))
+        try:
+            result = asyncio.run(run_and_close())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            if self.job_store:
+                self.job_store.set_status(job_id, JOB_CANCELLED)
+            raise
+        except Exception:
+            if self.job_store:
+                self.job_store.set_status(job_id, JOB_FAILED)
+            raise
+        if self.job_store:
+            self.job_store.set_status(job_id, JOB_DONE)
+        return result
+
+
+class ScriptPipeline:
+    # Fila limitada entre hooks e scripts: quem produz hooks espera quando os workers de script ficam para trás
+    def __init__(self, script_generator: 'BestsellerScriptGenerator', config: BestsellerConfig, concurrency: int = None,
+                 queue_size: int = None, on_begin=None, on_section=None, on_script=None, log=None):
+        self.script_generator = script_generator
+        self.config = config
+        self.concurrency = max(1, concurrency or config.max_concurrency)
+        self.queue_size = queue_size or self.concurrency * 2
+        self.on_begin = on_begin
+        self.on_section = on_section
+        self.on_script = on_script
+        self.log = log or (lambda message, progress=False: config.logger.info(message, extra={'progress': progress}))
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._queue: asyncio.Queue = None
+        self._workers: List['asyncio.Task'] = []
+
+    async def __aenter__(self) -> 'ScriptPipeline':
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            for _ in self._workers:
+                await self._queue.put(None)
+        else:
+            for worker in self._workers:
+                worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=exc_type is not None)
+        self._workers = []
+
+    async def put(self, hook: Hook, product_info: Dict, duration: int = 30):
+        self.submitted += 1
+        await self._queue.put((hook, product_info, duration))
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            hook, product_info, duration = item
+            # Callbacks também ficam dentro do try: um worker morto travaria quem espera na fila limitada
+            try:
+                script = await self._generate(hook, product_info, duration)
+                if self.on_script:
+                    await notify(self.on_script, script)
+            except Exception as e:
+                self.failed += 1
+                self.log(f"Falha no script para '{hook.hook_text[:50]}': {e}")
+                continue
+            self.completed += 1
+            self.log(f"Script {self.completed}/{self.submitted}: {script.framework_used} / {script.culture}", progress=True)
+
+    async def _generate(self, hook: Hook, product_info: Dict, duration: int) -> Script:
+        framework = hook.framework or 'hormozi_grand_slam_offer'
+        culture = hook.culture or 'pt-BR'
+        mark = self.on_begin(hook, framework) if self.on_begin else None
+        sections = []
+        async for section in self.script_generator.stream_complete_script(hook, product_info, culture, framework, duration):
+            sections.append(section)
+            if self.on_section:
+                self.on_section(mark, section)
+        if not sections:
+            raise ValueError("script sem seções")
+        return Script.from_generated(hook, assemble_script(sections, culture, framework, duration))
+
+    async def run(self, hooks: Iterable[Hook], product_info: Dict, duration: int = 30):
+        async with self:
+            for hook in hooks:
+                await self.put(hook, product_info, duration)
+
+
+# =============================================
+# 6.1 EXPORTADORES EM STREAMING (JSONL, CSV, Parquet)
+# =============================================
+
+COMPRESSION_MODULES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'lzma'}
+PARQUET_CODECS = ('snappy', 'zstd', 'gzip', 'brotli', 'none')
+
+# Colunas fixas por tipo: CSV e Parquet têm o mesmo esquema do primeiro ao último registro
+EXPORT_COLUMNS: Dict[str, List[str]] = {
+    'hook': [item.name for item in fields(Hook)],
+    'script': ['framework_used', 'culture', 'estimated_duration', 'hook_text', 'full_script', 'sections'],
+    'analysis': ['line', 'id', 'detected_framework', 'framework_confidence', 'framework_scores', 'cultural_compatibility',
+                 'readability_score', 'persuasion_score', 'viral_potential']
+}
+
+
+def _split_compression(path: str) -> Tuple[str, str]:
+    base, suffix = os.path.splitext(path)
+    return (base, suffix) if suffix in COMPRESSION_MODULES else (path, '')
+
+
+def export_format(path: str) -> str:
+    extension = os.path.splitext(_split_compression(path)[0])[1].lower()
+    return {'.csv': 'csv', '.parquet': 'parquet'}.get(extension, 'jsonl')
+
+
+def _open_text_output(path: str):
+    if path == '-':
+        return sys.stdout
+    suffix = _split_compression(path)[1]
+    if suffix:
+        return importlib.import_module(COMPRESSION_MODULES[suffix]).open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _open_text_input(path: str):
+    suffix = _split_compression(path)[1]
+    if suffix:
+        return importlib.import_module(COMPRESSION_MODULES[suffix]).open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_line_batches(path: str, batch_size: int) -> Iterator[List[str]]:
+    # Lê um JSONL (compactado ou não) em lotes de linhas: o parse fica com quem processa o lote
+    with _open_text_input(path) as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            batch = list(itertools.islice(lines, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+_shard_scorer: HookScorer = None
+
+
+def _init_scorer_worker():
+    global _shard_scorer
+    _shard_scorer = HookScorer(BestsellerConfig())
+
+
+def _parse_hook_line(line: str) -> Optional[Hook]:
+    # Linha quebrada, campo faltando ou nulo: a linha é descartada, o ranking continua
+    try:
+        hook = Hook.from_dict(json.loads(line))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return hook if isinstance(hook.hook_text, str) else None
+
+
+def _rank_hook_lines(task: Tuple[List[str], int]) -> Tuple[List[Hook], Counter, int]:
+    # Cada lote devolve só o seu top-K local: o top-K global está contido na união deles
+    lines, top = task
+    parsed = [_parse_hook_line(line) for line in lines]
+    hooks = _shard_scorer.score_hooks([hook for hook in parsed if hook is not None])
+    ranker = HookRanker(top)
+    for hook in hooks:
+        ranker.offer(hook)
+    return list(ranker.best()), Counter(hook.viral_potential for hook in hooks), len(parsed) - len(hooks)
+
+
+def _export_row(kind: str, item) -> Dict:
+    if isinstance(item, Hook):
+        return {name: getattr(item, name) for name in EXPORT_COLUMNS['hook']}
+    if isinstance(item, Script):
+        return {'framework_used': item.framework_used, 'culture': item.culture, 'estimated_duration': item.estimated_duration,
+                'hook_text': item.hook.hook_text, 'full_script': item.full_script,
+                'sections': json.dumps([section.to_dict() for section in item.sections], ensure_ascii=False)}
+    return {name: json.dumps(item.get(name), ensure_ascii=False) if isinstance(item.get(name), (dict, list)) else item.get(name)
+            for name in EXPORT_COLUMNS[kind]}
+
+
+class RecordExporter:
+    def __init__(self, path: str, kind: str):
+        if kind not in EXPORT_COLUMNS:
+            raise ValueError(f"Tipo de exportação desconhecido: {kind}")
+        self.path = path
+        self.kind = kind
+        self.count = 0
+
+    def _write(self, item):
+        raise NotImplementedError
+
+    def write(self, item):
+        self._write(item)
+        self.count += 1
+
+    def write_many(self, items: Iterable):
+        for item in items:
+            self.write(item)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'RecordExporter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlExporter(RecordExporter):
+    def __init__(self, path: str, kind: str):
+        super().__init__(path, kind)
+        self.stream = _open_text_output(path)
+
+    def _write(self, item):
+        record = item.to_dict() if isinstance(item, (Hook, Script)) else item
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class CsvExporter(JsonlExporter):
+    def __init__(self, path: str, kind: str):
+        super().__init__(path, kind)
+        self.writer = csv.DictWriter(self.stream, fieldnames=EXPORT_COLUMNS[kind], extrasaction='ignore')
+        self.writer.writeheader()
+
+    def _write(self, item):
+        self.writer.writerow(_export_row(self.kind, item))
+
+
+class ParquetExporter(RecordExporter):
+    # Grupos de linhas: a memória fica limitada a batch_size registros
+    def __init__(self, path: str, kind: str, compression: str = 'snappy', batch_size: int = 1000):
+        super().__init__(path, kind)
+        self.pa = optional_import('pyarrow')
+        self.pq = optional_import('pyarrow.parquet')
+        if self.pq is None:
+            raise ValueError("Saída Parquet requer pyarrow (pip install pyarrow)")
+        if path == '-' or _split_compression(path)[1]:
+            raise ValueError("Parquet precisa de um arquivo sem extensão de compressão (use --compression)")
+        self.compression = compression
+        self.batch_size = batch_size
+        self._rows: List[Dict] = []
+        self._writer = None
+
+    def _write(self, item):
+        self._rows.append(_export_row(self.kind, item))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = self.pa.Table.from_pylist(self._rows, schema=self._writer.schema if self._writer else None)
+        if self._writer is None:
+            self._writer = self.pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def build_exporter(path: str, kind: str, compression: str = None) -> RecordExporter:
+    fmt = export_format(path)
+    if fmt == 'parquet':
+        return ParquetExporter(path, kind, compression=compression or 'snappy')
+    if compression and compression != 'none':
+        raise ValueError("Para JSONL/CSV a compressão vem da extensão (.gz, .bz2, .xz)")
+    return CsvExporter(path, kind) if fmt == 'csv' else JsonlExporter(path, kind)
+
+
+# Análise de corpus: um analisador por processo, linhas em janela limitada
+
+CORPUS_TEXT_FIELDS = ('copy', 'text', 'body', 'content')
+CORPUS_ID_FIELDS = ('id', 'request_id', 'ad_id')
+
+_corpus_analyzer: 'AdvancedCopyAnalyzer' = None
+
+
+def _init_corpus_worker():
+    global _corpus_analyzer
+    _corpus_analyzer = AdvancedCopyAnalyzer(BestsellerConfig())
+
+
+def _analyze_corpus_line(item: Tuple[int, str]) -> Dict:
+    line_number, line = item
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {'line': line_number, 'error': f"JSON inválido: {e}"}
+    if isinstance(record, str):
+        record = {'copy': record}
+    if not isinstance(record, dict):
+        return {'line': line_number, 'error': "registro não é objeto nem texto"}
+    text = next((record[name] for name in CORPUS_TEXT_FIELDS if isinstance(record.get(name), str)), '')
+    if not text.strip():
+        return {'line': line_number, 'error': "registro sem texto de copy"}
+    record_id = next((record[name] for name in CORPUS_ID_FIELDS if record.get(name) is not None), line_number)
+    result = {'line': line_number, 'id': str(record_id)}
+    result.update(_corpus_analyzer.analyze_record(text))
+    return result
+
+
+def iter_corpus_lines(path: str) -> Iterator[Tuple[int, str]]:
+    with _open_text_input(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, line
+
+
+def analyze_corpus(path: str, processes: int = None, chunksize: int = 64, mode: str = 'process') -> Iterator[Dict]:
+    executor = ShardedExecutor(mode, processes, chunksize, initializer=_init_corpus_worker)
+    return executor.map(_analyze_corpus_line, iter_corpus_lines(path))
+
+
+def write_corpus_results(results: Iterable[Dict], output: str, logger: logging.Logger = None, compression: str = None) -> Tuple[int, int]:
+    skipped = 0
+    with build_exporter(output, 'analysis', compression) as exporter:
+        for result in results:
+            if 'error' in result:
+                skipped += 1
+                if logger:
+                    logger.warning(f"Linha {result['line']} ignorada: {result['error']}")
+                continue
+            exporter.write(result)
+    return exporter.count, skipped
+
+
+# =============================================
+# 6.2 FILA DE TRABALHO (produtores e workers em várias máquinas)
+# =============================================
+
+UNIT_PENDING, UNIT_LEASED, UNIT_DONE, UNIT_FAILED = 'pending', 'leased', 'done', 'failed'
+QUEUE_EXPORT_PAGE = 256
+
+
+class QueueUnit(NamedTuple):
+    key: str
+    product_index: int
+    product: Dict
+    framework: str
+    culture: str
+    num_hooks: int
+    attempts: int
+
 
-    def setup_cultures(self):
-        self.cultures: Dict[str, CultureData] = {
-            'pt-BR': CultureData(
-                name="Brasil",
-                language_code="pt-BR",
-                currency="R$ ",
-                cultural_triggers=['família', 'liberdade', 'reconhecimento', 'segurança', 'sucesso'],
-                pain_points=['falta de dinheiro', 'trabalho demais', 'sem tempo', 'medo do futuro'],
-                preferred_communication="emocional e próximo",
-                emotional_intensity=0.9,
-                family_focus=0.8
-            ),
-            'en-US': CultureData(
-                name="Estados Unidos",
-                language_code="en-US",
-                currency="$",
-                cultural_triggers=['freedom', 'success', 'efficiency', 'innovation', 'independence'],
-                pain_points=['lack of time', 'financial stress', 'competition', 'uncertainty'],
-                preferred_communication="direct and results-focused",
-                emotional_intensity=0.6,
-                family_focus=0.5
-            ),
-            'es-MX': CultureData(
-                name="México",
-                language_code="es-MX",
-                currency="$",
-                cultural_triggers=['familia', 'tradición', 'respeto', 'comunidad', 'superación'],
-                pain_points=['falta de oportunidades', 'preocupación familiar', 'inseguridad económica'],
-                preferred_communication="cálido y familiar",
-                emotional_intensity=0.8,
-                family_focus=0.9
+class WorkQueue:
+    # Cada unidade (produto × framework × cultura) é reservada por um worker com prazo (lease); o heartbeat
+    # renova o prazo e, se o worker morrer, a unidade volta a ficar disponível quando o prazo vence
+    def __init__(self, path: str, queue: str, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.path = path
+        self.queue = queue
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        # Transações explícitas: BEGIN IMMEDIATE serializa a reserva entre processos
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS queue_units ('
+            'queue TEXT NOT NULL, unit_key TEXT NOT NULL, product_index INTEGER NOT NULL, product TEXT NOT NULL, '
+            'framework TEXT NOT NULL, culture TEXT NOT NULL, num_hooks INTEGER NOT NULL, status TEXT NOT NULL, '
+            'attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, lease_until REAL, hooks TEXT, error TEXT, updated REAL NOT NULL, '
+            'PRIMARY KEY (queue, unit_key))'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS queue_units_claim ON queue_units (queue, status, lease_until)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS queue_units_export ON queue_units (queue, status, product_index)')
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self._db)
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+            return result
+
+    def enqueue(self, units: Iterable[Tuple[int, Dict, str, str]], num_hooks: int) -> int:
+        now = time.time()
+        rows = [(self.queue, unit_key(*unit), unit[0], json.dumps(unit[1], ensure_ascii=False), unit[2], unit[3], num_hooks, UNIT_PENDING, now)
+                for unit in units]
+
+        def insert(db) -> int:
+            before = db.total_changes
+            db.executemany(
+                'INSERT OR IGNORE INTO queue_units (queue, unit_key, product_index, product, framework, culture, num_hooks, status, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
             )
-        }
-        # Adições necessárias pelas abas expandidas
-        self.cultures.update({
-            'de-DE': CultureData(
-                name="Alemanha",
-                language_code="de-DE",
-                currency="€",
-                cultural_triggers=['qualität', 'präzision', 'ordnung', 'system', 'zuverlässigkeit'],
-                pain_points=['zeitmangel', 'ineffizienz', 'unsicherheit', 'komplexität'],
-                preferred_communication="sistemático e preciso",
-                emotional_intensity=0.4,
-                family_focus=0.5
-            ),
-            'fr-FR': CultureData(
-                name="França",
-                language_code="fr-FR",
-                currency="€",
-                cultural_triggers=['élégance', 'savoir-faire', 'qualité', 'crédibilité', 'prestige'],
-                pain_points=['manque de temps', 'incertitude', 'complexité', 'coût élevé'],
-                preferred_communication="sofisticado e elegante",
-                emotional_intensity=0.6,
-                family_focus=0.6
-            ),
-            'it-IT': CultureData(
-                name="Itália",
-                language_code="it-IT",
-                currency="€",
-                cultural_triggers=['famiglia', 'passione', 'tradizione', 'bellezza', 'stile'],
-                pain_points=['mancanza di tempo', 'stress finanziario', 'incertezza'],
-                preferred_communication="apaixonado e tradicional",
-                emotional_intensity=0.8,
-                family_focus=0.8
+            return db.total_changes - before
+
+        return self._transaction(insert)
+
+    def claim(self, worker: str, limit: int = 1) -> List[QueueUnit]:
+        def reserve(db) -> List[QueueUnit]:
+            now = time.time()
+            rows = db.execute(
+                'SELECT unit_key, product_index, product, framework, culture, num_hooks, attempts FROM queue_units '
+                'WHERE queue = ? AND (status = ? OR (status = ? AND lease_until < ?)) AND attempts < ? LIMIT ?',
+                (self.queue, UNIT_PENDING, UNIT_LEASED, now, self.max_attempts, limit)
+            ).fetchall()
+            db.executemany(
+                'UPDATE queue_units SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? WHERE queue = ? AND unit_key = ?',
+                [(UNIT_LEASED, worker, now + self.lease_seconds, now, self.queue, row[0]) for row in rows]
             )
-        })
+            return [QueueUnit(row[0], row[1], json.loads(row[2]), row[3], row[4], row[5], row[6] + 1) for row in rows]
 
+        return self._transaction(reserve)
 
-# =============================================
-# 2. FRAMEWORKS
-# =============================================
+    def heartbeat(self, worker: str, keys: Iterable[str]) -> set:
+        # Devolve as unidades que continuam com este worker; as perdidas já podem estar com outro
+        keys = list(keys)
+        if not keys:
+            return set()
 
-class BestsellerFrameworks:
-    def __init__(self):
-        self.frameworks: Dict[str, Dict] = {
-            'hormozi_grand_slam_offer': {
-                'name': 'Hormozi Grand Slam Offer',
-                'expert': 'Alex Hormozi',
-                'book': '$100M Offers',
-                'focus': 'Ofertas irresistíveis',
-                'structure': ['dream_outcome', 'perceived_likelihood', 'time_delay', 'effort_sacrifice'],
-                'template': (
-                    "DREAM OUTCOME: {dream_outcome}\n"
-                    "LIKELIHOOD: {social_proof}\n"
-                    "TIME DELAY: {time_promise}\n"
-                    "EFFORT: {ease_promise}\n"
-                ),
-                'era': 'Moderna'
-            },
-            'brunson_epiphany_bridge': {
-                'name': 'Brunson Epiphany Bridge',
-                'expert': 'Russell Brunson',
-                'book': 'Expert Secrets',
-                'focus': 'Story selling',
-                'structure': ['backstory', 'wall', 'epiphany_experience', 'plan', 'achievement'],
-                'template': (
-                    "BACKSTORY: {relatable_situation}\n"
-                    "WALL: {major_obstacle}\n"
-                    "EPIPHANY: {breakthrough}\n"
-                    "PLAN: {method}\n"
-                    "ACHIEVEMENT: {result}\n"
-                ),
-                'era': 'Moderna'
-            },
-            'kennedy_pas_plus': {
-                'name': 'Kennedy PAS Plus',
-                'expert': 'Dan Kennedy',
-                'book': 'Ultimate Marketing Plan',
-                'focus': 'Problem-Agitate-Solve',
-                'structure': ['problem', 'agitate', 'solve', 'proof', 'close'],
-                'template': (
-                    "PROBLEM: {problem}\n"
-                    "AGITATE: {consequences}\n"
-                    "SOLVE: {solution}\n"
-                    "PROOF: {evidence}\n"
-                    "CLOSE: {cta}\n"
-                ),
-                'era': 'Clássica'
-            },
-            'monster_supreme_framework': {
-                'name': 'MONSTER Supreme',
-                'expert': 'Synthesis',
-                'book': 'Composite',
-                'focus': 'Combinação suprema',
-                'structure': ['scientific_claim','brand_authority','emotional_trigger','transformation_story','grand_slam_offer','superior_value','mass_appeal','urgency_pas','risk_reversal'],
-                'template': 'Template dinâmico',
-                'era': 'Ultimate'
-            }
-        }
+        def renew(db) -> set:
+            now = time.time()
+            db.executemany(
+                'UPDATE queue_units SET lease_until = ?, updated = ? WHERE queue = ? AND unit_key = ? AND status = ? AND worker = ?',
+                [(now + self.lease_seconds, now, self.queue, key, UNIT_LEASED, worker) for key in keys]
+            )
+            placeholders = ', '.join('?' * len(keys))
+            return {row[0] for row in db.execute(
+                f'SELECT unit_key FROM queue_units WHERE queue = ? AND status = ? AND worker = ? AND unit_key IN ({placeholders})',
+                (self.queue, UNIT_LEASED, worker, *keys)
+            )}
 
+        return self._transaction(renew)
 
-# =============================================
-# 3. EXAMPLES STUB (requerido pelas abas)
-# =============================================
+    def complete(self, worker: str, key: str, hooks: List[Hook]) -> bool:
+        text = json.dumps([hook.to_dict() for hook in hooks], ensure_ascii=False)
+        return self._transaction(lambda db: db.execute(
+            'UPDATE queue_units SET status = ?, hooks = ?, error = NULL, lease_until = NULL, updated = ? '
+            'WHERE queue = ? AND unit_key = ? AND status = ? AND worker = ?',
+            (UNIT_DONE, text, time.time(), self.queue, key, UNIT_LEASED, worker)
+        ).rowcount == 1)
 
-class MonsterFrameworkExamples:
-    def get_example(self, culture_code: str, niche: str) -> Dict[str, str]:
-        return {
-            "monster_copy": (
-                "🔬 COMPROVADO: Método que funciona de verdade\n"
-                "🏆 Autoridade no nicho\n"
-                "💔 Você já sentiu a frustração de não ter resultados?\n"
-                "📖 Eu era igual você até descobrir esta solução\n"
-                "🎁 Oferta: como alcançar o resultado em pouco tempo\n"
-                "⭐ Valor superior ao mercado\n"
-                "👥 Milhares já comprovaram\n"
-                "⚠️ Urgente: ação agora\n"
-                "✅ Garantia total"
-            )
-        }
+    def fail(self, worker: str, key: str, error: str):
+        # Volta para a fila até esgotar as tentativas
+        self._transaction(lambda db: db.execute(
+            'UPDATE queue_units SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, lease_until = NULL, updated = ? '
+            'WHERE queue = ? AND unit_key = ? AND status = ? AND worker = ?',
+            (self.max_attempts, UNIT_FAILED, UNIT_PENDING, error, time.time(), self.queue, key, UNIT_LEASED, worker)
+        ))
 
+    def release(self, worker: str, keys: Iterable[str]):
+        # Worker encerrado devolve o que reservou sem gastar tentativa
+        self._transaction(lambda db: db.executemany(
+            'UPDATE queue_units SET status = ?, lease_until = NULL, attempts = attempts - 1, updated = ? '
+            'WHERE queue = ? AND unit_key = ? AND status = ? AND worker = ?',
+            [(UNIT_PENDING, time.time(), self.queue, key, UNIT_LEASED, worker) for key in keys]
+        ))
 
-# =============================================
-# 4. GERADORES (simplificado; mantém assinaturas usadas pela GUI)
-# =============================================
+    def counts(self) -> Counter:
+        # Reserva vencida sem tentativas restantes (worker morreu na última) não volta mais: conta como falha
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT CASE WHEN status = ? AND lease_until < ? AND attempts >= ? THEN ? ELSE status END, COUNT(*) '
+                'FROM queue_units WHERE queue = ? GROUP BY 1',
+                (UNIT_LEASED, time.time(), self.max_attempts, UNIT_FAILED, self.queue)
+            ).fetchall()
+        return Counter(dict(rows))
 
-class BestsellerHookGenerator:
-    def __init__(self, config: BestsellerConfig):
-        self.config = config
-        self.frameworks = BestsellerFrameworks()
-        if self.config.apis['openai'] and openai:
-            try:
-                self.openai_client = openai.OpenAI(api_key=self.config.apis['openai'])
-            except Exception:
-                self.openai_client = None
-        else:
-            self.openai_client = None
-        if self.config.apis['gemini'] and genai:
-            try:
-                genai.configure(api_key=self.config.apis['gemini'])
-                self.gemini_model = genai.GenerativeModel('gemini-pro')
-            except Exception:
-                self.gemini_model = None
-        else:
-            self.gemini_model = None
+    def has_open_units(self) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT 1 FROM queue_units WHERE queue = ? AND status IN (?, ?) AND attempts < ? '
+                'UNION ALL SELECT 1 FROM queue_units WHERE queue = ? AND status = ? AND lease_until >= ? LIMIT 1',
+                (self.queue, UNIT_PENDING, UNIT_LEASED, self.max_attempts, self.queue, UNIT_LEASED, time.time())
+            ).fetchone()
+        return row is not None
 
-    async def generate_hooks_from_product(self, product_info: Dict, culture: str, framework: str, num_hooks: int = 5) -> List[Dict]:
-        hooks = []
-        base = product_info.get('name', 'Seu produto')
-        for i in range(num_hooks):
-            hooks.append({
-                'hook_text': f"[{framework}] [{culture}] {base}: resultado em pouco tempo (var {i+1})",
-                'viral_potential': 'MEDIUM'
-            })
-        return hooks
+    def iter_hooks(self, dedup: HookDeduplicator = None) -> Iterator[Hook]:
+        # Workers não se enxergam: os quase duplicados de cada produto saem aqui, como no lote
+        keys = itertools.count()
+        current = None
+        for product_index, hooks in self._iter_done_units():
+            if dedup and product_index != current:
+                dedup.discard_scope(current)
+                current = product_index
+            for data in json.loads(hooks):
+                hook = Hook.from_dict(data)
+                if dedup and dedup.match_or_add(next(keys), hook.hook_text, scope=product_index) is not None:
+                    continue
+                yield hook
 
-    async def generate_hooks_from_copy(self, existing_copy: str, culture: str, framework: str, num_variations: int = 3) -> List[Dict]:
-        return [{
-            'hook_text': existing_copy[:80] + '...',
-            'variation_type': 'original',
-            'viral_potential': 'MEDIUM',
-            'framework_element': framework
-        } for _ in range(num_variations)]
+    def _iter_done_units(self) -> Iterator[Tuple[int, str]]:
+        # Páginas por (product_index, rowid): a memória fica em uma página e o lock não é segurado entre elas.
+        # rowid segue a ordem de enfileiramento, a mesma da matriz do lote
+        position = (-1, -1)
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    'SELECT product_index, rowid, hooks FROM queue_units WHERE queue = ? AND status = ? '
+                    'AND (product_index, rowid) > (?, ?) ORDER BY product_index, rowid LIMIT ?',
+                    (self.queue, UNIT_DONE, *position, QUEUE_EXPORT_PAGE)
+                ).fetchall()
+            for product_index, _, hooks in rows:
+                yield product_index, hooks
+            if len(rows) < QUEUE_EXPORT_PAGE:
+                return
+            position = rows[-1][:2]
 
+    def failures(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._db.execute('SELECT unit_key, error FROM queue_units WHERE queue = ? AND status = ?',
+                                    (self.queue, UNIT_FAILED)).fetchall()
 
-class BestsellerScriptGenerator:
-    def __init__(self, config: BestsellerConfig):
-        self.config = config
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
 
-    async def generate_complete_script(self, hook: Dict, product_info: Dict, culture: str, framework: str, duration: int = 30) -> Dict:
-        text = (
-            f"HOOK: {hook.get('hook_text','')}\n\n"
-            f"Se você tem {product_info.get('problem','este problema')}, conheça {product_info.get('solution','esta solução')}\n"
-            f"Aja agora."
-        )
-        return {
-            'framework_used': framework,
-            'culture': culture,
-            'full_script': text,
-            'sections': [{'section_name': 'Complete', 'content': text, 'duration_estimate': duration}],
-            'estimated_duration': duration
-        }
 
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
 
-# =============================================
-# 5. ANALISADOR (métodos usados pela GUI)
-# =============================================
 
-class AdvancedCopyAnalyzer:
-    def __init__(self, config: BestsellerConfig):
+class QueueWorker:
+    def __init__(self, config: BestsellerConfig, queue: WorkQueue, name: str = None, engine: BestsellerBatchEngine = None,
+                 concurrency: int = None, poll_seconds: float = 2.0):
         self.config = config
-        self.frameworks = BestsellerFrameworks()
+        self.queue = queue
+        self.name = name or default_worker_name()
+        self.engine = engine or BestsellerBatchEngine(config)
+        self.concurrency = max(1, concurrency or config.max_concurrency)
+        self.poll_seconds = poll_seconds
+        self.completed = 0
+        self.failed = 0
+        self._held: set = set()
 
-    def analyze_copy_structure(self, copy_text: str) -> Dict:
-        return {
-            'detected_framework': 'hormozi_grand_slam_offer',
-            'framework_confidence': 0.72,
-            'elements_found': [{'type': 'Social Proof', 'strength': 0.5}],
-            'missing_elements': [],
-            'suggestions': ['Adicionar urgência'],
-            'readability_score': 8,
-            'persuasion_score': 7,
-            'viral_potential': 'MEDIUM'
-        }
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            held = set(self._held)
+            kept = await asyncio.to_thread(self.queue.heartbeat, self.name, held)
+            for key in held - kept:
+                self.config.logger.warning(f"Reserva perdida (prazo vencido): {key}")
 
-    def _calculate_framework_match(self, copy_text: str, framework: Dict) -> float:
-        return 0.5
+    async def _process(self, unit: QueueUnit):
+        try:
+            hooks = await self.engine.generate_unit(unit.product_index, unit.product, unit.framework, unit.culture, unit.num_hooks)
+            hooks = self.engine.scorer.score_hooks(hooks)
+            if await asyncio.to_thread(self.queue.complete, self.name, unit.key, hooks):
+                self.completed += 1
+                self.config.logger.info(f"Unidade concluída: {unit.framework} / {unit.culture} (produto {unit.product_index})", extra={'progress': True})
+        except Exception as e:
+            self.failed += 1
+            self.config.logger.error(f"Falha na unidade {unit.key} (tentativa {unit.attempts}): {e}")
+            await asyncio.to_thread(self.queue.fail, self.name, unit.key, str(e))
+        # Cancelado (worker encerrando), a unidade segue reservada até run_async devolvê-la à fila
+        self._held.discard(unit.key)
+
+    async def run_async(self, wait: bool = False) -> int:
+        heartbeat = asyncio.create_task(self._heartbeat())
+        running: set = set()
+        try:
+            while True:
+                if len(running) < self.concurrency:
+                    units = await asyncio.to_thread(self.queue.claim, self.name, self.concurrency - len(running))
+                    for unit in units:
+                        self._held.add(unit.key)
+                        running.add(asyncio.create_task(self._process(unit)))
+                if not running:
+                    # Reservas de outros workers ainda podem vencer e voltar para a fila
+                    if not wait and not await asyncio.to_thread(self.queue.has_open_units):
+                        break
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+                _, running = await asyncio.wait(running, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            heartbeat.cancel()
+            for task in running:
+                task.cancel()
+            await asyncio.gather(heartbeat, *running, return_exceptions=True)
+            if self._held:
+                await asyncio.to_thread(self.queue.release, self.name, set(self._held))
+                self._held.clear()
+        return self.completed
+
+    def run(self, wait: bool = False) -> int:
+        async def run_and_close():
+            current_job_id.set(self.queue.queue)
+            try:
+                return await self.run_async(wait)
+            finally:
+                if self.engine.hook_generator.provider:
+                    await self.engine.hook_generator.provider.aclose()
+                if self.engine.hook_generator.cache:
+                    await asyncio.to_thread(self.engine.hook_generator.cache.flush)
+
+        return asyncio.run(run_and_close())
 
 
 # =============================================
-# 6. GUI CONSOLIDADA (abas expandidas)
+# 7. GUI CONSOLIDADA (abas expandidas)
 # =============================================
 
 class MonsterFrameworkDemo:
@@ -322,49 +3077,143 @@ class MonsterFrameworkDemo:
         self.config = config
         self.examples = MonsterFrameworkExamples()
 
+        self.renderer = TemplateRenderer(config)
+
     def generate_monster_example(self, product_info: Dict, culture_code: str) -> str:
-        culture_data = self.config.cultures.get(culture_code)
-        if not culture_data:
+        if culture_code not in self.config.cultures:
             return "Cultura não suportada"
-        template = (
-            "🔬 {scientific_claim}\n"
-            "🏆 {brand_authority}\n"
-            "💔 {emotional_trigger}\n"
-            "📖 {transformation_story}\n"
-            "🎁 {grand_slam_offer}\n"
-            "⭐ {superior_value}\n"
-            "👥 {mass_appeal}\n"
-            "⚠️ {urgency_pas}\n"
-            "✅ {risk_reversal}\n"
-        )
-        return template.format(
-            scientific_claim=f"COMPROVADO: {product_info.get('name','Este método')} funciona",
-            brand_authority=f"Usado por especialistas em {product_info.get('niche','marketing')}",
-            emotional_trigger=f"Você já sentiu a frustração de {product_info.get('problem','não ter resultados')}?",
-            transformation_story=f"Eu era igual você até descobrir {product_info.get('solution','esta solução')}",
-            grand_slam_offer=f"Como {product_info.get('avatar','você')} pode {product_info.get('solution','resolver isso')}",
-            superior_value=f"Enquanto outros cobram {culture_data.currency}5.000+, acesso completo",
-            mass_appeal="Milhares já comprovaram",
-            urgency_pas="PROBLEMA → CONSEQUÊNCIA → SOLUÇÃO → AÇÃO",
-            risk_reversal="Garantia total"
-        )
+        return self.renderer.render(product_info, culture_code, 'monster_supreme_framework')
+
+
+UI_FLUSH_MS = 100
+UI_FLUSH_BATCH = 5000
+LIVE_ANALYSIS_DELAY_MS = 250
+EXPORT_FILETYPES = [("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("Parquet", "*.parquet"),
+                    ("JSON Lines gzip", "*.jsonl.gz"), ("CSV gzip", "*.csv.gz")]
+
+
+class VirtualHookList:
+    def __init__(self, parent, store: ResultStore, format_row):
+        self.store = store
+        self.format_row = format_row
+        self.filters: Dict[str, str] = {}
+        self.view = range(0)
+        self.top = 0
+        self.visible_rows = 15
+        self._seen = 0
+        self.frame = ttk.Frame(parent)
+        self.listbox = tk.Listbox(self.frame, height=self.visible_rows, width=100, activestyle='none', exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self._on_scroll)
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+        self._line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') + 1
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<MouseWheel>', self._on_wheel)
+        self.listbox.bind('<Button-4>', self._on_wheel)
+        self.listbox.bind('<Button-5>', self._on_wheel)
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def set_filters(self, **filters):
+        self.filters = {field: value for field, value in filters.items() if value}
+        self._seen = len(self.store.hooks)
+        self.view = self.store.query(self.filters, 0, self._seen) if self.filters else range(self._seen)
+        self.top = 0
+        self.render()
+
+    def refresh(self):
+        following = self.top + self.visible_rows >= len(self.view)
+        total = len(self.store.hooks)
+        if self.filters:
+            self.view.extend(self.store.query(self.filters, self._seen, total))
+        else:
+            self.view = range(total)
+        self._seen = total
+        if following:
+            self.top = max(0, len(self.view) - self.visible_rows)
+        self.render()
+
+    def reset(self):
+        self._seen = 0
+        self.view = [] if self.filters else range(0)
+        self.top = 0
+        self.render()
+
+    def render(self):
+        selected = self.selected_index()
+        window = self.view[self.top:self.top + self.visible_rows]
+        self.listbox.delete(0, tk.END)
+        if window:
+            self.listbox.insert(tk.END, *(self.format_row(self.store.hooks[i]) for i in window))
+        if selected is not None and selected in window:
+            self.listbox.selection_set(list(window).index(selected))
+        total = len(self.view)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total)) if total else self.scrollbar.set(0, 1)
+
+    def scroll_to(self, top: int):
+        top = max(0, min(top, len(self.view) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def selected_index(self):
+        selection = self.listbox.curselection()
+        if selection and self.top + selection[0] < len(self.view):
+            return self.view[self.top + selection[0]]
+        return None
+
+    def _on_scroll(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * len(self.view)))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def _on_wheel(self, event):
+        up = getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0
+        self.scroll_to(self.top + (-3 if up else 3))
+        return 'break'
+
+    def _on_resize(self, event):
+        rows = max(1, (event.height - 4) // self._line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
 
 
 class BestsellerVideoBotGUI:
     def __init__(self):
+        _import_tkinter()
         self.root = tk.Tk()
         self.root.title("VideoBot BESTSELLERS - Frameworks Completos")
         self.root.geometry("1200x800")
 
         self.config = BestsellerConfig()
         self.hook_generator = BestsellerHookGenerator(self.config)
-        self.script_generator = BestsellerScriptGenerator(self.config)
+        self.script_generator = BestsellerScriptGenerator(self.config, self.hook_generator.provider, self.hook_generator.cache)
+        self.job_store = build_job_store(self.config)
+        self.batch_engine = BestsellerBatchEngine(self.config, self.hook_generator, job_store=self.job_store)
+        self.hook_scorer = self.batch_engine.scorer
+        self.copy_analyzer = AdvancedCopyAnalyzer(self.config)
+        self.copy_state = IncrementalCopyAnalysis(self.copy_analyzer.keywords)
+        self._live_analysis = None
+        self._live_analysis_job = None
+        self.async_worker = AsyncLoopWorker()
+        self._script_display_ids = itertools.count(1)
 
-        self.current_hooks: List[Dict] = []
-        self.current_scripts: List[Dict] = []
+        dedup = build_hook_deduplicator(self.config)
+        self.hook_dedup = dedup or HookDeduplicator()
+        self.results = ResultStore(dedup)
+        self.current_hooks: List[Hook] = self.results.hooks
+        self.current_scripts: List[Script] = self.results.scripts
         self.generation_active = False
+        self.current_run: concurrent.futures.Future = None
+        self.live_exporters: Dict[str, RecordExporter] = {}
 
         self.create_interface()
+        self.root.after(UI_FLUSH_MS, self._flush_ui_events)
 
     def create_interface(self):
         self.notebook = ttk.Notebook(self.root)
@@ -467,14 +3316,7 @@ class BestsellerVideoBotGUI:
         cultures_grid = ttk.Frame(culture_frame)
         cultures_grid.pack(fill='x')
         self.culture_vars: Dict[str, tk.BooleanVar] = {}
-        cultures_data = [
-            ('pt-BR', '🇧🇷 Brasil', 'Emocional • Familiar • Próximo'),
-            ('en-US', '🇺🇸 Estados Unidos', 'Direto • Baseado em dados • Eficiente'),
-            ('es-MX', '🇲🇽 México', 'Familiar • Tradicional • Comunitário'),
-            ('de-DE', '🇩🇪 Alemanha', 'Sistemático • Preciso • Científico'),
-            ('fr-FR', '🇫🇷 França', 'Sofisticado • Elegante • Refinado'),
-            ('it-IT', '🇮🇹 Itália', 'Apaixonado • Familiar • Tradicional')
-        ]
+        cultures_data = [(code, culture.label, culture.characteristics) for code, culture in self.config.cultures.items()]
         for i, (culture_code, culture_name, characteristics) in enumerate(cultures_data):
             row = i // 2
             col = i % 2
@@ -494,6 +3336,9 @@ class BestsellerVideoBotGUI:
         ttk.Label(options_row1, text="Estilo de Copy:").pack(side='left', padx=20)
         self.copy_style_var = tk.StringVar(value='viral')
         ttk.Combobox(options_row1, textvariable=self.copy_style_var, values=['viral', 'professional', 'emotional', 'scientific'], width=12, state='readonly').pack(side='left', padx=5)
+        self.dedup_var = tk.BooleanVar(value=self.results.dedup is not None)
+        ttk.Checkbutton(options_row1, text="🧹 Descartar hooks quase duplicados", variable=self.dedup_var,
+                        command=lambda: setattr(self.results, 'dedup', self.hook_dedup if self.dedup_var.get() else None)).pack(side='left', padx=20)
         options_row2 = ttk.Frame(advanced_frame)
         options_row2.pack(fill='x', pady=5)
         self.combine_frameworks_var = tk.BooleanVar(value=True)
@@ -570,6 +3415,9 @@ class BestsellerVideoBotGUI:
         ttk.Button(analysis_buttons, text="🔍 Analisar Copy", command=self.analyze_existing_copy).pack(side='left', padx=5)
         ttk.Button(analysis_buttons, text="🎯 Detectar Framework", command=self.detect_framework).pack(side='left', padx=5)
         ttk.Button(analysis_buttons, text="🌍 Análise Cultural", command=self.cultural_analysis).pack(side='left', padx=5)
+        self.live_analysis_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(analysis_buttons, text="⚡ Ao vivo", variable=self.live_analysis_var).pack(side='left', padx=5)
+        self.existing_copy_text.bind('<<Modified>>', self._on_copy_modified)
         options_frame = ttk.LabelFrame(main_copy_frame, text="⚙️ Opções de Transformação:", padding=15)
         options_frame.pack(fill='x', pady=10)
         config_row1 = ttk.Frame(options_frame)
@@ -584,7 +3432,8 @@ class BestsellerVideoBotGUI:
         config_row2.pack(fill='x', pady=5)
         ttk.Label(config_row2, text="Transformar para culturas:").pack(side='left')
         self.transform_cultures_vars: Dict[str, tk.BooleanVar] = {}
-        for culture_code, culture_flag in [('pt-BR','🇧🇷 BR'),('en-US','🇺🇸 US'),('de-DE','🇩🇪 DE'),('fr-FR','🇫🇷 FR'),('it-IT','🇮🇹 IT'),('es-MX','🇲🇽 MX')]:
+        for culture_code, culture_data in self.config.cultures.items():
+            culture_flag = f"{culture_data.flag} {culture_code.split('-')[-1]}".strip()
             var = tk.BooleanVar(value=(culture_code in ['pt-BR','en-US']))
             self.transform_cultures_vars[culture_code] = var
             ttk.Checkbutton(config_row2, text=culture_flag, variable=var).pack(side='left', padx=5)
@@ -647,36 +3496,66 @@ class BestsellerVideoBotGUI:
         self.product_preview.insert('1.0', preview_text)
         self.product_preview.config(state='disabled')
 
-    def analyze_existing_copy(self):
-        existing_copy = self.existing_copy_text.get('1.0', tk.END).strip()
+    def _refresh_copy_state(self) -> IncrementalCopyAnalysis:
+        self.copy_state.update(self.existing_copy_text.get('1.0', tk.END).strip())
+        return self.copy_state
+
+    def _on_copy_modified(self, event=None):
+        self.existing_copy_text.edit_modified(False)
+        if self._live_analysis is None or not self.live_analysis_var.get():
+            return
+        if self._live_analysis_job is not None:
+            self.root.after_cancel(self._live_analysis_job)
+        self._live_analysis_job = self.root.after(LIVE_ANALYSIS_DELAY_MS, self._run_live_analysis)
+
+    def _run_live_analysis(self):
+        self._live_analysis_job = None
+        if self._live_analysis is not None:
+            self._live_analysis(live=True)
+
+    def _show_copy_analysis(self, text: str):
+        self.copy_analysis_text.config(state='normal')
+        self.copy_analysis_text.delete('1.0', tk.END)
+        self.copy_analysis_text.insert('1.0', text)
+        self.copy_analysis_text.config(state='disabled')
+
+    def analyze_existing_copy(self, live: bool = False):
+        state = self._refresh_copy_state()
+        existing_copy = state.text
         if not existing_copy or len(existing_copy) < 50:
-            messagebox.showwarning("Atenção", "Por favor, cole uma copy com pelo menos 50 caracteres.")
+            if not live:
+                messagebox.showwarning("Atenção", "Por favor, cole uma copy com pelo menos 50 caracteres.")
             return
+        self._live_analysis = self.analyze_existing_copy
         analysis = "=== ANÁLISE DA COPY ===\n\n"
-        words = len(existing_copy.split())
-        sentences = existing_copy.count('.') + existing_copy.count('!') + existing_copy.count('?')
-        paragraphs = len([p for p in existing_copy.split('\n\n') if p.strip()])
-        analysis += f"Palavras: {words}\nFrases: {sentences}\nParágrafos: {paragraphs}\n\n"
-        persuasion_elements = {"Pergunta": ["?", "você", "vocês"], "Urgência": ["agora", "hoje", "rápido", "última chance"]}
+        analysis += f"Palavras: {state.words}\nFrases: {state.sentences}\nParágrafos: {len(state.paragraphs)}\n\n"
+        scan = state.scan
         analysis += "=== ELEMENTOS DETECTADOS ===\n"
-        for element, keywords in persuasion_elements.items():
-            count = sum(existing_copy.lower().count(keyword) for keyword in keywords)
+        for element in PERSUASION_KEYWORDS:
+            count = scan.counts[('persuasion', element)]
             if count > 0:
                 analysis += f"✓ {element}: {count} ocorrências\n"
-        analysis += "\n=== FRAMEWORK RECOMENDADO ===\nHormozi Grand Slam Offer\n"
-        self.copy_analysis_text.config(state='normal')
-        self.copy_analysis_text.delete('1.0', tk.END)
-        self.copy_analysis_text.insert('1.0', analysis)
-        self.copy_analysis_text.config(state='disabled')
-        self.log_message(f"Copy analisada: {len(existing_copy)} caracteres")
+        pains = [(code, sorted(scan.found[('pain_point', code)])) for code in self.config.cultures if ('pain_point', code) in scan.found]
+        if pains:
+            analysis += "\n=== DORES DETECTADAS ===\n"
+            for code, found in pains:
+                analysis += f"• {code}: {', '.join(found)}\n"
+        scores = self.copy_analyzer.scorer.score(scan)
+        recommended = self.copy_analyzer.frameworks.frameworks[max(scores, key=scores.get)]
+        analysis += f"\n=== FRAMEWORK RECOMENDADO ===\n{recommended['name']}\n"
+        self._show_copy_analysis(analysis)
+        if not live:
+            self.log_message(f"Copy analisada: {len(existing_copy)} caracteres")
 
-    def detect_framework(self):
-        existing_copy = self.existing_copy_text.get('1.0', tk.END).strip()
+    def detect_framework(self, live: bool = False):
+        state = self._refresh_copy_state()
+        existing_copy = state.text
         if not existing_copy or len(existing_copy) < 50:
-            messagebox.showwarning("Atenção", "Copy muito curta para análise de framework.")
+            if not live:
+                messagebox.showwarning("Atenção", "Copy muito curta para análise de framework.")
             return
-        analyzer = AdvancedCopyAnalyzer(self.config)
-        analysis = analyzer.analyze_copy_structure(existing_copy)
+        self._live_analysis = self.detect_framework
+        analysis = self.copy_analyzer.analyze_copy_structure(existing_copy, state.scan, state.stats)
         detection_result = f"""=== DETECÇÃO DE FRAMEWORK ===\n\n📊 FRAMEWORK DETECTADO: {analysis['detected_framework']}\n🎯 CONFIANÇA: {analysis['framework_confidence']:.1%}\n\n📈 SCORES:\n• Legibilidade: {analysis['readability_score']}/10\n• Persuasão: {analysis['persuasion_score']}/10  \n• Potencial Viral: {analysis['viral_potential']}\n\n🔍 ELEMENTOS ENCONTRADOS:\n"""
         for element in analysis['elements_found']:
             detection_result += f"✓ {element['type']}: {element['strength']:.1%} força\n"
@@ -684,31 +3563,19 @@ class BestsellerVideoBotGUI:
             detection_result += f"\n💡 SUGESTÕES DE MELHORIA:\n"
             for suggestion in analysis['suggestions']:
                 detection_result += f"• {suggestion}\n"
-        self.copy_analysis_text.config(state='normal')
-        self.copy_analysis_text.delete('1.0', tk.END)
-        self.copy_analysis_text.insert('1.0', detection_result)
-        self.copy_analysis_text.config(state='disabled')
+        self._show_copy_analysis(detection_result)
 
-    def cultural_analysis(self):
-        existing_copy = self.existing_copy_text.get('1.0', tk.END).strip()
-        if not existing_copy:
+    def cultural_analysis(self, live: bool = False):
+        state = self._refresh_copy_state()
+        if not state.text:
             return
+        self._live_analysis = self.cultural_analysis
         cultural_result = "=== ANÁLISE CULTURAL ===\n\n"
-        cultural_elements = {
-            '🇧🇷 Brasil': {'triggers': ['família', 'casa própria', 'sonho', 'luta', 'batalha'], 'found': []},
-            '🇺🇸 Estados Unidos': {'triggers': ['success', 'freedom', 'opportunity', 'american dream'], 'found': []},
-            '🇩🇪 Alemanha': {'triggers': ['qualität', 'system', 'präzision', 'ordnung'], 'found': []},
-            '🇫🇷 França': {'triggers': ['sophistication', 'élégance', 'qualité', 'art'], 'found': []},
-            '🇮🇹 Itália': {'triggers': ['famiglia', 'passione', 'tradizione', 'bellezza'], 'found': []},
-            '🇲🇽 México': {'triggers': ['familia', 'comunidad', 'tradición', 'respeto'], 'found': []}
-        }
-        copy_lower = existing_copy.lower()
+        # O analisador devolve códigos de cultura; os rótulos com bandeira são só da interface
+        cultures = self.config.cultures
+        cultural_elements = {cultures[code].label: data for code, data in self.copy_analyzer.cultural_compatibility(state.scan).items()}
         for culture, data in cultural_elements.items():
-            for trigger in data['triggers']:
-                if trigger in copy_lower:
-                    data['found'].append(trigger)
-        for culture, data in cultural_elements.items():
-            compatibility = len(data['found']) / len(data['triggers'])
+            compatibility = data['compatibility']
             status = "🔥 ALTA" if compatibility > 0.3 else "⚡ MÉDIA" if compatibility > 0.1 else "❄️ BAIXA"
             cultural_result += f"{culture}: {status} compatibilidade ({compatibility:.1%})\n"
             if data['found']:
@@ -721,10 +3588,7 @@ class BestsellerVideoBotGUI:
                 cultural_result += f"• {culture}: Expandir elementos encontrados\n"
             else:
                 cultural_result += f"• {culture}: Adicionar gatilhos culturais específicos\n"
-        self.copy_analysis_text.config(state='normal')
-        self.copy_analysis_text.delete('1.0', tk.END)
-        self.copy_analysis_text.insert('1.0', cultural_result)
-        self.copy_analysis_text.config(state='disabled')
+        self._show_copy_analysis(cultural_result)
 
     def generate_monster_from_copy(self):
         existing_copy = self.existing_copy_text.get('1.0', tk.END).strip()
@@ -735,16 +3599,16 @@ class BestsellerVideoBotGUI:
         if not selected_cultures:
             messagebox.showwarning("Atenção", "Selecione pelo menos uma cultura.")
             return
+        adaptation_type = self.adaptation_type_var.get()
+        num_variations = int(self.copy_variations_var.get())
         self.set_generation_state(True)
         self.log_message("Iniciando transformação com MONSTER Framework...")
-        thread = threading.Thread(target=self._run_monster_transformation, args=(existing_copy, selected_cultures))
-        thread.daemon = True
-        thread.start()
+        self.current_run = self.async_worker.submit(self._run_monster_transformation(existing_copy, selected_cultures, adaptation_type, num_variations))
 
-    def _run_monster_transformation(self, existing_copy: str, cultures: List[str]):
+    async def _run_monster_transformation(self, existing_copy: str, cultures: List[str], adaptation_type: str, num_variations: int):
+        current_job_id.set(new_job_id('monster'))
+        hooks_before = len(self.current_hooks)
         try:
-            adaptation_type = self.adaptation_type_var.get()
-            num_variations = int(self.copy_variations_var.get())
             frameworks_to_use: List[str] = []
             if adaptation_type == 'monster_only':
                 frameworks_to_use = ['monster_supreme_framework']
@@ -756,29 +3620,25 @@ class BestsellerVideoBotGUI:
                 frameworks_to_use = ['monster_supreme_framework', 'kennedy_pas_plus', 'hormozi_grand_slam_offer']
             else:
                 frameworks_to_use = list(BestsellerFrameworks().frameworks.keys())
-            for culture in cultures:
-                self.log_message(f"Transformando para {culture}...")
-                for framework in frameworks_to_use[:3]:
-                    self.log_message(f"  Framework: {framework}")
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        hooks = loop.run_until_complete(self.hook_generator.generate_hooks_from_copy(existing_copy, culture, framework, num_variations))
-                        for hook in hooks:
-                            hook['framework'] = framework
-                            hook['culture'] = culture
-                            hook['source'] = 'monster_transformation'
-                            hook['original_copy'] = existing_copy[:100] + "..."
-                            self.current_hooks.append(hook)
-                            self.root.after(0, self._update_hooks_display, hook)
-                    finally:
-                        loop.close()
+
+            original_copy = existing_copy[:100] + "..."
+
+            async def transform(culture: str, framework: str):
+                self.log_message(f"Transformando para {culture} - Framework: {framework}", progress=True)
+                hooks = [Hook.from_generated(item, framework=framework, culture=culture, source='monster_transformation', original_copy=original_copy)
+                         async for item in self.hook_generator.stream_hooks_from_copy(existing_copy, culture, framework, num_variations)]
+                for hook in self.hook_scorer.score_hooks(hooks):
+                    self.results.add_hook(hook)
+
+            await gather_bounded([transform(culture, framework) for culture in cultures for framework in frameworks_to_use[:3]], self.config.max_concurrency)
             self.log_message("Transformação MONSTER concluída!")
+        except asyncio.CancelledError:
+            self.log_message(f"Transformação interrompida: {len(self.current_hooks) - hooks_before} hooks parciais mantidos")
         except Exception as e:
             self.log_message(f"Erro na transformação: {str(e)}")
-            messagebox.showerror("Erro", f"Erro na transformação MONSTER:\n{str(e)}")
+            self.results.post('error', f"Erro na transformação MONSTER:\n{str(e)}")
         finally:
-            self.root.after(0, lambda: self.set_generation_state(False))
+            self.results.post('state', False)
 
     def compare_all_frameworks(self):
         existing_copy = self.existing_copy_text.get('1.0', tk.END).strip()
@@ -795,11 +3655,11 @@ class BestsellerVideoBotGUI:
         compare_notebook.add(frameworks_tab, text="Por Framework")
         framework_results = scrolledtext.ScrolledText(frameworks_tab, height=25, wrap='word')
         framework_results.pack(fill='both', expand=True, padx=10, pady=10)
-        analyzer = AdvancedCopyAnalyzer(self.config)
         frameworks = BestsellerFrameworks().frameworks
+        scores = self.copy_analyzer.scorer.score(self._refresh_copy_state().scan)
         comparison_text = "=== COMPARAÇÃO DE FRAMEWORKS ===\n\n"
-        for fw_key, fw_data in frameworks.items():
-            score = analyzer._calculate_framework_match(existing_copy, fw_data)
+        for fw_key, fw_data in sorted(frameworks.items(), key=lambda item: scores.get(item[0], 0.0), reverse=True):
+            score = scores.get(fw_key, 0.0)
             comparison_text += f"📊 {fw_data['name']}\n   Expert: {fw_data.get('expert', 'N/A')}\n   Compatibilidade: {score:.1%}\n   Era: {fw_data.get('era', 'N/A')}\n\n"
         framework_results.insert('1.0', comparison_text)
         framework_results.config(state='disabled')
@@ -818,8 +3678,17 @@ class BestsellerVideoBotGUI:
         if not analysis_content:
             messagebox.showwarning("Atenção", "Nenhuma análise para salvar.")
             return
-        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("JSON files", "*.json")])
-        if filename:
+        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("JSON files", "*.json")] + EXPORT_FILETYPES)
+        if filename and not filename.endswith(('.txt', '.json')):
+            state = self._refresh_copy_state()
+            try:
+                with build_exporter(filename, 'analysis') as exporter:
+                    exporter.write(dict(self.copy_analyzer.analyze_record(state.text), id=datetime.now().isoformat(timespec='seconds')))
+                messagebox.showinfo("Sucesso", f"Análise salva em: {filename}")
+                self.log_message(f"Análise salva: {filename}")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao salvar: {str(e)}")
+        elif filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
                     f.write("=== ANÁLISE DE COPY - VideoBot BESTSELLERS ===\n\n")
@@ -858,6 +3727,11 @@ class BestsellerVideoBotGUI:
         ttk.Label(duration_frame, text="Duração do vídeo (segundos):").pack(side='left')
         self.video_duration_var = tk.StringVar(value='30')
         ttk.Spinbox(duration_frame, from_=15, to=120, width=5, textvariable=self.video_duration_var).pack(side='left', padx=10)
+        self.scripts_with_hooks_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(duration_frame, text="📝 Gerar scripts junto com os hooks", variable=self.scripts_with_hooks_var).pack(side='left', padx=20)
+        ttk.Label(duration_frame, text="Scripts só para os melhores (por framework × cultura, 0 = todos):").pack(side='left')
+        self.script_top_k_var = tk.StringVar(value='0')
+        ttk.Spinbox(duration_frame, from_=0, to=50, width=5, textvariable=self.script_top_k_var).pack(side='left', padx=10)
         format_frame = ttk.Frame(config_frame)
         format_frame.pack(fill='x', pady=5)
         ttk.Label(format_frame, text="Formato:").pack(side='left')
@@ -869,6 +3743,8 @@ class BestsellerVideoBotGUI:
         self.generate_btn.pack(side='left', padx=5)
         self.generate_scripts_btn = ttk.Button(buttons_frame, text="📝 Gerar Scripts", command=self.start_script_generation)
         self.generate_scripts_btn.pack(side='left', padx=5)
+        self.resume_btn = ttk.Button(buttons_frame, text="♻️ Retomar", command=self.resume_generation)
+        self.resume_btn.pack(side='left', padx=5)
         self.stop_btn = ttk.Button(buttons_frame, text="⏹️ Parar", command=self.stop_generation, state='disabled')
         self.stop_btn.pack(side='left', padx=5)
         self.progress = ttk.Progressbar(main_gen_frame, mode='indeterminate')
@@ -888,8 +3764,24 @@ class BestsellerVideoBotGUI:
         self.results_notebook.pack(fill='both', expand=True)
         hooks_frame = ttk.Frame(self.results_notebook)
         self.results_notebook.add(hooks_frame, text="🎯 Hooks")
-        self.hooks_listbox = tk.Listbox(hooks_frame, height=15, width=100)
-        self.hooks_listbox.pack(fill='both', expand=True, padx=10, pady=10)
+        filters_frame = ttk.Frame(hooks_frame)
+        filters_frame.pack(fill='x', padx=10, pady=(10, 0))
+        ttk.Label(filters_frame, text="Framework:").pack(side='left')
+        self.filter_framework_var = tk.StringVar(value='Todos')
+        ttk.Combobox(filters_frame, textvariable=self.filter_framework_var, values=['Todos'] + list(BestsellerFrameworks().frameworks.keys()), width=26, state='readonly').pack(side='left', padx=5)
+        ttk.Label(filters_frame, text="Cultura:").pack(side='left', padx=(10, 0))
+        self.filter_culture_var = tk.StringVar(value='Todas')
+        ttk.Combobox(filters_frame, textvariable=self.filter_culture_var, values=['Todas'] + list(self.config.cultures.keys()), width=8, state='readonly').pack(side='left', padx=5)
+        ttk.Label(filters_frame, text="Potencial:").pack(side='left', padx=(10, 0))
+        self.filter_viral_var = tk.StringVar(value='Todos')
+        ttk.Combobox(filters_frame, textvariable=self.filter_viral_var, values=['Todos', 'HIGH', 'MEDIUM', 'LOW'], width=8, state='readonly').pack(side='left', padx=5)
+        self.hooks_count_var = tk.StringVar(value="0 hooks")
+        ttk.Label(filters_frame, textvariable=self.hooks_count_var, foreground='gray').pack(side='right')
+        for var in (self.filter_framework_var, self.filter_culture_var, self.filter_viral_var):
+            var.trace_add('write', lambda *_: self.apply_hook_filters())
+        self.hooks_view = VirtualHookList(hooks_frame, self.results, self._format_hook_row)
+        self.hooks_view.frame.pack(fill='both', expand=True, padx=10, pady=10)
+        self.hooks_listbox = self.hooks_view.listbox
         self.hooks_listbox.bind('<Double-Button-1>', self.on_hook_select)
         scripts_frame = ttk.Frame(self.results_notebook)
         self.results_notebook.add(scripts_frame, text="📝 Scripts")
@@ -898,6 +3790,9 @@ class BestsellerVideoBotGUI:
         actions_frame = ttk.Frame(main_results_frame)
         actions_frame.pack(fill='x', pady=10)
         ttk.Button(actions_frame, text="💾 Salvar Hooks", command=self.save_hooks).pack(side='left', padx=5)
+        ttk.Button(actions_frame, text="💾 Salvar Scripts", command=self.save_scripts).pack(side='left', padx=5)
+        self.live_export_btn = ttk.Button(actions_frame, text="📡 Exportar ao vivo", command=self.toggle_live_export)
+        self.live_export_btn.pack(side='left', padx=5)
         ttk.Button(actions_frame, text="📋 Copiar Selecionado", command=self.copy_selected).pack(side='left', padx=5)
         ttk.Button(actions_frame, text="🗑️ Limpar Tudo", command=self.clear_results).pack(side='left', padx=5)
 
@@ -928,99 +3823,197 @@ class BestsellerVideoBotGUI:
         if not selected_cultures:
             messagebox.showwarning("Atenção", "Selecione pelo menos uma cultura.")
             return
+        num_hooks = int(self.hooks_per_framework_var.get())
+        script_duration = int(self.video_duration_var.get()) if self.scripts_with_hooks_var.get() else None
+        self.set_generation_state(True)
+        self.log_message("Iniciando geração de hooks..." if script_duration is None else "Iniciando geração de hooks e scripts...")
+        self.current_run = self.async_worker.submit(self._run_hooks_generation(product_info, selected_frameworks, selected_cultures, num_hooks,
+                                                                               script_duration=script_duration, top_k=int(self.script_top_k_var.get())))
+
+    def resume_generation(self):
+        job = self.job_store.latest_job('hooks') if self.job_store else None
+        if not job:
+            messagebox.showinfo("Retomar", "Nenhuma geração interrompida para retomar.")
+            return
+        params = job['params']
         self.set_generation_state(True)
-        self.log_message("Iniciando geração de hooks...")
-        thread = threading.Thread(target=self._run_hooks_generation)
-        thread.daemon = True
-        thread.start()
+        self.log_message(f"Retomando geração {job['job_id']}: {job['units_done']} combinações já concluídas")
+        self.current_run = self.async_worker.submit(self._run_hooks_generation(
+            params['product_info'], params['frameworks'], params['cultures'], params['num_hooks'], job_id=job['job_id']))
 
-    def _run_hooks_generation(self):
+    async def _run_hooks_generation(self, product_info: Dict, frameworks: List[str], cultures: List[str], num_hooks: int, job_id: str = None,
+                                    script_duration: int = None, top_k: int = 0):
+        job_id = job_id or new_job_id('hooks')
+        current_job_id.set(job_id)
+        hooks_before = len(self.current_hooks)
+        status = JOB_FAILED
         try:
-            product_info = self.get_product_info()
-            frameworks = self.get_selected_frameworks()
-            cultures = self.get_selected_cultures()
-            for framework in frameworks:
-                self.log_message(f"Processando framework: {framework}")
-                for culture in cultures:
-                    self.log_message(f"  Cultura: {culture}")
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        hooks = loop.run_until_complete(self.hook_generator.generate_hooks_from_product(product_info, culture, framework, int(self.hooks_per_framework_var.get())))
-                        for hook in hooks:
-                            hook['framework'] = framework
-                            hook['culture'] = culture
-                            hook['source'] = 'product'
-                            self.current_hooks.append(hook)
-                            self.root.after(0, self._update_hooks_display, hook)
-                    finally:
-                        loop.close()
+            units = self.batch_engine.build_matrix([product_info], frameworks, cultures)
+            if self.job_store:
+                await asyncio.to_thread(self.job_store.create_job, job_id, 'hooks',
+                                        {'product_info': product_info, 'frameworks': frameworks, 'cultures': cultures, 'num_hooks': num_hooks})
+
+            pipeline = self._script_pipeline() if script_duration is not None else None
+            ranker = HookRanker(top_k) if pipeline and top_k else None
+
+            async def show_unit(hooks: List[Hook]):
+                if not hooks:
+                    return
+                self.log_message(f"Processado: {hooks[0].framework} / {hooks[0].culture}", progress=True)
+                # Uma pontuação vetorizada por combinação; com top-K, só as K melhores dela viram script
+                kept = [hook for hook in self.hook_scorer.score_hooks(hooks) if self.results.add_hook(hook)]
+                if not pipeline:
+                    return
+                if ranker:
+                    for hook in kept:
+                        ranker.offer(hook)
+                    kept = ranker.pop(ranker.key(hooks[0]))
+                for hook in kept:
+                    await pipeline.put(hook, product_info, script_duration)
+
+            async with pipeline or contextlib.nullcontext():
+                await self.batch_engine.run_async(units, num_hooks, on_hooks=show_unit, job_id=job_id if self.job_store else None)
+            if pipeline:
+                self.log_message(f"Scripts: {pipeline.completed} gerados, {pipeline.failed} falhas")
+            status = JOB_DONE
+            if self.hook_generator.cache:
+                await asyncio.to_thread(self.hook_generator.cache.flush)
+                self.log_message(self.hook_generator.cache.summary())
             self.log_message("Geração de hooks concluída!")
+        except asyncio.CancelledError:
+            status = JOB_CANCELLED
+            self.log_message(f"Geração interrompida: {len(self.current_hooks) - hooks_before} hooks parciais mantidos (use Retomar para continuar)")
         except Exception as e:
             self.log_message(f"Erro: {str(e)}")
-            messagebox.showerror("Erro", f"Erro na geração:\n{str(e)}")
+            self.results.post('error', f"Erro na geração:\n{str(e)}")
         finally:
-            self.root.after(0, lambda: self.set_generation_state(False))
+            if self.job_store:
+                self.job_store.set_status(job_id, status)
+            self.results.post('state', False)
 
     def start_script_generation(self):
         if not self.current_hooks:
             messagebox.showwarning("Atenção", "Gere hooks primeiro.")
             return
+        product_info = self.get_product_info()
+        duration = int(self.video_duration_var.get())
+        # Todos os hooks visíveis com os filtros atuais da aba de resultados, ou só os K melhores de cada framework × cultura
+        hooks = [self.current_hooks[i] for i in self.hooks_view.view]
+        if not hooks:
+            messagebox.showwarning("Atenção", "Nenhum hook corresponde aos filtros atuais.")
+            return
+        top_k = int(self.script_top_k_var.get())
+        if top_k:
+            ranker = HookRanker(top_k)
+            for hook in hooks:
+                ranker.offer(hook)
+            hooks = list(ranker.best())
         self.set_generation_state(True)
         self.log_message("Iniciando geração de scripts...")
-        thread = threading.Thread(target=self._run_scripts_generation)
-        thread.daemon = True
-        thread.start()
+        self.current_run = self.async_worker.submit(self._run_scripts_generation(product_info, duration, hooks))
+
+    def _script_pipeline(self) -> ScriptPipeline:
+        def begin(hook: Hook, framework: str) -> str:
+            mark = f"script_{next(self._script_display_ids)}"
+            self.results.post('script_begin', (mark, framework))
+            return mark
 
-    def _run_scripts_generation(self):
+        return ScriptPipeline(self.script_generator, self.config, on_begin=begin,
+                              on_section=lambda mark, section: self.results.post('script_section', (mark, section)),
+                              on_script=self.results.add_script, log=self.log_message)
+
+    async def _run_scripts_generation(self, product_info: Dict, duration: int, hooks: List[Hook]):
+        current_job_id.set(new_job_id('scripts'))
+        scripts_before = len(self.current_scripts)
         try:
-            product_info = self.get_product_info()
-            duration = int(self.video_duration_var.get())
-            for hook in self.current_hooks[:5]:
-                framework = hook.get('framework', 'hormozi_grand_slam_offer')
-                culture = hook.get('culture', 'pt-BR')
-                self.log_message(f"Gerando script para hook: {hook['hook_text'][:50]}...")
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    script = loop.run_until_complete(self.script_generator.generate_complete_script(hook, product_info, culture, framework, duration))
-                    if script:
-                        script['hook_data'] = hook
-                        self.current_scripts.append(script)
-                        self.root.after(0, self._update_scripts_display, script)
-                finally:
-                    loop.close()
-            self.log_message("Geração de scripts concluída!")
+            self.log_message(f"Gerando {len(hooks)} scripts ({self.config.max_concurrency} em paralelo)...")
+            pipeline = self._script_pipeline()
+            await pipeline.run(hooks, product_info, duration)
+            self.log_message(f"Geração de scripts concluída! {pipeline.completed} gerados, {pipeline.failed} falhas")
+        except asyncio.CancelledError:
+            self.log_message(f"Geração interrompida: {len(self.current_scripts) - scripts_before} scripts completos mantidos")
         except Exception as e:
             self.log_message(f"Erro: {str(e)}")
-            messagebox.showerror("Erro", f"Erro na geração:\n{str(e)}")
+            self.results.post('error', f"Erro na geração:\n{str(e)}")
         finally:
-            self.root.after(0, lambda: self.set_generation_state(False))
-
-    def _update_hooks_display(self, hook: Dict):
-        hook_text = hook.get('hook_text', 'Hook sem texto')
-        framework = hook.get('framework', 'N/A')
-        culture = hook.get('culture', 'N/A')
-        display_text = f"[{framework}] [{culture}] {hook_text}"
-        self.hooks_listbox.insert(tk.END, display_text)
-
-    def _update_scripts_display(self, script: Dict):
-        script_text = script.get('full_script', 'Script vazio')
-        framework = script.get('framework_used', 'N/A')
-        display_text = f"\n=== SCRIPT ({framework}) ===\n{script_text}\n"
-        self.scripts_text.insert(tk.END, display_text)
+            self.results.post('state', False)
+
+    def _flush_ui_events(self):
+        events = self.results.drain(UI_FLUSH_BATCH)
+        hooks: List[Dict] = []
+        log_lines: List[str] = []
+        scripts: List[Script] = []
+        for kind, payload in events:
+            if kind == 'hook':
+                hooks.append(payload)
+            elif kind == 'script':
+                scripts.append(payload)
+            elif kind == 'log':
+                log_lines.append(payload)
+            elif kind == 'script_begin':
+                self._begin_script_display(*payload)
+            elif kind == 'script_section':
+                self._update_scripts_display(*payload)
+            elif kind == 'state':
+                self.set_generation_state(payload)
+            elif kind == 'error':
+                messagebox.showerror("Erro", payload)
+        if hooks:
+            self._update_hooks_display()
+        if self.live_exporters:
+            self._export_live('hook', hooks)
+            self._export_live('script', scripts)
+        if log_lines:
+            self._append_log_lines(log_lines)
+        self.root.after(1 if len(events) == UI_FLUSH_BATCH else UI_FLUSH_MS, self._flush_ui_events)
+
+    @staticmethod
+    def _format_hook_row(hook: Hook) -> str:
+        return f"[{hook.framework or 'N/A'}] [{hook.culture or 'N/A'}] {hook.hook_text or 'Hook sem texto'}"
+
+    def _update_hooks_display(self):
+        self.hooks_view.refresh()
+        self._update_hooks_count()
+
+    def _update_hooks_count(self):
+        dropped = f" ({self.hook_dedup.dropped} quase duplicados descartados)" if self.hook_dedup.dropped else ""
+        self.hooks_count_var.set(f"{len(self.hooks_view)} de {len(self.current_hooks)} hooks{dropped}")
+
+    def apply_hook_filters(self):
+        framework = self.filter_framework_var.get()
+        culture = self.filter_culture_var.get()
+        viral = self.filter_viral_var.get()
+        self.hooks_view.set_filters(
+            framework=None if framework == 'Todos' else framework,
+            culture=None if culture == 'Todas' else culture,
+            viral_potential=None if viral == 'Todos' else viral
+        )
+        self._update_hooks_count()
+
+    def _begin_script_display(self, mark: str, framework: str):
+        # Cada script ganha uma marca própria para receber as seções na ordem, mesmo gerando em paralelo
+        self.scripts_text.insert(tk.END, f"\n=== SCRIPT ({framework}) ===\n")
+        self.scripts_text.mark_set(mark, 'end-1c')
+        self.scripts_text.mark_gravity(mark, tk.RIGHT)
+        self.scripts_text.insert(tk.END, "\n")
         self.scripts_text.see(tk.END)
 
+    def _update_scripts_display(self, mark: str, section: Dict):
+        self.scripts_text.insert(mark, section.get('content', '') + "\n")
+        self.scripts_text.see(mark)
+
     def set_generation_state(self, generating: bool):
         if generating:
             self.generate_btn.config(state='disabled')
             self.generate_scripts_btn.config(state='disabled')
+            self.resume_btn.config(state='disabled')
             self.stop_btn.config(state='normal')
             self.progress.start()
             self.status_var.set("Gerando conteúdo...")
         else:
             self.generate_btn.config(state='normal')
             self.generate_scripts_btn.config(state='normal')
+            self.resume_btn.config(state='normal')
             self.stop_btn.config(state='disabled')
             self.progress.stop()
             self.status_var.set("Geração concluída")
@@ -1028,54 +4021,109 @@ class BestsellerVideoBotGUI:
 
     def stop_generation(self):
         self.generation_active = False
+        if self.current_run and not self.current_run.done():
+            self.current_run.cancel()
         self.log_message("Parando geração...")
         self.set_generation_state(False)
 
-    def log_message(self, message: str):
+    def log_message(self, message: str, progress: bool = False):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
+        self.results.post('log', f"[{timestamp}] {message}\n")
+        if self.config:
+            self.config.logger.info(message, extra={'progress': progress})
+
+    def _append_log_lines(self, lines: List[str]):
         self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, log_entry)
+        self.log_text.insert(tk.END, ''.join(lines))
         self.log_text.see(tk.END)
         self.log_text.config(state='disabled')
-        if self.config:
-            self.config.logger.info(message)
 
     def on_hook_select(self, event):
-        selection = event.widget.curselection()
-        if selection:
-            index = selection[0]
+        index = self.hooks_view.selected_index()
+        if index is not None:
             if index < len(self.current_hooks):
                 hook = self.current_hooks[index]
-                messagebox.showinfo("Hook Selecionado", f"Hook: {hook['hook_text']}\n\nFramework: {hook.get('framework', 'N/A')}\nCultura: {hook.get('culture', 'N/A')}\nPotencial Viral: {hook.get('viral_potential', 'N/A')}")
+                messagebox.showinfo("Hook Selecionado", f"Hook: {hook.hook_text}\n\nFramework: {hook.framework}\nCultura: {hook.culture}\nPotencial Viral: {hook.viral_potential} ({hook.viral_score:.2f})")
+
+    def _export_live(self, kind: str, items: List):
+        exporter = self.live_exporters.get(kind)
+        if exporter and items:
+            exporter.write_many(items)
+            if not isinstance(exporter, ParquetExporter):
+                exporter.flush()
+
+    def toggle_live_export(self):
+        if self.live_exporters:
+            self._close_live_exporters()
+            self.live_export_btn.config(text="📡 Exportar ao vivo")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=EXPORT_FILETYPES, title="Arquivo de hooks (scripts vão para *_scripts)")
+        if not filename:
+            return
+        base, compression = _split_compression(filename)
+        stem, extension = os.path.splitext(base)
+        try:
+            self.live_exporters = {'hook': build_exporter(filename, 'hook'),
+                                   'script': build_exporter(f"{stem}_scripts{extension}{compression}", 'script')}
+        except (OSError, ValueError) as e:
+            self._close_live_exporters()
+            messagebox.showerror("Erro", f"Erro ao exportar: {str(e)}")
+            return
+        self.live_export_btn.config(text="⏹️ Parar exportação")
+        self.log_message(f"Exportando ao vivo: {filename}")
+
+    def _close_live_exporters(self):
+        for kind, exporter in self.live_exporters.items():
+            exporter.close()
+            self.log_message(f"Exportação ao vivo encerrada: {exporter.count} registros em {exporter.path}")
+        self.live_exporters = {}
+
+    def _save_records(self, kind: str, items: List, label: str):
+        filename = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=EXPORT_FILETYPES)
+        if filename:
+            try:
+                with build_exporter(filename, kind) as exporter:
+                    exporter.write_many(items)
+                messagebox.showinfo("Sucesso", f"{label} salvos em: {filename}")
+                self.log_message(f"{label} salvos: {exporter.count} em {filename}")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao salvar: {str(e)}")
+
+    def save_scripts(self):
+        if not self.current_scripts:
+            messagebox.showwarning("Atenção", "Não há scripts para salvar.")
+            return
+        self._save_records('script', self.current_scripts, "Scripts")
 
     def save_hooks(self):
         if not self.current_hooks:
             messagebox.showwarning("Atenção", "Não há hooks para salvar.")
             return
-        filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("Text files", "*.txt")])
+        filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("Text files", "*.txt")] + EXPORT_FILETYPES)
         if filename:
             try:
-                if filename.endswith('.json'):
+                if not filename.endswith(('.json', '.txt')):
+                    with build_exporter(filename, 'hook') as exporter:
+                        exporter.write_many(self.current_hooks)
+                elif filename.endswith('.json'):
                     with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(self.current_hooks, f, ensure_ascii=False, indent=2)
+                        json.dump([hook.to_dict() for hook in self.current_hooks], f, ensure_ascii=False, indent=2)
                 else:
                     with open(filename, 'w', encoding='utf-8') as f:
                         for i, hook in enumerate(self.current_hooks):
-                            f.write(f"{i+1}. {hook['hook_text']}\n")
-                            f.write(f"   Framework: {hook.get('framework', 'N/A')}\n")
-                            f.write(f"   Cultura: {hook.get('culture', 'N/A')}\n\n")
+                            f.write(f"{i+1}. {hook.hook_text}\n")
+                            f.write(f"   Framework: {hook.framework}\n")
+                            f.write(f"   Cultura: {hook.culture}\n\n")
                 messagebox.showinfo("Sucesso", f"Hooks salvos em: {filename}")
                 self.log_message(f"Hooks salvos: {filename}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar: {str(e)}")
 
     def copy_selected(self):
-        selection = self.hooks_listbox.curselection()
-        if selection:
-            index = selection[0]
+        index = self.hooks_view.selected_index()
+        if index is not None:
             if index < len(self.current_hooks):
-                hook_text = self.current_hooks[index]['hook_text']
+                hook_text = self.current_hooks[index].hook_text
                 self.root.clipboard_clear()
                 self.root.clipboard_append(hook_text)
                 messagebox.showinfo("Copiado", "Hook copiado para a área de transferência!")
@@ -1084,18 +4132,30 @@ class BestsellerVideoBotGUI:
 
     def clear_results(self):
         if messagebox.askyesno("Confirmar", "Limpar todos os hooks e scripts gerados?"):
-            self.current_hooks.clear()
-            self.current_scripts.clear()
-            self.hooks_listbox.delete(0, tk.END)
+            self.results.clear()
+            self.hook_dedup.clear()
+            self.hooks_view.reset()
+            self._update_hooks_count()
             self.scripts_text.delete('1.0', tk.END)
             self.log_message("Resultados limpos")
 
     def run(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            if self.hook_generator.provider:
+                self.async_worker.run(self.hook_generator.provider.aclose())
+            self.async_worker.close()
+            if self.hook_generator.cache:
+                self.hook_generator.cache.close()
+            if self.job_store:
+                self.job_store.close()
+            for exporter in self.live_exporters.values():
+                exporter.close()
 
 
 # =============================================
-# 7. ENV E MAIN
+# 8. ENV E MAIN
 # =============================================
 
 def create_env_file():
@@ -1124,6 +4184,314 @@ def main():
         print(f"Erro: {e}")
 
 
+def _split_csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='videobot_bestsellers', description="VideoBot BESTSELLERS - modo headless")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    batch = subparsers.add_parser('batch', help="Gera hooks para a matriz produto × framework × cultura")
+    batch.add_argument('products', nargs='?', help="Arquivo JSON ou JSONL com os produtos (opcional com --resume)")
+    batch.add_argument('-o', '--output', default='-', help="Saída .jsonl, .csv ou .parquet, com .gz/.bz2/.xz opcional ('-' para stdout)")
+    batch.add_argument('--compression', choices=PARQUET_CODECS, default=None, help="Codec da saída Parquet")
+    batch.add_argument('--frameworks', default='', help="Frameworks separados por vírgula (padrão: todos)")
+    batch.add_argument('--cultures', default='', help="Culturas separadas por vírgula (padrão: todas)")
+    batch.add_argument('--hooks', type=int, default=5, help="Variações por framework × cultura")
+    batch.add_argument('--no-cache', action='store_true', help="Ignora o cache de respostas")
+    batch.add_argument('--concurrency', type=int, default=None, help="Combinações processadas em paralelo (padrão: VIDEOBOT_MAX_CONCURRENCY)")
+    batch.add_argument('--resume', nargs='?', const='latest', default=None, metavar='JOB_ID',
+                       help="Retoma um lote interrompido pulando as combinações já concluídas (padrão: o mais recente)")
+    batch.add_argument('--dedup-threshold', type=float, default=None,
+                       help="Similaridade a partir da qual hooks quase idênticos são descartados, ex.: 0.8 (padrão: VIDEOBOT_DEDUP_THRESHOLD, desligado)")
+    batch.add_argument('--scripts-output', default=None, help="Gera também um script por hook, enquanto os hooks chegam, nesta saída")
+    batch.add_argument('--duration', type=int, default=30, help="Duração dos scripts em segundos")
+    batch.add_argument('--top-k', type=int, default=0, help="Só os K hooks mais virais de cada produto × framework × cultura viram script (0: todos)")
+    batch.add_argument('--script-concurrency', type=int, default=None, help="Scripts gerados em paralelo (padrão: VIDEOBOT_MAX_CONCURRENCY)")
+    render = subparsers.add_parser('render', help="Renderiza os templates dos frameworks offline (sem IA) para um catálogo")
+    render.add_argument('products', help="Arquivo JSON ou JSONL com os produtos")
+    render.add_argument('-o', '--output', default='-', help="Arquivo JSONL de saída ('-' para stdout)")
+    render.add_argument('--frameworks', default='', help="Frameworks separados por vírgula (padrão: todos)")
+    render.add_argument('--cultures', default='', help="Culturas separadas por vírgula (padrão: todas)")
+    render.add_argument('--workers', type=int, default=None, help="Workers em paralelo, 1 renderiza no próprio processo (padrão: VIDEOBOT_WORKERS ou CPUs)")
+    render.add_argument('--mode', choices=EXECUTOR_MODES, default=None, help="Workers em processos (CPU) ou threads (padrão: VIDEOBOT_EXECUTOR)")
+    bench = subparsers.add_parser('bench-startup', help="Mede o tempo de partida do módulo em processos novos")
+    bench.add_argument('--runs', type=int, default=10, help="Processos medidos")
+    work_queue = subparsers.add_parser('queue', help="Fila de unidades produto × framework × cultura para workers em várias máquinas")
+    queue_actions = work_queue.add_subparsers(dest='action', required=True)
+    enqueue = queue_actions.add_parser('enqueue', help="Enfileira a matriz de um catálogo (imprime o nome da fila)")
+    enqueue.add_argument('products', help="Arquivo JSON ou JSONL com os produtos")
+    enqueue.add_argument('--queue', default=None, help="Nome da fila (padrão: um novo id)")
+    enqueue.add_argument('--frameworks', default='', help="Frameworks separados por vírgula (padrão: todos)")
+    enqueue.add_argument('--cultures', default='', help="Culturas separadas por vírgula (padrão: todas)")
+    enqueue.add_argument('--hooks', type=int, default=5, help="Variações por framework × cultura")
+    work = queue_actions.add_parser('work', help="Processa unidades da fila até esvaziá-la")
+    work.add_argument('queue', help="Nome da fila")
+    work.add_argument('--name', default=None, help="Identificação do worker (padrão: host-pid)")
+    work.add_argument('--concurrency', type=int, default=None, help="Unidades reservadas em paralelo (padrão: VIDEOBOT_MAX_CONCURRENCY)")
+    work.add_argument('--wait', action='store_true', help="Continua esperando novas unidades com a fila vazia")
+    work.add_argument('--no-cache', action='store_true', help="Ignora o cache de respostas")
+    status = queue_actions.add_parser('status', help="Mostra o andamento da fila")
+    status.add_argument('queue', help="Nome da fila")
+    results = queue_actions.add_parser('results', help="Exporta os hooks concluídos na ordem da matriz, sem quase duplicados de cada produto")
+    results.add_argument('queue', help="Nome da fila")
+    results.add_argument('-o', '--output', default='-', help="Saída .jsonl, .csv ou .parquet, com .gz/.bz2/.xz opcional ('-' para stdout)")
+    results.add_argument('--compression', choices=PARQUET_CODECS, default=None, help="Codec da saída Parquet")
+    results.add_argument('--dedup-threshold', type=float, default=None,
+                         help="Similaridade a partir da qual hooks quase idênticos são descartados, ex.: 0.8 (padrão: VIDEOBOT_DEDUP_THRESHOLD, desligado)")
+    for action in (enqueue, work, status, results):
+        action.add_argument('--queue-path', default=None, help="Banco SQLite da fila, compartilhado pelos workers (padrão: VIDEOBOT_QUEUE_PATH)")
+    rank = subparsers.add_parser('rank', help="Pontua hooks gerados e mantém os K melhores por produto × framework × cultura")
+    rank.add_argument('hooks', help="Arquivo JSONL de hooks (saída do batch, .gz/.bz2/.xz aceitos)")
+    rank.add_argument('-o', '--output', default='-', help="Saída .jsonl, .csv ou .parquet, com .gz/.bz2/.xz opcional ('-' para stdout)")
+    rank.add_argument('--compression', choices=PARQUET_CODECS, default=None, help="Codec da saída Parquet")
+    rank.add_argument('--top', type=int, default=10, help="Hooks mantidos por produto × framework × cultura")
+    rank.add_argument('--batch-size', type=int, default=10000, help="Hooks pontuados por vez")
+    rank.add_argument('--workers', type=int, default=None, help="Workers em paralelo, 1 pontua no próprio processo (padrão: VIDEOBOT_WORKERS ou CPUs)")
+    rank.add_argument('--mode', choices=EXECUTOR_MODES, default=None, help="Workers em processos (CPU) ou threads (padrão: VIDEOBOT_EXECUTOR)")
+    analyze = subparsers.add_parser('analyze', help="Analisa um corpus JSONL de copies (framework, cultura, persuasão)")
+    analyze.add_argument('corpus', help="Arquivo JSONL com uma copy por linha")
+    analyze.add_argument('-o', '--output', default='-', help="Saída .jsonl, .csv ou .parquet, com .gz/.bz2/.xz opcional ('-' para stdout)")
+    analyze.add_argument('--compression', choices=PARQUET_CODECS, default=None, help="Codec da saída Parquet")
+    analyze.add_argument('--workers', '--processes', dest='processes', type=int, default=None, help="Workers de análise (padrão: VIDEOBOT_WORKERS ou CPUs)")
+    analyze.add_argument('--mode', choices=EXECUTOR_MODES, default=None, help="Workers em processos (CPU) ou threads (padrão: VIDEOBOT_EXECUTOR)")
+    analyze.add_argument('--chunksize', type=int, default=64, help="Registros enviados por vez a cada processo")
+    return parser
+
+
+def run_batch_command(args: argparse.Namespace) -> int:
+    config = BestsellerConfig()
+    if args.no_cache:
+        config.cache_enabled = False
+    if args.dedup_threshold is not None:
+        config.dedup_threshold = args.dedup_threshold
+    dedup = build_hook_deduplicator(config)
+    job_store = build_job_store(config)
+    engine = BestsellerBatchEngine(config, concurrency=args.concurrency, job_store=job_store)
+    if args.resume and not job_store:
+        raise ValueError("Registro de jobs indisponível: não é possível retomar")
+    if args.resume:
+        job = job_store.latest_job('batch') if args.resume == 'latest' else job_store.get_job(args.resume)
+        if not job:
+            raise ValueError("Nenhum lote interrompido para retomar" if args.resume == 'latest' else f"Lote não encontrado: {args.resume}")
+        job_id, params = job['job_id'], job['params']
+        args.products = args.products or params.get('products')
+        args.frameworks = args.frameworks or ','.join(params.get('frameworks', []))
+        args.cultures = args.cultures or ','.join(params.get('cultures', []))
+        args.hooks = params.get('num_hooks', args.hooks)
+        config.logger.info(f"Retomando lote {job_id}: {job['units_done']} combinações concluídas")
+    else:
+        job_id = new_job_id('batch')
+    if not args.products:
+        raise ValueError("Informe o arquivo de produtos ou --resume")
+    # Saída aberta antes de carregar o catálogo: formato inválido falha sem esperar a leitura
+    exporter = build_exporter(args.output, 'hook', args.compression)
+    script_exporter = build_exporter(args.scripts_output, 'script', args.compression) if args.scripts_output else None
+    script_pipeline = None
+    if script_exporter:
+        scripts = BestsellerScriptGenerator(config, engine.hook_generator.provider, engine.hook_generator.cache)
+        script_pipeline = ScriptPipeline(scripts, config, concurrency=args.script_concurrency, on_script=script_exporter.write)
+    try:
+        products = engine.load_products(args.products)
+        current_job_id.set(job_id)
+        config.logger.info(f"Job {job_id} (retome com: batch --resume {job_id})")
+
+        def write_hook(hook: Hook):
+            exporter.write(hook)
+            if args.output == '-':
+                exporter.flush()
+
+        engine.run(products, _split_csv(args.frameworks), _split_csv(args.cultures), args.hooks, on_hook=write_hook,
+                   job_id=job_id, job_params={'products': os.path.abspath(args.products)},
+                   script_pipeline=script_pipeline, script_duration=args.duration, dedup=dedup, top_k=args.top_k)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        config.logger.warning(f"Lote interrompido: {exporter.count} hooks parciais gravados (retome com: batch --resume {job_id})")
+        return 130
+    finally:
+        exporter.close()
+        if script_exporter:
+            script_exporter.close()
+        if job_store:
+            job_store.close()
+    config.logger.info(f"Lote concluído: {exporter.count} hooks gerados" + (f", {dedup.dropped} quase duplicados descartados" if dedup else ""))
+    if script_pipeline:
+        config.logger.info(f"Scripts: {script_pipeline.completed} gerados, {script_pipeline.failed} falhas em {args.scripts_output}")
+    return 0
+
+
+def run_render_command(args: argparse.Namespace) -> int:
+    config = BestsellerConfig()
+    products = BestsellerBatchEngine.load_products(args.products)
+    renderer = TemplateRenderer(config)
+    workers = args.workers or config.workers
+    if workers == 1:
+        blocks = (json.dumps(item, ensure_ascii=False) + '\n'
+                  for item in renderer.render_batch(products, _split_csv(args.frameworks), _split_csv(args.cultures)))
+    else:
+        blocks = renderer.render_sharded(products, _split_csv(args.frameworks), _split_csv(args.cultures), args.mode, workers)
+    started = time.perf_counter()
+    count = 0
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for block in blocks:
+            out.write(block)
+            count += block.count('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    config.logger.info(f"Renderização concluída: {count} copies de {len(products)} produtos em {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+STARTUP_HEAVY_MODULES = ('openai', 'google.generativeai', 'httpx', 'numpy', 'pyarrow', 'tkinter')
+
+
+def measure_startup(runs: int = 10) -> Dict:
+    import subprocess
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        "import videobot_bestsellers\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(elapsed, ','.join(name for name in {STARTUP_HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    import_times, process_times, loaded = [], [], set()
+    for _ in range(max(1, runs)):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', probe], cwd=module_dir, capture_output=True, text=True, check=True).stdout.split()
+        process_times.append(time.perf_counter() - started)
+        import_times.append(float(output[0]))
+        if len(output) > 1:
+            loaded.update(output[1].split(','))
+    import_times.sort()
+    process_times.sort()
+    return {
+        'runs': len(import_times),
+        'import_ms_min': import_times[0] * 1000,
+        'import_ms_median': import_times[len(import_times) // 2] * 1000,
+        'process_ms_median': process_times[len(process_times) // 2] * 1000,
+        'heavy_modules_loaded': sorted(loaded)
+    }
+
+
+def run_bench_startup_command(args: argparse.Namespace) -> int:
+    result = measure_startup(args.runs)
+    print(f"Partida em {result['runs']} processos: import {result['import_ms_median']:.1f} ms (mín. {result['import_ms_min']:.1f} ms), "
+          f"processo completo {result['process_ms_median']:.1f} ms")
+    print(f"Módulos pesados carregados na partida: {', '.join(result['heavy_modules_loaded']) or 'nenhum'}")
+    return 0
+
+
+def run_rank_command(args: argparse.Namespace) -> int:
+    config = BestsellerConfig()
+    top = max(1, args.top)
+    ranker = HookRanker(top)
+    started = time.perf_counter()
+    labels = Counter()
+    invalid = 0
+    tasks = ((lines, top) for lines in iter_line_batches(args.hooks, max(1, args.batch_size)))
+    workers = args.workers or config.workers
+    if workers == 1:
+        _init_scorer_worker()
+        results = map(_rank_hook_lines, tasks)
+    else:
+        results = ShardedExecutor.from_config(config, args.mode, workers, chunksize=1, initializer=_init_scorer_worker).map(_rank_hook_lines, tasks)
+    for candidates, batch_labels, batch_invalid in results:
+        labels.update(batch_labels)
+        invalid += batch_invalid
+        for hook in candidates:
+            ranker.offer(hook)
+    scored = sum(labels.values())
+    with build_exporter(args.output, 'hook', args.compression) as exporter:
+        exporter.write_many(ranker.best())
+    summary = ', '.join(f"{label} {labels[label]}" for label in ('HIGH', 'MEDIUM', 'LOW'))
+    config.logger.info(f"Ranking concluído: {scored} hooks pontuados ({summary}), {exporter.count} mantidos em {time.perf_counter() - started:.1f}s")
+    if invalid:
+        config.logger.warning(f"{invalid} linhas inválidas ignoradas em {args.hooks}")
+    return 0
+
+
+def run_queue_command(args: argparse.Namespace) -> int:
+    if args.action == 'work':
+        args.name = args.name or default_worker_name()
+        setup_log_pipeline(worker_log_path(args.name))
+    config = BestsellerConfig()
+    if getattr(args, 'no_cache', False):
+        config.cache_enabled = False
+    name = args.queue or new_job_id('queue')
+    try:
+        work_queue = WorkQueue(args.queue_path or config.queue_path, name, config.queue_lease, config.queue_max_attempts)
+    except sqlite3.Error as e:
+        raise ValueError(f"Fila indisponível: {e}")
+    try:
+        if args.action == 'enqueue':
+            engine = BestsellerBatchEngine(config)
+            units = engine.build_matrix(engine.load_products(args.products), _split_csv(args.frameworks), _split_csv(args.cultures))
+            added = work_queue.enqueue(units, args.hooks)
+            config.logger.info(f"Fila {name}: {added} unidades novas ({len(units) - added} já enfileiradas)")
+            print(name)
+        elif args.action == 'work':
+            worker = QueueWorker(config, work_queue, args.name, concurrency=args.concurrency)
+            config.logger.info(f"Worker {worker.name} na fila {name}")
+            try:
+                worker.run(wait=args.wait)
+            except KeyboardInterrupt:
+                config.logger.warning(f"Worker interrompido: {worker.completed} unidades concluídas, reservas devolvidas à fila")
+                return 130
+            config.logger.info(f"Worker {worker.name}: {worker.completed} unidades concluídas, {worker.failed} falhas")
+        elif args.action == 'status':
+            counts = work_queue.counts()
+            print(json.dumps({'queue': name, **{status: counts[status] for status in (UNIT_PENDING, UNIT_LEASED, UNIT_DONE, UNIT_FAILED)}}))
+            for key, error in work_queue.failures():
+                print(f"falhou {key}: {error}", file=sys.stderr)
+        elif args.action == 'results':
+            if args.dedup_threshold is not None:
+                config.dedup_threshold = args.dedup_threshold
+            dedup = build_hook_deduplicator(config)
+            with build_exporter(args.output, 'hook', args.compression) as exporter:
+                exporter.write_many(work_queue.iter_hooks(dedup))
+            config.logger.info(f"Fila {name}: {exporter.count} hooks exportados" + (f", {dedup.dropped} quase duplicados descartados" if dedup else ""))
+    finally:
+        work_queue.close()
+    return 0
+
+
+def run_analyze_command(args: argparse.Namespace) -> int:
+    config = BestsellerConfig()
+    started = time.perf_counter()
+    try:
+        results = analyze_corpus(args.corpus, args.processes or config.workers, max(1, args.chunksize), args.mode or config.executor_mode)
+        written, skipped = write_corpus_results(results, args.output, config.logger, args.compression)
+    except KeyboardInterrupt:
+        config.logger.warning("Análise de corpus interrompida")
+        return 130
+    config.logger.info(f"Análise concluída: {written} registros, {skipped} ignorados em {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def cli_main(argv: List[str] = None) -> int:
+    args = build_cli_parser().parse_args(argv)
+    try:
+        if args.command == 'batch':
+            return run_batch_command(args)
+        if args.command == 'render':
+            return run_render_command(args)
+        if args.command == 'bench-startup':
+            return run_bench_startup_command(args)
+        if args.command == 'analyze':
+            return run_analyze_command(args)
+        if args.command == 'rank':
+            return run_rank_command(args)
+        if args.command == 'queue':
+            return run_queue_command(args)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+    return 1
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli_main())
     main()
 